@@ -1,8 +1,6 @@
 from backend.models.call_report import CallReport
 from backend.repositories.call_report_repo import save_call_report
-from backend.services.llm_service import LLMService
-
-llm_service = LLMService()  # make sure this is the same service used elsewhere
+from backend.services import registry
 
 
 def finalize_call(call_session):
@@ -13,7 +11,7 @@ def finalize_call(call_session):
     print(f"[FINALIZE] report.clarification_count = {report.clarification_count}")
 
     # Pass the llm_service to generate_summary
-    report.generate_summary(llm_service=llm_service)
+    report.generate_summary(llm_service=registry.get("llm"))
 
     save_call_report(report)
     print(f"[REPORT] Saved report for Call ID {call_session.call_id}")
@@ -1,19 +1,18 @@
-from backend.services.confidence_manager import ConfidenceManager
-from backend.services.escalation_policy import EscalationPolicy
+from backend.services import registry
 from backend.controllers.ActionType import ActionType
 from backend.models.agent import Agent
 from backend.logs.logger import Logger
+from backend.services.phrase_bank import PHRASES
+from backend.services.tts_service import split_sentences
+from backend.utils.remote_calls import count_remote_calls, use_counter
 from functools import lru_cache
+import asyncio
 import re
 
 logger = Logger()
-confidence_manager = ConfidenceManager()
-escalation_policy = EscalationPolicy(
-    confidence_limit=0.3,
-    use_ai_validation=True,  # Enable AI validation from improved escalation policy
-)
 
 SENSITIVE_INTENTS = ["CLAIM", "LEGAL_ISSUE", "CONTRACT_CANCELLATION"]
+FALLBACK_MESSAGE = PHRASES["technical_issue"]
 
 
 class Orchestrator:
@@ -29,15 +28,26 @@ class Orchestrator:
         r"\bun\s+(vrai\s+)?(agent|humain)\b",
     ]
 
-    def __init__(self, llm_service=None):
+    def __init__(
+        self,
+        llm_service=None,
+        answer_cache=None,
+        confidence_manager=None,
+        escalation_policy=None,
+    ):
         if llm_service is None:
             raise ValueError("LLMService instance must be provided")
         self.llm_service = llm_service
+        # Optional SemanticAnswerCache: near-duplicate questions skip the LLM
+        self.answer_cache = answer_cache
+        # Process-wide instances from the registry unless given
+        self.confidence_manager = confidence_manager or registry.get("confidence")
+        self.escalation_policy = escalation_policy or registry.get("escalation")
         self._compiled_patterns = [
             re.compile(p, re.IGNORECASE) for p in self.AGENT_REQUEST_PATTERNS
         ]
 
-    def _is_explicit_agent_request(self, text: str) -> bool:
+    def is_explicit_agent_request(self, text: str) -> bool:
         """Fast pattern-based agent request detection."""
         for pattern in self._compiled_patterns:
             if pattern.search(text):
@@ -51,13 +61,25 @@ class Orchestrator:
         )
         print(f"[ORCH] Call started: {call_session.call_id}")
 
-    def process_turn(self, call_session, intent, asr_conf, nlu_conf, ambiguous=False):
-        """Process a single user turn with AI-first logic."""
+    def decide_turn(self, call_session, intent, asr_conf, nlu_conf, ambiguous=False):
+        """
+        Decide what to do with the latest user turn without generating an answer.
+
+        Returns a dict with `action` (GOODBYE, ESCALATE, ASK_CLARIFICATION,
+        AUTO_HANDLED or NO_INPUT), `reason`, `global_conf`, `intent_name` and
+        `user_text`. Only escalation severity analysis may make a remote call here.
+        """
 
         # Get user text safely
         if not call_session.messages:
             print("[ORCH] No messages in session")
-            return self._create_clarification_response(call_session, 0.0, "NO_INPUT")
+            return {
+                "action": "NO_INPUT",
+                "reason": "NO_INPUT",
+                "global_conf": 0.0,
+                "intent_name": "UNKNOWN",
+                "user_text": "",
+            }
 
         user_text = call_session.messages[-1]
         user_lower = user_text.lower().strip()
@@ -65,13 +87,19 @@ class Orchestrator:
         # ═══════════════════════════════════════════════════════════
         # TIER 1: EXPLICIT AGENT REQUEST (fast pattern matching)
         # ═══════════════════════════════════════════════════════════
-        if self._is_explicit_agent_request(user_lower):
-            return self._escalate_to_agent(call_session, "USER_REQUEST_AGENT")
+        if self.is_explicit_agent_request(user_lower):
+            return {
+                "action": "ESCALATE",
+                "reason": "USER_REQUEST_AGENT",
+                "global_conf": getattr(call_session, "global_confidence", None) or 0.0,
+                "intent_name": intent.name if intent else "UNKNOWN",
+                "user_text": user_text,
+            }
 
         # ═══════════════════════════════════════════════════════════
         # TIER 2: COMPUTE CONFIDENCE
         # ═══════════════════════════════════════════════════════════
-        global_conf = confidence_manager.compute_global_confidence(
+        global_conf = self.confidence_manager.compute_global_confidence(
             asr_confidence=asr_conf,
             nlu_confidence=nlu_conf,
             ambiguous=ambiguous,
@@ -83,49 +111,297 @@ class Orchestrator:
 
         print(f"[ORCH] Intent={intent_name}, GlobalConf={global_conf:.2f}")
 
+        decision = {
+            "global_conf": global_conf,
+            "intent_name": intent_name,
+            "user_text": user_text,
+        }
+
         # ═══════════════════════════════════════════════════════════
         # TIER 3: GOODBYE HANDLING
         # ═══════════════════════════════════════════════════════════
         if intent_name == "GOODBYE":
-            call_session.status = "ENDED"
-            call_session.add_message("Call ended by user.")
-
-            return {
-                "decision": (
-                    ActionType.END_CALL.value
-                    if hasattr(ActionType, "END_CALL")
-                    else ActionType.LLM.value
-                ),
-                "message": "Au revoir ! L'appel est terminé.",
-                "reason": "USER_GOODBYE",
-                "call_id": call_session.call_id,
-            }
+            decision.update(action="GOODBYE", reason="USER_GOODBYE")
+            return decision
 
         # ═══════════════════════════════════════════════════════════
         # TIER 4: ESCALATION POLICY (with AI validation)
         # ═══════════════════════════════════════════════════════════
-        decision, reason = escalation_policy.should_escalate(
+        action, reason = self.escalation_policy.should_escalate(
             global_confidence=global_conf,
             intent_name=intent_name,
             ambiguity_count=call_session.clarification_count,
             user_text=user_text,
         )
+        decision.update(action=action, reason=reason)
+        return decision
+
+    async def adecide_turn(
+        self, call_session, intent, asr_conf, nlu_conf, ambiguous=False
+    ):
+        """Async `decide_turn`: the escalation severity check is awaited."""
+        if call_session.messages:
+            user_text = call_session.messages[-1]
+            intent_name = intent.name if intent else "UNKNOWN"
+            if intent_name != "GOODBYE" and not self.is_explicit_agent_request(
+                user_text.lower().strip()
+            ):
+                await self.escalation_policy.aprefetch_severity(user_text)
+        return self.decide_turn(call_session, intent, asr_conf, nlu_conf, ambiguous)
+
+    def respond_without_llm(self, call_session, decision: dict):
+        """Build the response for decisions that need no generation, else None."""
+        action = decision["action"]
+
+        if action == "NO_INPUT":
+            return self._create_clarification_response(call_session, 0.0, "NO_INPUT")
+        if action == "GOODBYE":
+            return self._end_call_response(call_session)
+        if action == "ESCALATE":
+            return self._escalate_to_agent(call_session, decision["reason"])
+        if action == "ASK_CLARIFICATION":
+            return self._create_clarification_response(
+                call_session, decision["global_conf"], decision["reason"]
+            )
+        return None
+
+    def process_turn(
+        self, call_session, intent, asr_conf, nlu_conf, ambiguous=False, context=None
+    ):
+        """
+        Process a single user turn with AI-first logic.
+
+        Decides first (goodbye, escalate, clarify or answer) and only generates
+        an answer, using the retrieved `context`, when the AI handles the turn.
+        At most one generation call is made per turn.
+        """
+        with count_remote_calls() as remote_calls:
+            decision = self.decide_turn(
+                call_session, intent, asr_conf, nlu_conf, ambiguous
+            )
+            result = self.respond_without_llm(call_session, decision)
+
+            if result is None:
+                # ═══════════════════════════════════════════════════════
+                # TIER 5: AI HANDLES (generate response)
+                # ═══════════════════════════════════════════════════════
+                result = self._generate_ai_response(
+                    call_session,
+                    decision["user_text"],
+                    decision["intent_name"],
+                    decision["global_conf"],
+                    decision["reason"],
+                    context=context,
+                )
+
+        result["remote_calls"] = remote_calls.total
+        print(f"[ORCH] Remote calls this turn: {remote_calls.summary()}")
+        return result
+
+    async def aprocess_turn(
+        self, call_session, intent, asr_conf, nlu_conf, ambiguous=False, context=None
+    ):
+        """Async `process_turn` for the event loop."""
+        with count_remote_calls() as remote_calls:
+            decision = await self.adecide_turn(
+                call_session, intent, asr_conf, nlu_conf, ambiguous
+            )
+            result = self.respond_without_llm(call_session, decision)
+
+            if result is None:
+                result = await self._agenerate_ai_response(
+                    call_session,
+                    decision["user_text"],
+                    decision["intent_name"],
+                    decision["global_conf"],
+                    decision["reason"],
+                    context=context,
+                )
+
+        result["remote_calls"] = remote_calls.total
+        print(f"[ORCH] Remote calls this turn: {remote_calls.summary()}")
+        return result
+
+    async def aprocess_turn_stream(
+        self, call_session, intent, asr_conf, nlu_conf, ambiguous=False, context=None
+    ):
+        """
+        Streaming variant of `aprocess_turn`.
+
+        Returns `(result, sentences)`. When the AI answers, `sentences` is an
+        async iterator of response sentences and `result["message"]` is filled
+        once it is exhausted; otherwise `sentences` is None.
+        """
+        with count_remote_calls() as remote_calls:
+            decision = await self.adecide_turn(
+                call_session, intent, asr_conf, nlu_conf, ambiguous
+            )
+            result = self.respond_without_llm(call_session, decision)
 
-        if decision == "ESCALATE":
-            return self._escalate_to_agent(call_session, reason)
+        if result is not None:
+            result["remote_calls"] = remote_calls.total
+            return result, None
 
-        if decision == "ASK_CLARIFICATION":
-            return self._create_clarification_response(
-                call_session, global_conf, reason
+        answer = self.answer_sentences(
+            call_session, decision["user_text"], decision["intent_name"], context
+        )
+        result = self._streaming_result(call_session, decision)
+        sentences = self._stream_ai_response(
+            call_session, decision, answer, result, remote_calls
+        )
+        return result, sentences
+
+    async def acomplete_turn(
+        self, call_session, decision, answer, remote_calls, stream=False
+    ):
+        """
+        Finish an AUTO_HANDLED turn with an answer that is already running
+        (see `answer_sentences`), e.g. one started speculatively.
+
+        Returns `(result, sentences)` like `aprocess_turn_stream`; with
+        `stream=False` the answer is awaited and `sentences` is None.
+        """
+        if stream:
+            result = self._streaming_result(call_session, decision)
+            sentences = self._stream_ai_response(
+                call_session, decision, answer, result, remote_calls
             )
+            return result, sentences
 
-        # ═══════════════════════════════════════════════════════════
-        # TIER 5: AI HANDLES (generate response)
-        # ═══════════════════════════════════════════════════════════
-        return self._generate_ai_response(
-            call_session, user_text, intent_name, global_conf, reason
+        try:
+            llm_response = " ".join([sentence async for sentence in answer])
+        except Exception as e:
+            print(f"[ORCH] LLM error: {e}")
+            llm_response = ""
+        result = self._ai_result(
+            call_session,
+            llm_response or FALLBACK_MESSAGE,
+            decision["global_conf"],
+            decision["reason"],
+        )
+        result["remote_calls"] = remote_calls.total
+        return result, None
+
+    def answer_sentences(
+        self, call_session, user_text, intent_name, context, stream=True
+    ):
+        """
+        LLM answer as an async iterator of sentences. Without `stream`, the
+        blocking completion is yielded as a single item. With an answer cache,
+        a cached answer to a near-duplicate question is yielded instead.
+        """
+        history = self._history_text(call_session)
+        kwargs = dict(
+            user_text=user_text,
+            context=context or "",
+            language="fr",
+            intent=intent_name,
+            history=history,
         )
 
+        def generate(outcome=None):
+            if stream:
+                return self.llm_service.astream_response(**kwargs, outcome=outcome)
+            return self._single_answer(self.llm_service.agenerate_response(**kwargs))
+
+        if self.answer_cache is None:
+            return generate()
+        return self._cached_sentences(user_text, intent_name, history, generate)
+
+    @staticmethod
+    async def _single_answer(completion):
+        yield await completion
+
+    async def _cached_sentences(self, user_text, intent_name, history, generate):
+        """Cached answer sentences if any, else the LLM answer (then stored)."""
+        cached = await asyncio.to_thread(
+            self.answer_cache.lookup, user_text, intent_name, history
+        )
+        if cached is not None:
+            for sentence in split_sentences(cached):
+                yield sentence
+            return
+
+        sentences = []
+        outcome = {"complete": True}
+        answer = generate(outcome)
+        try:
+            async for sentence in answer:
+                sentences.append(sentence)
+                yield sentence
+        finally:
+            await answer.aclose()
+        # Only reached when the answer was not cancelled; a failed stream
+        # (fallback or truncated answer) is never stored
+        if not outcome["complete"]:
+            return
+        await asyncio.to_thread(
+            self.answer_cache.store,
+            user_text,
+            intent_name,
+            history,
+            " ".join(sentences),
+        )
+
+    @staticmethod
+    def _streaming_result(call_session, decision) -> dict:
+        return {
+            "decision": ActionType.LLM.value,
+            "message": None,
+            "confidence": decision["global_conf"],
+            "clarification_count": call_session.clarification_count,
+            "reason": decision["reason"],
+            "streaming": True,
+        }
+
+    async def _stream_ai_response(
+        self, call_session, decision, stream, result, remote_calls
+    ):
+        """Yield answer sentences, then record the full message on the session."""
+        sentences = []
+        try:
+            while True:
+                # Re-enter the turn's counter only while the LLM stream runs
+                with use_counter(remote_calls):
+                    try:
+                        sentence = await stream.__anext__()
+                    except StopAsyncIteration:
+                        break
+                sentences.append(sentence)
+                yield sentence
+        except Exception as e:
+            print(f"[ORCH] LLM stream error: {e}")
+        finally:
+            await stream.aclose()
+            llm_response = " ".join(sentences) or FALLBACK_MESSAGE
+            call_session.add_message(llm_response)
+            result["message"] = llm_response
+            result["remote_calls"] = remote_calls.total
+            print(
+                f"[ORCH] Action: LLM_STREAM | Confidence: {decision['global_conf']:.2f}"
+            )
+
+    @staticmethod
+    def _history_text(call_session) -> str:
+        """Recent messages (last 5 turns), current question excluded."""
+        return " ".join(call_session.messages[-6:-1])
+
+    def _end_call_response(self, call_session) -> dict:
+        """Helper to close the call on user goodbye."""
+        call_session.status = "ENDED"
+        call_session.add_message("Call ended by user.")
+
+        return {
+            "decision": (
+                ActionType.END_CALL.value
+                if hasattr(ActionType, "END_CALL")
+                else ActionType.LLM.value
+            ),
+            "message": PHRASES["goodbye"],
+            "reason": "USER_GOODBYE",
+            "call_id": call_session.call_id,
+        }
+
     def _escalate_to_agent(self, call_session, reason: str) -> dict:
         """Helper to escalate call to human agent."""
         agent = Agent(agent_id="A1", name="Sara", department="Claims")
@@ -151,9 +427,7 @@ class Orchestrator:
     ) -> dict:
         """Helper to create clarification response."""
         call_session.clarification_count += 1
-        clarification_prompt = (
-            "Je n'ai pas bien compris. Pourriez-vous préciser votre demande ?"
-        )
+        clarification_prompt = PHRASES["clarification"]
         call_session.add_message(clarification_prompt)
 
         print(
@@ -175,24 +449,70 @@ class Orchestrator:
         intent_name: str,
         global_conf: float,
         reason: str,
+        context: str = None,
     ) -> dict:
-        """Helper to generate AI response."""
-        # Build context from recent messages (last 5 turns)
-        context_text = " ".join(call_session.messages[-5:])
+        """Helper to generate AI response from retrieved context and history."""
+        history = self._history_text(call_session)
+        cache = self.answer_cache
+        cached = cache.lookup(user_text, intent_name, history) if cache else None
+        if cached is not None:
+            return self._ai_result(call_session, cached, global_conf, reason)
 
         try:
             llm_response = self.llm_service.generate_response(
                 user_text=user_text,
-                context=context_text,
+                context=context or "",
                 language="fr",
                 intent=intent_name,
+                history=history,
             )
+            if cache:
+                cache.store(user_text, intent_name, history, llm_response)
         except Exception as e:
             print(f"[ORCH] LLM error: {e}")
-            llm_response = (
-                "Je suis désolé, je rencontre un problème. Un instant s'il vous plaît."
+            llm_response = FALLBACK_MESSAGE
+
+        return self._ai_result(call_session, llm_response, global_conf, reason)
+
+    async def _agenerate_ai_response(
+        self,
+        call_session,
+        user_text: str,
+        intent_name: str,
+        global_conf: float,
+        reason: str,
+        context: str = None,
+    ) -> dict:
+        """Async `_generate_ai_response`."""
+        history = self._history_text(call_session)
+        cache = self.answer_cache
+        if cache:
+            cached = await asyncio.to_thread(
+                cache.lookup, user_text, intent_name, history
+            )
+            if cached is not None:
+                return self._ai_result(call_session, cached, global_conf, reason)
+
+        try:
+            llm_response = await self.llm_service.agenerate_response(
+                user_text=user_text,
+                context=context or "",
+                language="fr",
+                intent=intent_name,
+                history=history,
             )
+            if cache:
+                await asyncio.to_thread(
+                    cache.store, user_text, intent_name, history, llm_response
+                )
+        except Exception as e:
+            print(f"[ORCH] LLM error: {e}")
+            llm_response = FALLBACK_MESSAGE
 
+        return self._ai_result(call_session, llm_response, global_conf, reason)
+
+    @staticmethod
+    def _ai_result(call_session, llm_response: str, global_conf: float, reason: str):
         call_session.add_message(llm_response)
         print(f"[ORCH] Action: LLM_RESPONSE | Confidence: {global_conf:.2f}")
 
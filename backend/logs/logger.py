@@ -42,6 +42,18 @@ class Logger:
             {"session_id": session_id, "decision": decision, "reason": reason},
         )
 
+    def log_intent(self, text, intent, confidence, source, latency_ms=None):
+        self._write(
+            "intents.log",
+            {
+                "text": text,
+                "intent": intent,
+                "confidence": confidence,
+                "source": source,
+                "latency_ms": latency_ms,
+            },
+        )
+
     def log_agent_takeover(self, session_id, agent_id):
         self._write(
             "agent.log",
@@ -1,14 +1,15 @@
-import os
+import asyncio
 import uvicorn
 from fastapi import FastAPI, WebSocket, Query, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from fastapi import APIRouter
 from contextlib import asynccontextmanager
 
-from backend.services.voice_pipeline import VoicePipeline
+from backend.services import registry
 from backend.services.session_manager import SessionManager
-from backend.services.llm_service import LLMService
-from backend.controllers.orchestrator import Orchestrator
+from backend.services.provider_client import get_provider_client
+from backend.services.warmup import Warmup
 from backend.models.call_report import CallReport
 from backend.controllers.CallProcessRequest import CallProcessRequest
 from backend.repositories.client_repo import get_or_create_client
@@ -19,30 +20,22 @@ from backend.websockets.voice_ws import voice_ws_endpoint
 async def lifespan(app: FastAPI):
     """Handle startup and shutdown events."""
     print("[STARTUP] Initializing services...")
+    # Every model and client is built once, in registry.STARTUP_ORDER
+    await asyncio.to_thread(registry.startup)
+    app.state.pipeline = registry.get("pipeline")
+    app.state.llm_service = registry.get("llm")
+    app.state.orchestrator = registry.get("orchestrator")
 
-    try:
-        print("[STARTUP] Warming up ASR...")
-
-        print("[STARTUP] Warming up NLU...")
-        app.state.pipeline.nlu.detect_intent("Bonjour")
-
-        print("[STARTUP] Warming up LLM...")
-        app.state.llm_service.generate_response("Test", "", "fr", "GREETING")
-
-        print("[STARTUP] Services ready!")
-    except Exception as e:
-        print(f"[STARTUP] Warmup failed (non-critical): {e}")
+    # Probes run in the background; /ready stays 503 until they succeed
+    print("[STARTUP] Warming up services...")
+    warmup_task = asyncio.create_task(app.state.warmup.run(app.state.pipeline))
 
     yield
 
     print("[SHUTDOWN] Cleaning up...")
-    try:
-        import shutil
-
-        if os.path.exists("temp"):
-            shutil.rmtree("temp")
-    except Exception as e:
-        print(f"[SHUTDOWN] Cleanup error: {e}")
+    warmup_task.cancel()
+    await get_provider_client().aclose()
+    registry.shutdown()
 
 
 app = FastAPI(
@@ -61,10 +54,9 @@ app.add_middleware(
 )
 
 
-app.state.pipeline = VoicePipeline()
+# Services (pipeline, LLM, orchestrator) are attached in `lifespan`
 app.state.session_manager = SessionManager()
-app.state.llm_service = LLMService()
-app.state.orchestrator = Orchestrator(llm_service=app.state.llm_service)
+app.state.warmup = Warmup()
 app.state.active_calls = {}  # In-memory session store
 
 
@@ -103,7 +95,7 @@ def start_call(
 
 
 @router.post("/process")
-def process_call(request: CallProcessRequest):
+async def process_call(request: CallProcessRequest):
     """
     Process a turn in an ongoing call session.
     (Legacy endpoint - WebSocket is preferred)
@@ -113,18 +105,17 @@ def process_call(request: CallProcessRequest):
         raise HTTPException(status_code=404, detail="Call session not found")
 
     asr_conf = 0.9
-    nlu_conf = 0.8
 
-    response = app.state.orchestrator.process_turn(
+    result = await app.state.pipeline.aprocess_text(
+        request.text,
         call_session=call_session,
-        intent=None,
         asr_conf=asr_conf,
-        nlu_conf=nlu_conf,
     )
 
     return {
-        "call_session": Orchestrator.serialize_call_session(call_session),
-        "response": response,
+        "call_session": app.state.orchestrator.serialize_call_session(call_session),
+        "response": result["orchestration_result"],
+        "remote_calls": result["remote_calls"],
     }
 
 
@@ -159,7 +150,7 @@ def end_call(call_id: str = Query(..., description="Call session ID")):
     app.state.active_calls.pop(call_id, None)
 
     return {
-        "call_session": Orchestrator.serialize_call_session(call_session),
+        "call_session": app.state.orchestrator.serialize_call_session(call_session),
         "summary": summary,
         "user_name": getattr(call_session, "user_name", "Unknown"),
         "phone_number": getattr(call_session, "phone_number", "Unknown"),
@@ -186,25 +177,43 @@ async def websocket_endpoint(ws: WebSocket):
         ws=ws,
         pipeline=app.state.pipeline,
         session_manager=app.state.session_manager,
-        temp_dir="temp",
     )
 
 
 @app.get("/health")
 def health_check():
-    """Service health check endpoint."""
+    """Liveness, with the warmup state of each service."""
     return {
         "status": "healthy",
-        "services": {
-            "asr": "ok",
-            "nlu": "ok",
-            "llm": "ok",
-            "tts": "ok",
-        },
+        "services": app.state.warmup.service_states(),
+        "missing_phrases": app.state.warmup.missing_phrases(),
         "active_sessions": len(app.state.active_calls),
     }
 
 
+@app.get("/ready")
+def readiness_check():
+    """Readiness for the load balancer: 503 until every required probe is warm."""
+    status = app.state.warmup.get_status()
+    status["load_s"] = {k: round(v, 2) for k, v in registry.loaded().items()}
+    return JSONResponse(status, status_code=200 if status["ready"] else 503)
+
+
+@app.get("/stats")
+def service_stats():
+    """Runtime statistics for tuning (caches, speculation, ASR batching)."""
+    pipeline = app.state.pipeline
+    return {
+        "asr": pipeline.asr_scheduler.get_stats(),
+        "nlu": pipeline.nlu.get_intent_stats(),
+        "rag": pipeline.rag.get_cache_stats(),
+        "speculation": pipeline.scheduler.get_stats(),
+        "answer_cache": pipeline.answer_cache.get_stats(),
+        "tts_cache": pipeline.tts.get_cache_stats(),
+        "phrase_bank": pipeline.phrases.get_stats(),
+    }
+
+
 if __name__ == "__main__":
     print(
         """
@@ -212,6 +221,7 @@ if __name__ == "__main__":
     ║  WebSocket: ws://localhost:8000/ws/voice             ║
     ║  REST API:  http://localhost:8000/call/*             ║
     ║  Health:    http://localhost:8000/health             ║
+    ║  Ready:     http://localhost:8000/ready              ║
     ║  Docs:      http://localhost:8000/docs               ║
 
     """
@@ -0,0 +1,133 @@
+"""
+Compare RAG embedding backends on the FAQ_ASSURANCE corpus.
+
+Each backend (torch, onnx, onnx-int8) runs in its own process so its peak
+memory is measured in isolation. The corpus is chunked as in embed_faqs.py
+and embedded with each backend; queries are then timed one at a time (one
+query per turn, as in production). Top-k overlap is the share of each
+query's top-k chunks that the backend has in common with the torch model.
+
+Usage (from the repository root):
+    python -m backend.scripts.bench_embedding_backends --threads 4 --k 4
+"""
+
+import os
+import time
+import resource
+import argparse
+import multiprocessing as mp
+
+import numpy as np
+
+# --- CONFIG ---
+QUERIES = [
+    "Comment déclarer un sinistre ?",
+    "Quel est le délai pour déclarer un accident de voiture ?",
+    "Mon assurance habitation couvre-t-elle les dégâts des eaux ?",
+    "Comment résilier mon contrat d'assurance ?",
+    "Quels documents fournir après un vol de moto ?",
+    "Comment modifier mon mode de paiement ?",
+    "Est-ce que ma mutuelle rembourse les lunettes ?",
+    "Que couvre la garantie responsabilité civile ?",
+    "Comment fonctionne l'assurance vie en cas de décès ?",
+    "Puis-je retirer mon épargne avant la retraite ?",
+    "Mon contrat couvre-t-il le ski et les sports d'hiver ?",
+    "Quelle franchise s'applique en cas de bris de glace ?",
+    "Comment obtenir une attestation d'assurance ?",
+    "Que faire si mon logement est cambriolé ?",
+    "Les frais d'hospitalisation sont-ils pris en charge ?",
+    "Comment ajouter un conducteur secondaire ?",
+]
+
+
+def load_corpus() -> list[str]:
+    from backend.scripts.embed_faqs import PDF_DIR, split_pdf
+
+    pdfs = sorted(f for f in os.listdir(PDF_DIR) if f.endswith(".pdf"))
+    return [
+        chunk["text"] for pdf in pdfs for chunk in split_pdf(os.path.join(PDF_DIR, pdf))
+    ]
+
+
+def run_backend(backend: str, corpus: list[str], threads: int, results):
+    """Child process: embed corpus and queries, report latency and memory."""
+    from backend.services.embedding_backends import get_embedder
+
+    started = time.perf_counter()
+    embedder = get_embedder(backend, threads=threads)
+    load_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    corpus_vectors = embedder.encode(corpus)
+    corpus_s = time.perf_counter() - started
+
+    embedder.encode([QUERIES[0]])  # warm up kernels before timing
+    latencies, query_vectors = [], []
+    for query in QUERIES:
+        started = time.perf_counter()
+        query_vectors.append(embedder.encode([query])[0])
+        latencies.append((time.perf_counter() - started) * 1000)
+
+    results.put(
+        {
+            "backend": backend,
+            "load_s": load_s,
+            "corpus_s": corpus_s,
+            "latencies": latencies,
+            "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+            "corpus": corpus_vectors,
+            "queries": np.stack(query_vectors),
+        }
+    )
+
+
+def top_k(queries: np.ndarray, corpus: np.ndarray, k: int) -> list[set]:
+    scores = queries @ corpus.T
+    return [set(np.argsort(-row)[:k]) for row in scores]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Embedding backend benchmark")
+    parser.add_argument("--backends", default="torch,onnx,onnx-int8")
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--k", type=int, default=4)
+    args = parser.parse_args()
+
+    corpus = load_corpus()
+    print(f"{len(corpus)} chunks, {len(QUERIES)} queries, k={args.k}")
+
+    ctx = mp.get_context("spawn")
+    runs = {}
+    for backend in args.backends.split(","):
+        results = ctx.Queue()
+        process = ctx.Process(
+            target=run_backend, args=(backend, corpus, args.threads, results)
+        )
+        process.start()
+        runs[backend] = results.get()
+        process.join()
+
+    reference = runs.get("torch")
+    print(
+        f"{'backend':<11}{'load s':>8}{'corpus s':>10}{'p50 ms':>8}"
+        f"{'p95 ms':>8}{'peak MB':>9}{'overlap':>9}"
+    )
+    for backend, run in runs.items():
+        latencies = sorted(run["latencies"])
+        p50 = latencies[len(latencies) // 2]
+        p95 = latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))]
+        overlap = "-"
+        if reference is not None:
+            ours = top_k(run["queries"], run["corpus"], args.k)
+            theirs = top_k(reference["queries"], reference["corpus"], args.k)
+            overlap = (
+                f"{np.mean([len(a & b) / args.k for a, b in zip(ours, theirs)]):.0%}"
+            )
+        print(
+            f"{backend:<11}{run['load_s']:>8.1f}{run['corpus_s']:>10.1f}"
+            f"{p50:>8.1f}{p95:>8.1f}{run['peak_rss_mb']:>9.0f}{overlap:>9}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Compare blocking vs streaming answers against the local mock LLM server.
+
+Blocking: the whole completion is awaited, then the whole reply is synthesized.
+Streaming: the first completed sentence is synthesized as soon as it arrives.
+Without --tts, synthesis is modelled as a fixed per-character cost so the run
+needs no network access.
+
+Usage (from the repository root):
+    python -m backend.scripts.bench_time_to_first_audio --runs 5
+    python -m backend.scripts.bench_time_to_first_audio --tts
+"""
+
+import os
+import time
+import argparse
+import statistics
+
+from backend.scripts.mock_llm_server import DEFAULT_PORT, start_server
+
+# --- CONFIG ---
+SIMULATED_TTS_MS_PER_CHAR = 2.0
+QUESTION = "Comment déclarer un sinistre ?"
+
+
+def make_synthesizer(use_tts: bool):
+    if use_tts:
+        from backend.services.tts_service import TTSService
+
+        tts = TTSService()
+        return lambda text: tts.synthesize(text=text, lang="fr")
+
+    return lambda text: time.sleep(len(text) * SIMULATED_TTS_MS_PER_CHAR / 1000)
+
+
+def run_blocking(llm, synthesize) -> float:
+    start = time.perf_counter()
+    text = llm.generate_response(QUESTION, context="", intent="CLAIM")
+    synthesize(text)
+    return (time.perf_counter() - start) * 1000
+
+
+def run_streaming(llm, synthesize) -> float:
+    start = time.perf_counter()
+    first_audio = None
+    for sentence in llm.stream_response(QUESTION, context="", intent="CLAIM"):
+        if first_audio is None:
+            synthesize(sentence)
+            first_audio = (time.perf_counter() - start) * 1000
+    return first_audio
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time-to-first-audio benchmark")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--tts", action="store_true", help="Use the real TTSService")
+    args = parser.parse_args()
+
+    server = start_server(args.port, background=True)
+    os.environ["LLM_API_BASE"] = f"http://127.0.0.1:{args.port}/v1"
+    os.environ.setdefault("GROQ_API_KEY", "mock")
+
+    from backend.services.llm_service import LLMService
+
+    llm = LLMService()
+    synthesize = make_synthesizer(args.tts)
+
+    blocking = [run_blocking(llm, synthesize) for _ in range(args.runs)]
+    streaming = [run_streaming(llm, synthesize) for _ in range(args.runs)]
+    server.shutdown()
+
+    print(f"{'mode':<12}{'median ms':>12}{'max ms':>10}")
+    for name, samples in (("blocking", blocking), ("streaming", streaming)):
+        print(f"{name:<12}{statistics.median(samples):>12.0f}{max(samples):>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Compare per-sentence latency of the remote TTS engine and the local one.
+
+Remote: ElevenLabsEngine against a local stand-in server that answers after
+a log-normally distributed delay (median and tail set below), like a
+network TTS API.
+Local: LocalEngine worker processes. With --piper the real Piper voice from
+TTS_LOCAL_MODEL is used; otherwise a CPU-bound stand-in renders a tone of
+the sentence's spoken length and encodes it to MP3.
+
+Usage (from the repository root):
+    python -m backend.scripts.bench_tts_engines --sentences 40 --concurrency 4
+    TTS_LOCAL_MODEL=voices/fr_FR-siwis-medium.onnx \\
+        python -m backend.scripts.bench_tts_engines --piper
+"""
+
+import os
+import time
+import random
+import asyncio
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+from backend.utils.audio_utils import encode_mp3
+
+# --- CONFIG ---
+DEFAULT_PORT = 8090
+REMOTE_MEDIAN_S = 0.45
+REMOTE_SIGMA = 0.6  # log-normal spread: p99 is about 4x the median
+LOCAL_SAMPLE_RATE = 22050
+SECONDS_PER_CHAR = 0.06  # spoken duration of the stand-in audio
+SENTENCES = [
+    "Un agent pourra vous donner les détails de votre contrat spécifique.",
+    "Vous pouvez déclarer un sinistre en ligne ou par téléphone.",
+    "Le délai de déclaration est de cinq jours ouvrés.",
+    "Pensez à joindre des photos et le constat amiable.",
+    "Le remboursement intervient sous trente jours après validation.",
+    "Votre attestation est disponible dans votre espace client.",
+]
+
+
+def _standin_synthesize(text: str) -> bytes:
+    """Local engine stand-in (runs in the worker processes)."""
+    n = int(len(text) * SECONDS_PER_CHAR * LOCAL_SAMPLE_RATE)
+    t = np.arange(n) / LOCAL_SAMPLE_RATE
+    # A few vectorized passes to cost CPU roughly like a small vocoder
+    samples = np.zeros(n, dtype=np.float32)
+    for harmonic in range(1, 9):
+        samples += np.sin(2 * np.pi * 140 * harmonic * t) / (harmonic * 4)
+    return encode_mp3(samples, LOCAL_SAMPLE_RATE)
+
+
+class RemoteStandInHandler(BaseHTTPRequestHandler):
+    audio = b""
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        time.sleep(random.lognormvariate(np.log(REMOTE_MEDIAN_S), REMOTE_SIGMA))
+        self.send_response(200)
+        self.send_header("Content-Type", "audio/mpeg")
+        self.send_header("Content-Length", str(len(self.audio)))
+        self.end_headers()
+        self.wfile.write(self.audio)
+
+
+def start_remote_standin(port: int):
+    RemoteStandInHandler.audio = _standin_synthesize(SENTENCES[0])
+    server = ThreadingHTTPServer(("127.0.0.1", port), RemoteStandInHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+async def measure(engine, sentences: list[str], concurrency: int) -> list[float]:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(sentence):
+        async with semaphore:
+            start = time.perf_counter()
+            audio = await engine.asynthesize(sentence, "fr")
+            if not audio:
+                raise RuntimeError(f"{engine.name} returned no audio")
+            return (time.perf_counter() - start) * 1000
+
+    return await asyncio.gather(*(one(s) for s in sentences))
+
+
+def summarize(samples: list[float]) -> dict:
+    ordered = sorted(samples)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+    return {"p50": pick(0.5), "p95": pick(0.95), "max": ordered[-1]}
+
+
+async def run(args):
+    from backend.services.tts_engines import ElevenLabsEngine, LocalEngine
+
+    server = start_remote_standin(args.port)
+    os.environ["ELEVENLABS_API_BASE"] = f"http://127.0.0.1:{args.port}/v1"
+    remote = ElevenLabsEngine(api_key="standin")
+
+    if args.piper:
+        local = LocalEngine.piper(workers=args.workers)
+    else:
+        local = LocalEngine(_standin_synthesize, workers=args.workers)
+    # Let the workers start (and load their model) before timing
+    await local.asynthesize(SENTENCES[0], "fr")
+
+    sentences = [SENTENCES[i % len(SENTENCES)] for i in range(args.sentences)]
+    results = {}
+    for name, engine in (("remote", remote), ("local", local)):
+        results[name] = summarize(await measure(engine, sentences, args.concurrency))
+
+    local.close()
+    server.shutdown()
+
+    print(f"{'engine':<10}{'p50 ms':>9}{'p95 ms':>9}{'max ms':>9}")
+    for name, r in results.items():
+        print(f"{name:<10}{r['p50']:>9.0f}{r['p95']:>9.0f}{r['max']:>9.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Remote vs local TTS latency")
+    parser.add_argument("--sentences", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--piper", action="store_true", help="Use the Piper voice")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Compare whole-reply vs per-sentence TTS caching on a stream of answers that
+reuse sentences, as LLM answers do.
+
+Whole reply: one cache entry per distinct reply, synthesized in one request.
+Per sentence: one entry per sentence, missing sentences synthesized in parallel.
+Synthesis is modelled as a fixed per-character cost (no network access);
+each mode starts from an empty cache in a temporary directory.
+
+Usage (from the repository root):
+    python -m backend.scripts.bench_tts_sentence_cache --replies 200
+"""
+
+import time
+import random
+import argparse
+import tempfile
+
+# --- CONFIG ---
+SIMULATED_TTS_MS_PER_CHAR = 1.0
+SENTENCES = [
+    "Un agent pourra vous donner les détails de votre contrat spécifique.",
+    "Vous pouvez déclarer un sinistre en ligne ou par téléphone.",
+    "Le délai de déclaration est de cinq jours ouvrés.",
+    "Pensez à joindre des photos et le constat amiable.",
+    "Le remboursement intervient sous trente jours après validation.",
+    "Votre attestation est disponible dans votre espace client.",
+    "Les paiements peuvent être mensuels ou annuels.",
+    "Souhaitez-vous que je vous explique la suite de la procédure ?",
+]
+
+
+def make_replies(count: int, seed: int = 7) -> list[str]:
+    rng = random.Random(seed)
+    return [" ".join(rng.sample(SENTENCES, rng.randint(2, 3))) for _ in range(count)]
+
+
+def make_service(cache_dir: str):
+    from backend.services.tts_cache import TTSCache
+    from backend.services.tts_engines import TTSEngine
+    from backend.services.tts_service import TTSService
+
+    class SimulatedEngine(TTSEngine):
+        name = "simulated"
+
+        def synthesize(self, text: str, lang: str):
+            time.sleep(len(text) * SIMULATED_TTS_MS_PER_CHAR / 1000)
+            return text.encode("utf-8")
+
+    tts = TTSService(engines=[SimulatedEngine()])
+    tts.cache = TTSCache(cache_dir)
+    return tts
+
+
+def run(replies: list[str], per_sentence: bool) -> dict:
+    with tempfile.TemporaryDirectory() as cache_dir:
+        tts = make_service(cache_dir)
+        start = time.perf_counter()
+        for reply in replies:
+            if per_sentence:
+                tts.synthesize_bytes(reply, "fr")
+            else:
+                tts._sentence_audio(reply, "fr")
+        elapsed = time.perf_counter() - start
+        stats = tts.get_cache_stats()
+    return {"wall_s": elapsed, "hit_rate": stats["hit_rate"], "writes": stats["writes"]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-sentence TTS cache benchmark")
+    parser.add_argument("--replies", type=int, default=200)
+    args = parser.parse_args()
+
+    replies = make_replies(args.replies)
+    results = {
+        "whole reply": run(replies, per_sentence=False),
+        "per sentence": run(replies, per_sentence=True),
+    }
+
+    print(f"{'mode':<14}{'wall s':>9}{'hit rate':>10}{'synth':>7}")
+    for name, r in results.items():
+        print(f"{name:<14}{r['wall_s']:>9.2f}{r['hit_rate']:>10.1%}{r['writes']:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+Compare Chroma retrieval with the in-process NumPy index (RAG_INDEX=numpy).
+
+The collection is exported to a temporary index directory, then each index
+is opened in its own process so load time and peak memory are measured in
+isolation. Queries are stored chunk embeddings plus noise (no embedding
+model involved, only the index is timed), searched one at a time as in
+production. Recall@k is measured against exact float32 brute force.
+
+Usage (from the repository root):
+    python -m backend.scripts.bench_vector_index --k 4 --queries 500
+    python -m backend.scripts.bench_vector_index --synthetic 3000  # no Chroma
+"""
+
+import time
+import tempfile
+import resource
+import argparse
+import multiprocessing as mp
+
+import numpy as np
+
+from backend.services.vector_index import NumpyIndex, export_collection
+
+# --- CONFIG ---
+CHROMA_DIR = "backend/vectorstore/chroma"
+COLLECTION_NAME = "insurance_faqs"
+QUERY_NOISE = 0.05  # per-dimension noise added to a chunk embedding
+DIM = 768  # all-mpnet-base-v2
+
+
+class SyntheticRows:
+    """Random unit vectors exposed like `collection.get` for the exporter."""
+
+    def __init__(self, count: int, dim: int = DIM, seed: int = 0):
+        rng = np.random.default_rng(seed)
+        self.embeddings = rng.standard_normal((count, dim)).astype(np.float32)
+        self.embeddings /= np.linalg.norm(self.embeddings, axis=1, keepdims=True)
+
+    def get(self, include=None):
+        ids = [f"chunk-{i}" for i in range(len(self.embeddings))]
+        return {
+            "ids": ids,
+            "embeddings": self.embeddings,
+            "documents": ids,
+            "metadatas": [{"source": "synthetic"}] * len(ids),
+        }
+
+
+def open_collection():
+    import chromadb
+    from chromadb.config import Settings
+
+    client = chromadb.PersistentClient(
+        path=CHROMA_DIR, settings=Settings(anonymized_telemetry=False)
+    )
+    return client.get_collection(COLLECTION_NAME)
+
+
+def run_index(kind: str, index_dir: str, queries: np.ndarray, k: int, results):
+    """Child process: open one index, search every query, report."""
+    started = time.perf_counter()
+    if kind == "chroma":
+        collection = open_collection()
+        collection.query(query_embeddings=[queries[0].tolist()], n_results=k)
+
+        def search(q):
+            found = collection.query(query_embeddings=[q.tolist()], n_results=k)
+            return found["ids"][0]
+
+    else:
+        index = NumpyIndex(index_dir)
+        index.search(queries[0], k)
+
+        def search(q):
+            return index.search(q, k)["ids"]
+
+    load_s = time.perf_counter() - started
+
+    latencies, found = [], []
+    for q in queries:
+        started = time.perf_counter()
+        found.append(search(q))
+        latencies.append((time.perf_counter() - started) * 1000)
+
+    results.put(
+        {
+            "load_s": load_s,
+            "latencies": latencies,
+            "found": found,
+            "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        }
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vector index benchmark")
+    parser.add_argument("--k", type=int, default=4)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument(
+        "--synthetic", type=int, default=0, help="N random vectors instead of Chroma"
+    )
+    args = parser.parse_args()
+
+    source = SyntheticRows(args.synthetic) if args.synthetic else open_collection()
+    index_dir = tempfile.mkdtemp(prefix="numpy_index-")
+    export_collection(source, index_dir)
+
+    data = source.get(include=["embeddings"])
+    ids = np.array(data["ids"])
+    corpus = np.asarray(data["embeddings"], dtype=np.float32)
+    corpus /= np.linalg.norm(corpus, axis=1, keepdims=True)
+
+    rng = np.random.default_rng(1)
+    picks = rng.integers(0, len(corpus), args.queries)
+    queries = corpus[picks] + QUERY_NOISE * rng.standard_normal(
+        (args.queries, corpus.shape[1])
+    ).astype(np.float32)
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+    exact = [set(ids[np.argsort(-(corpus @ q))[: args.k]]) for q in queries]
+
+    print(
+        f"{len(corpus)} chunks x {corpus.shape[1]} dims, "
+        f"{args.queries} queries, k={args.k}"
+    )
+    print(
+        f"{'index':<8}{'load s':>8}{'p50 ms':>9}{'p95 ms':>9}"
+        f"{'peak MB':>9}{'recall':>9}"
+    )
+    ctx = mp.get_context("spawn")
+    for kind in ("numpy",) if args.synthetic else ("chroma", "numpy"):
+        results = ctx.Queue()
+        process = ctx.Process(
+            target=run_index, args=(kind, index_dir, queries, args.k, results)
+        )
+        process.start()
+        run = results.get()
+        process.join()
+
+        latencies = sorted(run["latencies"])
+        p50 = latencies[len(latencies) // 2]
+        p95 = latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))]
+        recall = np.mean(
+            [len(set(f) & e) / args.k for f, e in zip(run["found"], exact)]
+        )
+        print(
+            f"{kind:<8}{run['load_s']:>8.2f}{p50:>9.3f}{p95:>9.3f}"
+            f"{run['peak_rss_mb']:>9.0f}{recall:>9.1%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,60 +1,204 @@
+"""
+Incremental FAQ ingestion into the Chroma collection.
+
+Each PDF is hashed; only new or modified PDFs are parsed (in a process
+pool) and split. Chunk ids are stable (PDF name + chunk text hash), so only
+chunks missing from the collection are embedded, in large batches, and
+upserted; chunks that are no longer produced by any PDF are deleted. An
+unchanged corpus does not load the embedding model at all.
+
+Usage (from the repository root):
+    python -m backend.scripts.embed_faqs
+    python -m backend.scripts.embed_faqs --rebuild  # re-embed every chunk
+"""
+
 import os
+import json
+import time
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
 from langchain_community.document_loaders import PyPDFLoader
 from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain_community.embeddings import SentenceTransformerEmbeddings
-from langchain_community.vectorstores import Chroma
+from backend.services.bm25_index import BM25_PATH, build_index
+from backend.services.embedding_backends import DEFAULT_MODEL, get_embedder
+from backend.services.vector_index import INDEX_DIR, export_collection
 
 # --- CONFIG ---
 PDF_DIR = "FAQ_ASSURANCE"
 CHROMA_DIR = "backend/vectorstore/chroma"
 COLLECTION_NAME = "insurance_faqs"
+MANIFEST_PATH = "backend/vectorstore/ingest_manifest.json"
+CHUNK_SIZE = 400
+CHUNK_OVERLAP = 60
+PARSE_WORKERS = min(8, os.cpu_count() or 1)
+ENCODE_BATCH = 128
+UPSERT_BATCH = 1000
+
+
+def file_hash(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def split_pdf(path: str) -> list[dict]:
+    """Worker: load one PDF and split it into chunks with stable ids."""
+    file = os.path.basename(path)
+    splitter = RecursiveCharacterTextSplitter(
+        chunk_size=CHUNK_SIZE,
+        chunk_overlap=CHUNK_OVERLAP,
+        separators=["\n\n", "\n"],
+    )
+    docs = PyPDFLoader(path).load()
+    for d in docs:
+        d.metadata["source"] = file
+
+    chunks, seen = [], {}
+    for chunk in splitter.split_documents(docs):
+        digest = hashlib.sha256(chunk.page_content.encode("utf-8")).hexdigest()[:16]
+        # Identical text repeated in one PDF gets an occurrence suffix
+        seen[digest] = seen.get(digest, 0) + 1
+        chunk_id = f"{file}:{digest}"
+        if seen[digest] > 1:
+            chunk_id += f":{seen[digest]}"
+        metadata = {
+            k: v
+            for k, v in chunk.metadata.items()
+            if isinstance(v, (str, int, float, bool))
+        }
+        chunks.append({"id": chunk_id, "text": chunk.page_content, "meta": metadata})
+    return chunks
+
+
+def load_manifest() -> dict:
+    if not os.path.exists(MANIFEST_PATH):
+        return {"embedding": None, "pdfs": {}}
+    with open(MANIFEST_PATH, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_manifest(manifest: dict):
+    tmp = MANIFEST_PATH + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, MANIFEST_PATH)
 
-# --- USE A STRONGER EMBEDDING MODEL ---
-embeddings = SentenceTransformerEmbeddings(
-    model_name="sentence-transformers/all-mpnet-base-v2"
-)
 
+def open_collection():
+    import chromadb
+    from chromadb.config import Settings
 
-# --- PDF LOADING ---
-def load_pdfs(pdf_dir):
-    documents = []
-    for file in os.listdir(pdf_dir):
-        if file.endswith(".pdf"):
-            path = os.path.join(pdf_dir, file)
-            loader = PyPDFLoader(path)
-            docs = loader.load()
-            for d in docs:
-                d.metadata["source"] = file
-            documents.extend(docs)
-    return documents
+    client = chromadb.PersistentClient(
+        path=CHROMA_DIR, settings=Settings(anonymized_telemetry=False)
+    )
+    return client.get_or_create_collection(name=COLLECTION_NAME)
 
 
 # --- MAIN SCRIPT ---
 def main():
-    print("Loading PDFs...")
-    documents = load_pdfs(PDF_DIR)
-    if not documents:
+    parser = argparse.ArgumentParser(description="Incremental FAQ ingestion")
+    parser.add_argument(
+        "--rebuild", action="store_true", help="re-parse and re-embed every PDF"
+    )
+    args = parser.parse_args()
+    started = time.perf_counter()
+
+    pdfs = sorted(f for f in os.listdir(PDF_DIR) if f.endswith(".pdf"))
+    if not pdfs:
         print("No PDFs found. Exiting.")
         return
 
-    print("Splitting documents into chunks...")
-    splitter = RecursiveCharacterTextSplitter(
-        chunk_size=400,
-        chunk_overlap=60,
-        separators=["\n\n", "\n"],
+    # Vectors from another encoder are not comparable: re-embed everything
+    embedding = f"{os.getenv('RAG_EMBEDDING_BACKEND', 'torch')}:{DEFAULT_MODEL}"
+    manifest = load_manifest()
+    rebuild = args.rebuild or manifest.get("embedding") != embedding
+    previous = {} if rebuild else manifest["pdfs"]
+
+    collection = open_collection()
+    stored = set(collection.get(include=[])["ids"])
+
+    hashes = {f: file_hash(os.path.join(PDF_DIR, f)) for f in pdfs}
+    changed = [
+        f
+        for f in pdfs
+        if previous.get(f, {}).get("sha256") != hashes[f]
+        # also re-parse PDFs whose chunks went missing from the collection
+        or not stored.issuperset(previous[f]["chunks"])
+    ]
+    removed = sorted(set(manifest["pdfs"]) - set(pdfs))
+    print(
+        f"{len(pdfs)} PDFs: {len(changed)} new or modified, "
+        f"{len(pdfs) - len(changed)} unchanged, {len(removed)} removed"
+    )
+
+    parsed = {}
+    if changed:
+        print(f"Parsing {len(changed)} PDFs with {PARSE_WORKERS} workers...")
+        paths = [os.path.join(PDF_DIR, f) for f in changed]
+        with ProcessPoolExecutor(max_workers=min(PARSE_WORKERS, len(paths))) as pool:
+            parsed = dict(zip(changed, pool.map(split_pdf, paths)))
+
+    # Chunk ids the corpus produces now, without re-parsing unchanged PDFs
+    current = {}
+    for f in pdfs:
+        if f in parsed:
+            current[f] = [chunk["id"] for chunk in parsed[f]]
+        else:
+            current[f] = previous[f]["chunks"]
+    wanted = {chunk_id for ids in current.values() for chunk_id in ids}
+
+    new_chunks = [
+        chunk
+        for chunks in parsed.values()
+        for chunk in chunks
+        if rebuild or chunk["id"] not in stored
+    ]
+    stale = sorted(stored - wanted)
+
+    if new_chunks:
+        print(f"Embedding {len(new_chunks)} new chunks...")
+        embedder = get_embedder()
+        vectors = embedder.encode(
+            [chunk["text"] for chunk in new_chunks], batch_size=ENCODE_BATCH
+        )
+        for start in range(0, len(new_chunks), UPSERT_BATCH):
+            batch = new_chunks[start : start + UPSERT_BATCH]
+            collection.upsert(
+                ids=[chunk["id"] for chunk in batch],
+                embeddings=vectors[start : start + UPSERT_BATCH].tolist(),
+                documents=[chunk["text"] for chunk in batch],
+                metadatas=[chunk["meta"] for chunk in batch],
+            )
+    if stale:
+        print(f"Deleting {len(stale)} chunks no longer in the corpus...")
+        for start in range(0, len(stale), UPSERT_BATCH):
+            collection.delete(ids=stale[start : start + UPSERT_BATCH])
+
+    save_manifest(
+        {
+            "embedding": embedding,
+            "pdfs": {f: {"sha256": hashes[f], "chunks": current[f]} for f in pdfs},
+        }
     )
-    chunks = splitter.split_documents(documents)
-    print(f"Total chunks created: {len(chunks)}")
-
-    print("Creating embeddings and storing in Chroma DB...")
-    db = Chroma.from_documents(
-        documents=chunks,
-        embedding=embeddings,
-        persist_directory=CHROMA_DIR,
-        collection_name=COLLECTION_NAME,
+
+    if new_chunks or stale or not os.path.exists(BM25_PATH):
+        # Keep the in-process index (RAG_INDEX=numpy) in sync with the collection
+        export_collection(collection, INDEX_DIR)
+
+        # French BM25 index over the same chunk ids, for hybrid retrieval
+        everything = collection.get(include=["documents", "metadatas"])
+        sources = [(meta or {}).get("source") for meta in everything["metadatas"]]
+        build_index(everything["ids"], everything["documents"], BM25_PATH, sources)
+
+    print(
+        f"Ingestion complete in {time.perf_counter() - started:.1f}s: "
+        f"{len(new_chunks)} upserted, {len(stale)} deleted, "
+        f"{collection.count()} chunks in {CHROMA_DIR}"
     )
-    db.persist()
-    print("Embedding complete. Chroma DB ready at:", CHROMA_DIR)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,99 @@
+"""
+Offline evaluation of the local intent classifier against the LLM labels.
+
+Turns the LLM classified are logged to backend/logs/data/intents.log with
+their label and call latency. They are shuffled and split: the classifier
+is fitted on the seeds plus the training part, and each held-out turn is
+classified one at a time (embedding included, no cache, as a cold turn).
+For a range of margins the script reports the share of turns answered
+locally (LLM calls avoided) and their agreement with the LLM, next to the
+local and LLM latencies, to choose NLU_LOCAL_MARGIN.
+
+Usage (from the repository root):
+    python -m backend.scripts.eval_intent_classifier --holdout 0.3
+"""
+
+import time
+import random
+import argparse
+
+import numpy as np
+
+from backend.services.embedding_backends import get_embedder
+from backend.services.intent_classifier import (
+    INTENT_LOG,
+    IntentClassifier,
+    load_logged_turns,
+)
+
+# --- CONFIG ---
+MARGINS = [0.0, 0.1, 0.2, 0.3, 0.4, 0.5]
+MIN_TEST_TURNS = 20
+
+
+def percentiles(values: list) -> str:
+    if not values:
+        return "     -      -"
+    values = sorted(values)
+    p50 = values[len(values) // 2]
+    p95 = values[min(len(values) - 1, int(0.95 * len(values)))]
+    return f"{p50:>6.1f} {p95:>6.1f}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local intent classifier eval")
+    parser.add_argument("--log", default=str(INTENT_LOG))
+    parser.add_argument("--holdout", type=float, default=0.3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--backend", default=None, help="RAG_EMBEDDING_BACKEND")
+    args = parser.parse_args()
+
+    turns = load_logged_turns(args.log)
+    random.Random(args.seed).shuffle(turns)
+    split = int(len(turns) * (1 - args.holdout))
+    train, test = turns[:split], turns[split:]
+    if len(test) < MIN_TEST_TURNS:
+        print(
+            f"Only {len(test)} held-out turns in {args.log} "
+            f"(need {MIN_TEST_TURNS}): let the LLM label more turns first."
+        )
+        return
+
+    embedder = get_embedder(args.backend)
+    classifier = IntentClassifier(embedder.encode, labelled=train)
+    classifier.predict(test[0]["text"])  # first call pays one-off setup
+
+    predictions, latencies = [], []
+    for turn in test:
+        started = time.perf_counter()
+        predictions.append(classifier.predict(turn["text"]))
+        latencies.append((time.perf_counter() - started) * 1000)
+
+    correct = np.array([p["intent"] == t["intent"] for p, t in zip(predictions, test)])
+    margins = np.array([p["margin"] for p in predictions])
+    llm_latencies = [t["latency_ms"] for t in test if t.get("latency_ms") is not None]
+
+    print(
+        f"{len(train)} training turns, {len(test)} held out, "
+        f"{classifier.size} examples, temperature={classifier.temperature}"
+    )
+    print(f"Agreement with the LLM (every turn local): {correct.mean():.1%}")
+    print(f"{'latency':<8}{'p50 ms':>7}{'p95 ms':>7}")
+    print(f"{'local':<8}{percentiles(latencies)}")
+    print(f"{'llm':<8}{percentiles(llm_latencies)}")
+
+    print(f"\n{'margin':>6}{'local':>8}{'agree':>8}")
+    for margin in MARGINS:
+        local = margins >= margin
+        agree = f"{correct[local].mean():.1%}" if local.any() else "-"
+        print(f"{margin:>6.2f}{local.mean():>8.1%}{agree:>8}")
+
+    print(f"\n{'intent':<10}{'turns':>6}{'agree':>8}")
+    for intent in classifier.labels:
+        rows = np.array([t["intent"] == intent for t in test])
+        if rows.any():
+            print(f"{intent:<10}{rows.sum():>6}{correct[rows].mean():>8.1%}")
+
+
+if __name__ == "__main__":
+    main()
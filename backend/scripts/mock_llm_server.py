@@ -0,0 +1,128 @@
+"""
+Local OpenAI-compatible chat-completions server for latency testing.
+
+Serves POST .../chat/completions, both blocking and `"stream": true` (SSE),
+with a configurable first-token delay and per-token delay so streaming can be
+compared against blocking completions without calling Groq.
+
+Usage:
+    python backend/scripts/mock_llm_server.py --port 8089
+    LLM_API_BASE=http://127.0.0.1:8089/v1 GROQ_API_KEY=mock uvicorn backend.main:app
+"""
+
+import json
+import time
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# --- CONFIG ---
+DEFAULT_PORT = 8089
+FIRST_TOKEN_DELAY = 0.35  # seconds before the first token (prefill)
+TOKEN_DELAY = 0.03  # seconds between tokens (decode)
+RESPONSE_TEXT = (
+    "Pour déclarer un sinistre, contactez votre assureur dans les cinq jours ouvrés. "
+    "Préparez une description des faits, des photos et vos justificatifs. "
+    "Un agent pourra vous donner les détails de votre contrat spécifique."
+)
+
+
+def tokenize(text: str) -> list[str]:
+    """Split into word-like tokens that keep their leading space, like BPE deltas."""
+    words = text.split(" ")
+    return [words[0]] + [" " + w for w in words[1:]]
+
+
+class MockLLMHandler(BaseHTTPRequestHandler):
+    first_token_delay = FIRST_TOKEN_DELAY
+    token_delay = TOKEN_DELAY
+    response_text = RESPONSE_TEXT
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        if not self.path.endswith("/chat/completions"):
+            self.send_error(404)
+            return
+
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            payload = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            self.send_error(400)
+            return
+
+        if payload.get("stream"):
+            self._stream(payload)
+        else:
+            self._complete(payload)
+
+    def _complete(self, payload):
+        tokens = tokenize(self.response_text)
+        time.sleep(self.first_token_delay + self.token_delay * len(tokens))
+        body = json.dumps(
+            {
+                "model": payload.get("model", "mock"),
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": self.response_text},
+                        "finish_reason": "stop",
+                    }
+                ],
+            }
+        ).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _stream(self, payload):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+
+        time.sleep(self.first_token_delay)
+        try:
+            for token in tokenize(self.response_text):
+                chunk = {
+                    "model": payload.get("model", "mock"),
+                    "choices": [{"index": 0, "delta": {"content": token}}],
+                }
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+                self.wfile.flush()
+                time.sleep(self.token_delay)
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            # Client stopped reading (e.g. sentence limit reached)
+            pass
+
+
+def start_server(port: int = DEFAULT_PORT, background: bool = False):
+    """Start the mock server; in background mode return it running on a thread."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), MockLLMHandler)
+    if background:
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+    print(f"Mock LLM server on http://127.0.0.1:{port}/v1/chat/completions")
+    server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock OpenAI-compatible LLM server")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--first-token-delay", type=float, default=FIRST_TOKEN_DELAY)
+    parser.add_argument("--token-delay", type=float, default=TOKEN_DELAY)
+    args = parser.parse_args()
+
+    MockLLMHandler.first_token_delay = args.first_token_delay
+    MockLLMHandler.token_delay = args.token_delay
+    start_server(args.port)
+
+
+if __name__ == "__main__":
+    main()
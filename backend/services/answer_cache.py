@@ -0,0 +1,170 @@
+import os
+import re
+import time
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from backend.services.phrase_bank import PHRASES
+from backend.services.rag_service import normalize_query
+
+# Claims go through escalation paths: their answers are never reused
+NEVER_CACHED = {"CLAIM"}
+DEFAULT_EXCLUDED = "CLAIM,LEGAL_ISSUE,CONTRACT_CANCELLATION,UNKNOWN"
+
+# Questions about this caller's own file (numbers, e-mail, "mon dossier")
+PERSONAL_MARKERS = re.compile(
+    r"\d|@|\b(dossier|num[ée]ro|r[ée]f[ée]rence|matricule)\b", re.IGNORECASE
+)
+# References to earlier turns, only meaningful once the call has history
+ANAPHORA_MARKERS = re.compile(
+    r"\b(ça|cela|celui-ci|celle-ci|ceux-ci|le même|la même|les mêmes|"
+    r"précédent|précédente|précédemment|tout à l'heure|comme je)\b",
+    re.IGNORECASE,
+)
+# Canned answers (LLM fallbacks, safety redirect) are never stored
+FIXED_ANSWERS = set(PHRASES.values())
+
+
+class SemanticAnswerCache:
+    """
+    Reuse LLM answers for near-duplicate FAQ questions.
+
+    Keyed by the query embedding RAGService already computes for retrieval:
+    a question within `threshold` cosine similarity of a cached question with
+    the same intent gets the stored answer, whose sentences are then already
+    in the TTS cache. Only context-free turns take part: no personal
+    identifiers in the question, no references to earlier turns, and answers
+    are only stored when they were generated without conversation history.
+    Entries are dropped when the retrieval corpus changes.
+    """
+
+    def __init__(
+        self,
+        embed,
+        generation=None,
+        threshold: float = None,
+        max_entries: int = None,
+        ttl_s: float = None,
+        excluded_intents=None,
+    ):
+        self.embed = embed
+        self.generation = generation or (lambda: 0)
+        self.enabled = os.getenv("ANSWER_CACHE", "1") != "0"
+        self.threshold = threshold or float(os.getenv("ANSWER_CACHE_THRESHOLD", "0.92"))
+        self.max_entries = max_entries or int(os.getenv("ANSWER_CACHE_SIZE", "500"))
+        self.ttl_s = ttl_s or float(os.getenv("ANSWER_CACHE_TTL_S", "86400"))
+        if excluded_intents is None:
+            excluded_intents = os.getenv("ANSWER_CACHE_EXCLUDE", DEFAULT_EXCLUDED)
+            excluded_intents = [i.strip() for i in excluded_intents.split(",")]
+        self.excluded_intents = set(excluded_intents) | NEVER_CACHED
+
+        self._entries = OrderedDict()  # normalized question -> entry
+        self._lock = threading.Lock()
+        self._generation = self.generation()
+        self.stats = {
+            "lookups": 0,
+            "hits": 0,
+            "misses": 0,
+            "skipped_intent": 0,
+            "skipped_context": 0,
+            "stores": 0,
+            "evictions": 0,
+            "expired": 0,
+        }
+
+    def _skip_reason(self, user_text: str, intent: str, history: str):
+        if intent in self.excluded_intents:
+            return "skipped_intent"
+        if PERSONAL_MARKERS.search(user_text):
+            return "skipped_context"
+        if history and ANAPHORA_MARKERS.search(user_text):
+            return "skipped_context"
+        return None
+
+    def _check_generation(self):
+        """Drop every entry once the retrieval corpus has changed (lock held)."""
+        generation = self.generation()
+        if generation != self._generation:
+            self._entries.clear()
+            self._generation = generation
+
+    def _live_entries(self, intent: str):
+        now = time.monotonic()
+        for key, entry in list(self._entries.items()):
+            if now - entry["created"] > self.ttl_s:
+                del self._entries[key]
+                self.stats["expired"] += 1
+            elif entry["intent"] == intent:
+                yield key, entry
+
+    def lookup(self, user_text: str, intent: str, history: str = ""):
+        """Cached answer for a near-duplicate question, or None."""
+        if not self.enabled:
+            return None
+        reason = self._skip_reason(user_text, intent, history)
+        if reason:
+            with self._lock:
+                self.stats["lookups"] += 1
+                self.stats[reason] += 1
+            return None
+
+        query = np.asarray(self.embed(user_text), dtype=np.float32)
+        with self._lock:
+            self.stats["lookups"] += 1
+            self._check_generation()
+            candidates = list(self._live_entries(intent))
+            if candidates:
+                matrix = np.stack([entry["embedding"] for _, entry in candidates])
+                scores = matrix @ query
+                best = int(np.argmax(scores))
+                if scores[best] >= self.threshold:
+                    key, entry = candidates[best]
+                    self._entries.move_to_end(key)
+                    entry["hits"] += 1
+                    self.stats["hits"] += 1
+                    print(
+                        f"[ANSWER_CACHE] Hit ({scores[best]:.3f}): "
+                        f"'{user_text}' ~ '{entry['question']}'"
+                    )
+                    return entry["answer"]
+            self.stats["misses"] += 1
+        return None
+
+    def store(self, user_text: str, intent: str, history: str, answer: str):
+        """Remember a freshly generated answer for a context-free question."""
+        if not self.enabled or not answer or history:
+            return
+        if self._skip_reason(user_text, intent, history):
+            return
+        if any(phrase in answer for phrase in FIXED_ANSWERS):
+            return
+
+        embedding = np.asarray(self.embed(user_text), dtype=np.float32)
+        with self._lock:
+            self._check_generation()
+            self._entries[normalize_query(user_text)] = {
+                "embedding": embedding,
+                "intent": intent,
+                "question": user_text,
+                "answer": answer,
+                "created": time.monotonic(),
+                "hits": 0,
+            }
+            self.stats["stores"] += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats["evictions"] += 1
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            stats, size = dict(self.stats), len(self._entries)
+        answered = stats["hits"] + stats["misses"]
+        return {
+            **stats,
+            "enabled": self.enabled,
+            "size": size,
+            "hit_rate": stats["hits"] / answered if answered else 0.0,
+            "threshold": self.threshold,
+        }
@@ -0,0 +1,218 @@
+import os
+import time
+import queue
+import asyncio
+import threading
+from concurrent.futures import Future
+
+from backend.services.asr_service import ASRService
+from backend.utils.metrics import Histogram
+
+
+class _Job:
+    __slots__ = (
+        "audio",
+        "beam_size",
+        "language",
+        "initial_prompt",
+        "vad_filter",
+        "future",
+        "enqueued",
+    )
+
+    def __init__(self, audio, beam_size, language, initial_prompt, vad_filter):
+        self.audio = audio
+        self.beam_size = beam_size
+        self.language = language
+        self.initial_prompt = initial_prompt
+        self.vad_filter = vad_filter
+        self.future = Future()
+        self.enqueued = time.perf_counter()
+
+
+class ASRScheduler:
+    """
+    Dynamic-batching front for a shared ASRService.
+
+    Utterances from all calls go into one queue. A dispatcher thread takes
+    the oldest request, waits at most `max_wait_ms` for others to arrive (or
+    takes whatever is already queued), and runs them through one batched
+    encoder pass of up to `max_batch_size`. Each request gets its own future.
+
+    The backend is an in-process ASRService or an ASRWorkerPool; with a pool,
+    one dispatcher per worker keeps every process busy.
+
+    It exposes the ASRService transcription methods, so it can be passed
+    wherever an ASRService is expected. Final turns keep `transcribe_voice`'s
+    Silero VAD trimming; word-timestamp decodes (streaming partials) are not
+    batchable and go straight to the model.
+    """
+
+    def __init__(
+        self,
+        asr: ASRService,
+        max_batch_size: int = None,
+        max_wait_ms: float = None,
+        dispatchers: int = 1,
+    ):
+        self.asr = asr
+        self.max_batch_size = max_batch_size or int(os.getenv("ASR_BATCH_SIZE", "8"))
+        self.max_wait = (
+            max_wait_ms
+            if max_wait_ms is not None
+            else float(os.getenv("ASR_BATCH_MAX_WAIT_MS", "30"))
+        ) / 1000
+
+        self._queue = queue.Queue()
+        self.cancelled = 0  # jobs dropped because their caller gave up
+        self.queue_depth = Histogram([0, 1, 2, 4, 8, 16, 32, 64])
+        self.batch_size = Histogram(range(1, self.max_batch_size + 1))
+        self.wait_ms = Histogram([5, 10, 25, 50, 100, 250, 500, 1000, 2500])
+        self.batch_ms = Histogram([50, 100, 250, 500, 1000, 2000, 4000, 8000])
+
+        # One dispatcher per backend that can decode concurrently (pool workers)
+        self._threads = [
+            threading.Thread(
+                target=self._dispatch_loop, name=f"asr-scheduler-{i}", daemon=True
+            )
+            for i in range(dispatchers)
+        ]
+        for thread in self._threads:
+            thread.start()
+        print(
+            f"[ASR][SCHED] max_batch_size={self.max_batch_size} "
+            f"max_wait={self.max_wait * 1000:.0f} ms"
+        )
+
+    # ─────────────────────────────────────────────────────────────
+    # Submission
+    # ─────────────────────────────────────────────────────────────
+    def submit(
+        self,
+        audio,
+        beam_size: int = 3,
+        language: str = None,
+        initial_prompt=None,
+        vad_filter: bool = False,
+    ) -> Future:
+        """Queue one utterance; the future resolves to a `transcribe_batch` result."""
+        job = _Job(audio, beam_size, language, initial_prompt, vad_filter)
+        self._queue.put(job)
+        return job.future
+
+    def transcribe_voice(self, audio) -> dict:
+        """Blocking, batched `ASRService.transcribe_voice` (file paths bypass batching)."""
+        if isinstance(audio, str):
+            return self.asr.transcribe_voice(audio)
+        return self.submit(audio, vad_filter=True).result()
+
+    async def atranscribe_voice(self, audio) -> dict:
+        """Await a batched transcription without blocking the event loop."""
+        if isinstance(audio, str):
+            return await asyncio.to_thread(self.asr.transcribe_voice, audio)
+        return await asyncio.wrap_future(self.submit(audio, vad_filter=True))
+
+    def transcribe_window(
+        self,
+        audio,
+        beam_size: int = 1,
+        language: str = None,
+        initial_prompt: str = None,
+        word_timestamps: bool = False,
+    ) -> dict:
+        """Blocking `ASRService.transcribe_window`, batched unless word timings are needed."""
+        if word_timestamps:
+            return self.asr.transcribe_window(
+                audio,
+                beam_size=beam_size,
+                language=language,
+                initial_prompt=initial_prompt,
+                word_timestamps=True,
+            )
+        return self.submit(audio, beam_size, language, initial_prompt).result()
+
+    # ─────────────────────────────────────────────────────────────
+    # Dispatcher thread
+    # ─────────────────────────────────────────────────────────────
+    def _collect_batch(self, first: _Job) -> list:
+        self.queue_depth.observe(self._queue.qsize() + 1)
+        batch = [first]
+        deadline = first.enqueued + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                job = (
+                    self._queue.get(timeout=remaining)
+                    if remaining > 0
+                    else self._queue.get_nowait()
+                )
+            except queue.Empty:
+                break
+            batch.append(job)
+        return batch
+
+    def _dispatch_loop(self):
+        while True:
+            batch = self._collect_batch(self._queue.get())
+            try:
+                self._run_batch(batch)
+            except Exception as e:
+                # One bad batch must not take the dispatcher (and every later job) down
+                print(f"[ASR][SCHED] Dispatcher error on a batch of {len(batch)}: {e}")
+                for job in batch:
+                    if not job.future.done():
+                        job.future.set_exception(e)
+
+    def _run_batch(self, batch: list):
+        dispatched = time.perf_counter()
+        for job in batch:
+            self.wait_ms.observe((dispatched - job.enqueued) * 1000)
+
+        # A caller that gave up (barge-in, disconnect, shutdown) cancelled its
+        # future; the others are marked running and can no longer be cancelled
+        live = [job for job in batch if job.future.set_running_or_notify_cancel()]
+        self.cancelled += len(batch) - len(live)
+
+        # One decode per beam size (beam search width is per batch), with VAD
+        # trimming for final turns only: partial windows are endpointed upstream
+        groups = {}
+        for job in live:
+            groups.setdefault((job.beam_size, job.vad_filter), []).append(job)
+
+        for (beam_size, vad_filter), jobs in groups.items():
+            self.batch_size.observe(len(jobs))
+            started = time.perf_counter()
+            try:
+                results = self.asr.transcribe_batch(
+                    [job.audio for job in jobs],
+                    beam_size=beam_size,
+                    languages=[job.language for job in jobs],
+                    initial_prompts=[job.initial_prompt for job in jobs],
+                    vad_filter=vad_filter,
+                )
+            except Exception as e:
+                print(f"[ASR][SCHED] Batch of {len(jobs)} failed: {e}")
+                for job in jobs:
+                    job.future.set_exception(e)
+                continue
+            self.batch_ms.observe((time.perf_counter() - started) * 1000)
+            for job, result in zip(jobs, results):
+                job.future.set_result(result)
+
+    # ─────────────────────────────────────────────────────────────
+    # Monitoring
+    # ─────────────────────────────────────────────────────────────
+    def get_stats(self) -> dict:
+        stats = {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": round(self.max_wait * 1000),
+            "queued": self._queue.qsize(),
+            "cancelled": self.cancelled,
+            "queue_depth": self.queue_depth.snapshot(),
+            "batch_size": self.batch_size.snapshot(),
+            "wait_ms": self.wait_ms.snapshot(),
+            "batch_ms": self.batch_ms.snapshot(),
+        }
+        if hasattr(self.asr, "get_stats"):
+            stats["workers"] = self.asr.get_stats()
+        return stats
@@ -1,10 +1,20 @@
 from faster_whisper import WhisperModel
+from faster_whisper.audio import pad_or_trim
+from faster_whisper.tokenizer import Tokenizer
+from faster_whisper.vad import VadOptions, get_speech_timestamps
+import numpy as np
 import math
 import torch
 
+SAMPLE_RATE = 16000
+MAX_WINDOW_SECONDS = 30  # Whisper encoder input; longer audio is not batched
+MAX_DECODE_LENGTH = 448
+# Same Silero VAD settings as `transcribe_voice`
+VAD_PARAMETERS = dict(min_silence_duration_ms=1500, threshold=0.5)
+
 
 class ASRService:
-    def __init__(self, model_name="small"):
+    def __init__(self, model_name="small", cpu_threads=4, num_workers=2):
         # Check if CUDA is available for GPU acceleration
         device = "cuda" if torch.cuda.is_available() else "cpu"
         compute_type = "float16" if device == "cuda" else "int8"
@@ -15,23 +25,24 @@ class ASRService:
             model_name,
             device=device,
             compute_type=compute_type,
-            num_workers=2,
-            cpu_threads=4,
+            num_workers=num_workers,
+            cpu_threads=cpu_threads,
         )
         self._last_confidence = 0.0
 
-    def transcribe_voice(self, audio_path: str) -> dict:
-        """Optimized transcription with faster settings."""
+    def transcribe_voice(self, audio) -> dict:
+        """
+        Optimized transcription with faster settings.
+
+        `audio` is a 16 kHz mono float32 NumPy array (a file path also works).
+        """
         segments, info = self.model.transcribe(
-            audio_path,
+            audio,
             beam_size=3,
             best_of=3,
             temperature=0.0,
             vad_filter=True,
-            vad_parameters=dict(
-                min_silence_duration_ms=1500,
-                threshold=0.5,
-            ),
+            vad_parameters=VAD_PARAMETERS,
             word_timestamps=False,
         )
 
@@ -61,6 +72,188 @@ class ASRService:
             "confidence": round(confidence, 2),
         }
 
+    def transcribe_window(
+        self,
+        audio,
+        beam_size: int = 1,
+        language: str = None,
+        initial_prompt: str = None,
+        word_timestamps: bool = False,
+    ) -> dict:
+        """
+        Transcribe one window of a streamed utterance (16 kHz float32 array).
+
+        Endpointing is done upstream, so the internal VAD filter is off. Returns
+        the text, per-segment timing/log-probs and, optionally, word timings
+        used to commit the stable prefix of the window.
+        """
+        segments, info = self.model.transcribe(
+            audio,
+            beam_size=beam_size,
+            best_of=1,
+            temperature=0.0,
+            language=language,
+            initial_prompt=initial_prompt,
+            vad_filter=False,
+            word_timestamps=word_timestamps,
+            condition_on_previous_text=False,
+        )
+
+        seg_list = []
+        for segment in segments:
+            seg_list.append(
+                {
+                    "start": segment.start,
+                    "end": segment.end,
+                    "text": segment.text,
+                    "avg_logprob": segment.avg_logprob,
+                    "words": [
+                        {
+                            "start": w.start,
+                            "end": w.end,
+                            "word": w.word,
+                            "probability": w.probability,
+                        }
+                        for w in (segment.words or [])
+                    ],
+                }
+            )
+
+        return {
+            "text": " ".join(s["text"] for s in seg_list).strip(),
+            "language": info.language if info and info.language else "fr",
+            "segments": seg_list,
+        }
+
+    def transcribe_batch(
+        self,
+        audios: list,
+        beam_size: int = 3,
+        languages: list = None,
+        initial_prompts: list = None,
+        vad_filter: bool = False,
+    ) -> list[dict]:
+        """
+        Transcribe several utterances (16 kHz float32 arrays) with one batched
+        encoder pass and one batched decode. Results have the same shape as
+        `transcribe_window` (one segment, no word timings) plus `confidence`.
+
+        With `vad_filter`, non-speech is trimmed from each utterance first, as
+        `transcribe_voice` does; leave it off for windows endpointed upstream.
+        Utterances longer than 30 s do not fit one encoder window and are
+        transcribed on their own.
+        """
+        n = len(audios)
+        languages = languages or [None] * n
+        initial_prompts = initial_prompts or [None] * n
+        results = [None] * n
+        if vad_filter:
+            audios = [self.trim_non_speech(audio) for audio in audios]
+
+        batched = []
+        for i, audio in enumerate(audios):
+            if len(audio) == 0:
+                # No speech found: nothing to decode
+                results[i] = {
+                    "text": "",
+                    "language": languages[i] or "fr",
+                    "segments": [],
+                }
+            elif len(audio) > MAX_WINDOW_SECONDS * SAMPLE_RATE:
+                results[i] = self.transcribe_window(
+                    audio,
+                    beam_size=beam_size,
+                    language=languages[i],
+                    initial_prompt=initial_prompts[i],
+                )
+            else:
+                batched.append(i)
+
+        if batched:
+            features = np.stack(
+                [pad_or_trim(self.model.feature_extractor(audios[i])) for i in batched]
+            )
+            encoder_output = self.model.encode(features)
+
+            detected = {}
+            if any(languages[i] is None for i in batched):
+                for i, candidates in zip(
+                    batched, self.model.model.detect_language(encoder_output)
+                ):
+                    detected[i] = candidates[0][0][2:-2]
+
+            tokenizers, prompts = [], []
+            for i in batched:
+                tokenizer = Tokenizer(
+                    self.model.hf_tokenizer,
+                    self.model.model.is_multilingual,
+                    task="transcribe",
+                    language=languages[i] or detected[i],
+                )
+                tokenizers.append(tokenizer)
+                prompts.append(self._batch_prompt(tokenizer, initial_prompts[i]))
+
+            generated = self.model.model.generate(
+                encoder_output,
+                prompts,
+                beam_size=beam_size,
+                max_length=MAX_DECODE_LENGTH,
+                return_scores=True,
+                return_no_speech_prob=True,
+                suppress_blank=True,
+                suppress_tokens=[-1],
+            )
+
+            for i, tokenizer, result in zip(batched, tokenizers, generated):
+                tokens = result.sequences_ids[0]
+                # scores are length-normalised; same avg_logprob as model.transcribe
+                avg_logprob = result.scores[0] * len(tokens) / (len(tokens) + 1)
+                text = tokenizer.decode(tokens).strip()
+                if result.no_speech_prob > 0.6 and avg_logprob < -1.0:
+                    text = ""
+                results[i] = {
+                    "text": text,
+                    "language": tokenizer.language_code,
+                    "segments": [
+                        {
+                            "start": 0.0,
+                            "end": len(audios[i]) / SAMPLE_RATE,
+                            "text": text,
+                            "avg_logprob": avg_logprob,
+                            "words": [],
+                        }
+                    ],
+                }
+
+        for result in results:
+            logprobs = [
+                s["avg_logprob"]
+                for s in result["segments"]
+                if s["avg_logprob"] is not None
+            ]
+            confidence = (
+                self.calibrate_confidence(sum(logprobs) / len(logprobs))
+                if logprobs and result["text"]
+                else 0.0
+            )
+            result["confidence"] = round(confidence, 2)
+        return results
+
+    @staticmethod
+    def trim_non_speech(audio) -> np.ndarray:
+        """Keep only the speech chunks Silero VAD finds (the `vad_filter` step)."""
+        chunks = get_speech_timestamps(audio, VadOptions(**VAD_PARAMETERS))
+        if not chunks:
+            return audio[:0]
+        return np.concatenate([audio[c["start"] : c["end"]] for c in chunks])
+
+    def _batch_prompt(self, tokenizer: Tokenizer, initial_prompt: str = None) -> list:
+        prompt = []
+        if initial_prompt:
+            previous = tokenizer.encode(" " + initial_prompt.strip())
+            prompt = [tokenizer.sot_prev] + previous[-(MAX_DECODE_LENGTH // 2 - 1) :]
+        return prompt + list(tokenizer.sot_sequence) + [tokenizer.no_timestamps]
+
     def get_confidence(self) -> float:
         return round(self._last_confidence, 2)
 
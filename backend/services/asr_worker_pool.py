@@ -0,0 +1,278 @@
+import os
+import time
+import queue
+import threading
+import itertools
+import multiprocessing as mp
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from backend.utils.audio_utils import decode_audio_bytes
+
+
+def _worker_main(tasks, results, model_name: str, cpu_threads: int):
+    """ASR worker process: one WhisperModel, jobs in, small result dicts out."""
+    from backend.services.asr_service import ASRService
+
+    asr = ASRService(model_name, cpu_threads=cpu_threads, num_workers=1)
+    pid = os.getpid()
+    results.put(("ready", pid, None))
+
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+        job_id, method, shm_name, lengths, kwargs = task
+        results.put(("started", job_id, pid))
+
+        # Spawned workers share the parent's resource tracker; the parent unlinks
+        shm = shared_memory.SharedMemory(name=shm_name)
+        audios = data = None
+        try:
+            data = np.ndarray((sum(lengths),), dtype=np.float32, buffer=shm.buf)
+            offsets = np.cumsum([0, *lengths])
+            audios = [data[a:b] for a, b in zip(offsets[:-1], offsets[1:])]
+
+            if method == "transcribe_batch":
+                payload = asr.transcribe_batch(audios, **kwargs)
+            elif method == "transcribe_window":
+                payload = asr.transcribe_window(audios[0], **kwargs)
+            else:
+                payload = asr.transcribe_voice(audios[0])
+            results.put(("done", job_id, payload))
+        except Exception as e:
+            results.put(("error", job_id, f"{type(e).__name__}: {e}"))
+        finally:
+            # Views must be released before the mapping can be closed
+            audios = data = None
+            shm.close()
+
+
+class ASRWorkerPool:
+    """
+    Whisper inference in separate processes, each holding its own WhisperModel,
+    so decoding never competes with the event loop for the GIL.
+
+    PCM is handed over through `multiprocessing.shared_memory` (only the
+    segment name and lengths are pickled) and results come back as small dicts
+    on a result queue. Exposes the ASRService transcription methods (blocking,
+    callable from worker threads) so it can back the ASRScheduler.
+    """
+
+    def __init__(
+        self,
+        num_workers: int = None,
+        model_name: str = "small",
+        cpu_threads: int = None,
+    ):
+        self.num_workers = num_workers or int(os.getenv("ASR_WORKERS", "2"))
+        self.model_name = model_name
+        self.cpu_threads = cpu_threads or int(
+            os.getenv(
+                "ASR_WORKER_THREADS",
+                str(max(1, (os.cpu_count() or 4) // self.num_workers)),
+            )
+        )
+
+        self._ctx = mp.get_context("spawn")  # no fork of a threaded server
+        self._results = self._ctx.Queue()
+        self._ids = itertools.count()
+        self._pending = {}  # job_id -> (future, shared memory)
+        self._owners = {}  # job_id -> pid of the worker it was sent to
+        self._running = {}  # job_id -> worker pid
+        self._lock = threading.Lock()
+        self._closed = False
+        # A job not resolved by then fails instead of blocking its caller
+        self.job_timeout = float(os.getenv("ASR_JOB_TIMEOUT_S", "60"))
+
+        # One task queue per worker: a worker killed inside `get()` keeps its
+        # queue's lock, so a shared queue would block every replacement
+        self._tasks = [None] * self.num_workers
+        self._workers = [self._spawn(i) for i in range(self.num_workers)]
+        self._reader = threading.Thread(
+            target=self._read_results, name="asr-pool-results", daemon=True
+        )
+        self._reader.start()
+        print(
+            f"[ASR][POOL] {self.num_workers} worker processes "
+            f"x {self.cpu_threads} threads (model={model_name})"
+        )
+
+    def _spawn(self, index: int):
+        tasks = self._ctx.Queue()
+        process = self._ctx.Process(
+            target=_worker_main,
+            args=(tasks, self._results, self.model_name, self.cpu_threads),
+            daemon=True,
+        )
+        process.start()
+        self._tasks[index] = tasks
+        return process
+
+    # ─────────────────────────────────────────────────────────────
+    # Submission (any thread)
+    # ─────────────────────────────────────────────────────────────
+    def submit(self, method: str, audios: list, **kwargs) -> Future:
+        audios = [np.ascontiguousarray(a, dtype=np.float32) for a in audios]
+        lengths = [len(a) for a in audios]
+        shm = shared_memory.SharedMemory(create=True, size=max(1, sum(lengths) * 4))
+        data = np.ndarray((sum(lengths),), dtype=np.float32, buffer=shm.buf)
+        offset = 0
+        for audio in audios:
+            data[offset : offset + len(audio)] = audio
+            offset += len(audio)
+        del data
+
+        future = Future()
+        job_id = next(self._ids)
+        future.job_id = job_id
+        with self._lock:
+            # Least-loaded worker; its pid owns the job until it is resolved
+            load = [0] * self.num_workers
+            index = {p.pid: i for i, p in enumerate(self._workers)}
+            for pid in self._owners.values():
+                if pid in index:
+                    load[index[pid]] += 1
+            worker = min(range(self.num_workers), key=load.__getitem__)
+            self._pending[job_id] = (future, shm)
+            self._owners[job_id] = self._workers[worker].pid
+            self._tasks[worker].put((job_id, method, shm.name, lengths, kwargs))
+        return future
+
+    def _result(self, future: Future):
+        try:
+            return future.result(timeout=self.job_timeout)
+        except FutureTimeout:
+            self._finish(
+                future.job_id, error=f"ASR job timed out after {self.job_timeout:.0f}s"
+            )
+            return future.result()
+
+    def transcribe_batch(
+        self,
+        audios,
+        beam_size=3,
+        languages=None,
+        initial_prompts=None,
+        vad_filter=False,
+    ) -> list[dict]:
+        return self._result(
+            self.submit(
+                "transcribe_batch",
+                audios,
+                beam_size=beam_size,
+                languages=languages,
+                initial_prompts=initial_prompts,
+                vad_filter=vad_filter,
+            )
+        )
+
+    def transcribe_window(self, audio, **kwargs) -> dict:
+        return self._result(self.submit("transcribe_window", [audio], **kwargs))
+
+    def transcribe_voice(self, audio) -> dict:
+        if isinstance(audio, str):
+            with open(audio, "rb") as f:
+                audio = decode_audio_bytes(f.read())
+        return self._result(self.submit("transcribe_voice", [audio]))
+
+    # ─────────────────────────────────────────────────────────────
+    # Results (reader thread)
+    # ─────────────────────────────────────────────────────────────
+    def _finish(self, job_id, result=None, error=None):
+        with self._lock:
+            future, shm = self._pending.pop(job_id, (None, None))
+            self._owners.pop(job_id, None)
+            self._running.pop(job_id, None)
+        if shm is not None:
+            shm.close()
+            shm.unlink()
+        if future is None:
+            return
+        if error is not None:
+            future.set_exception(RuntimeError(error))
+        else:
+            future.set_result(result)
+
+    def _handle(self, kind, key, payload):
+        if kind == "ready":
+            print(f"[ASR][POOL] Worker {key} ready")
+        elif kind == "started":
+            with self._lock:
+                # A job already failed (timeout, dead worker) is not tracked again
+                if key in self._pending:
+                    self._running[key] = payload
+        elif kind == "done":
+            self._finish(key, result=payload)
+        elif kind == "error":
+            self._finish(key, error=payload)
+
+    def _drain_results(self) -> bool:
+        """Handle every queued result message; False once the queue is gone."""
+        while True:
+            try:
+                self._handle(*self._results.get_nowait())
+            except queue.Empty:
+                return True
+            except (EOFError, OSError):
+                return False
+
+    def _read_results(self):
+        last_check = time.monotonic()
+        while not self._closed:
+            if time.monotonic() - last_check > 1.0:
+                # Drain first, so results a dead worker sent are delivered
+                if not self._drain_results():
+                    break
+                self._replace_dead_workers()
+                last_check = time.monotonic()
+            try:
+                message = self._results.get(timeout=1.0)
+            except queue.Empty:
+                continue
+            except (EOFError, OSError):
+                break
+            self._handle(*message)
+
+    def _replace_dead_workers(self):
+        for i, process in enumerate(self._workers):
+            if process.is_alive() or self._closed:
+                continue
+            print(f"[ASR][POOL] Worker {process.pid} died (exit {process.exitcode})")
+            # Tasks still buffered for the dead worker must not block exit
+            self._tasks[i].cancel_join_thread()
+            with self._lock:
+                self._workers[i] = self._spawn(i)
+                # Queued or in flight, its jobs are gone with it (callers see an error)
+                lost = [j for j, pid in self._owners.items() if pid == process.pid]
+            for job_id in lost:
+                self._finish(job_id, error=f"ASR worker {process.pid} died")
+
+    # ─────────────────────────────────────────────────────────────
+    # Lifecycle
+    # ─────────────────────────────────────────────────────────────
+    def close(self):
+        self._closed = True
+        for tasks in self._tasks:
+            tasks.put(None)
+        for process in self._workers:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        with self._lock:
+            pending = list(self._pending)
+        for job_id in pending:
+            self._finish(job_id, error="ASR worker pool closed")
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            pending, running = len(self._pending), len(self._running)
+        return {
+            "workers": self.num_workers,
+            "alive": sum(p.is_alive() for p in self._workers),
+            "threads_per_worker": self.cpu_threads,
+            "pending": pending,
+            "running": running,
+        }
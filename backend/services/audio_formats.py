@@ -0,0 +1,92 @@
+import struct
+
+from backend.utils.audio_utils import (
+    decode_audio_bytes,
+    encode_opus_packets,
+    float32_to_pcm16,
+    pcm16_to_ulaw,
+)
+
+FRAME_MS = 20  # telephony packetization interval
+
+
+class OutputFormat:
+    """
+    Audio format a client asked for at `register_client` time.
+
+    `encode` turns a synthesized MP3 clip into the stored form (done once per
+    sentence, then cached by the TTS service) and `frames` cuts the stored
+    form into the fixed-duration frames sent over the WebSocket. MP3 is sent
+    as before, in byte chunks.
+    """
+
+    def __init__(self, name: str, codec: str, sample_rate: int = None):
+        self.name = name
+        self.codec = codec
+        self.sample_rate = sample_rate
+        self.frame_s = FRAME_MS / 1000 if codec != "mp3" else None
+
+    @property
+    def frame_bytes(self) -> int:
+        """Bytes per frame for constant-bitrate PCM codecs."""
+        bytes_per_sample = 2 if self.codec == "pcm16" else 1
+        return int(self.sample_rate * self.frame_s) * bytes_per_sample
+
+    def encode(self, mp3: bytes) -> bytes:
+        if self.codec == "mp3":
+            return mp3
+        samples = decode_audio_bytes(mp3, sample_rate=self.sample_rate)
+        if self.codec == "opus":
+            # Packets are variable-size: store them length-prefixed
+            return b"".join(
+                struct.pack(">H", len(packet)) + packet
+                for packet in encode_opus_packets(samples, self.sample_rate)
+            )
+        pcm = float32_to_pcm16(samples)
+        return pcm16_to_ulaw(pcm) if self.codec == "ulaw" else pcm
+
+    def frames(self, data: bytes, chunk_bytes: int) -> list[bytes]:
+        if self.codec == "mp3":
+            size = chunk_bytes
+        elif self.codec == "opus":
+            packets, offset = [], 0
+            while offset + 2 <= len(data):
+                (length,) = struct.unpack_from(">H", data, offset)
+                packets.append(data[offset + 2 : offset + 2 + length])
+                offset += 2 + length
+            return packets
+        else:
+            size = self.frame_bytes
+        frames = [data[i : i + size] for i in range(0, len(data), size)]
+        if self.codec != "mp3" and frames and len(frames[-1]) < size:
+            # Pad the last frame with silence so every frame is FRAME_MS long
+            silence = b"\x00\x00" if self.codec == "pcm16" else b"\xff"
+            missing = size - len(frames[-1])
+            frames[-1] += silence * (missing // len(silence))
+        return frames
+
+    def describe(self) -> dict:
+        return {
+            "name": self.name,
+            "codec": self.codec,
+            "sample_rate": self.sample_rate,
+            "frame_ms": FRAME_MS if self.frame_s else None,
+        }
+
+
+OUTPUT_FORMATS = {
+    "mp3": OutputFormat("mp3", "mp3"),
+    "pcm16_8k": OutputFormat("pcm16_8k", "pcm16", 8000),
+    "pcm16_16k": OutputFormat("pcm16_16k", "pcm16", 16000),
+    "ulaw_8k": OutputFormat("ulaw_8k", "ulaw", 8000),
+    "opus_16k": OutputFormat("opus_16k", "opus", 16000),
+    "opus_48k": OutputFormat("opus_48k", "opus", 48000),
+}
+DEFAULT_FORMAT = "mp3"
+
+
+def negotiate_format(requested: str = None) -> OutputFormat:
+    """Format for a client request, MP3 when missing or unsupported."""
+    if requested and requested not in OUTPUT_FORMATS:
+        print(f"[AUDIO] Unsupported output format '{requested}', using mp3")
+    return OUTPUT_FORMATS.get(requested or DEFAULT_FORMAT, OUTPUT_FORMATS["mp3"])
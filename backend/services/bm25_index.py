@@ -0,0 +1,159 @@
+import os
+import re
+import json
+import unicodedata
+from collections import Counter
+
+import numpy as np
+
+BM25_PATH = "backend/vectorstore/bm25.json"
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Common French function words (accents stripped, as after `tokenize`)
+FRENCH_STOPWORDS = set(
+    """
+    a au aux avec ce ces cet cette ceci cela ca dans de des du elle elles en
+    est et etre eux il ils je la le les leur leurs lui ma mais me meme mes moi
+    mon ne nos notre nous on ou par pas pour qu que qui sa se ses si son sont
+    sur ta te tes toi ton tu un une vos votre vous y ai as avez avons ont
+    suis es sommes etes etait sera fait faire peut puis peux dois doit quel
+    quelle quels quelles comment quoi ici tout tous toute toutes tres
+    plus moins sans sous entre chez apres avant aussi alors donc car bien
+    """.split()
+)
+TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def _strip_accents(text: str) -> str:
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def _stem(token: str) -> str:
+    """Light French stemming: plural endings only ("franchises" -> "franchise")."""
+    if len(token) > 4 and token.endswith(("s", "x")) and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase, accent-free, elision-split terms without stopwords."""
+    tokens = TOKEN.findall(_strip_accents(text.lower()))
+    return [
+        _stem(token)
+        for token in tokens
+        if len(token) > 1 and token not in FRENCH_STOPWORDS
+    ]
+
+
+def build_index(
+    ids: list, documents: list, path: str = BM25_PATH, sources: list = None
+) -> int:
+    """
+    Build the BM25 inverted index for `documents` and save it to `path`.
+    Each posting stores its final BM25 term weight, so a query is only a sum
+    of precomputed weights. `sources` (the PDF of each chunk) enables scoped
+    searches. Returns the vocabulary size.
+    """
+    term_counts = [Counter(tokenize(doc or "")) for doc in documents]
+    lengths = np.array([sum(c.values()) for c in term_counts], dtype=np.float64)
+    avgdl = float(lengths.mean()) if len(lengths) else 0.0
+
+    postings = {}
+    for doc, counts in enumerate(term_counts):
+        for term, tf in counts.items():
+            postings.setdefault(term, []).append((doc, tf))
+
+    n = len(documents)
+    terms = {}
+    for term, entries in postings.items():
+        idf = np.log(1 + (n - len(entries) + 0.5) / (len(entries) + 0.5))
+        docs = [doc for doc, _ in entries]
+        weights = [
+            round(
+                float(
+                    idf
+                    * tf
+                    * (BM25_K1 + 1)
+                    / (tf + BM25_K1 * (1 - BM25_B + BM25_B * lengths[doc] / avgdl))
+                ),
+                4,
+            )
+            for doc, tf in entries
+        ]
+        terms[term] = [docs, weights]
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "ids": list(ids),
+                "documents": list(documents),
+                "sources": list(sources) if sources is not None else None,
+                "terms": terms,
+            },
+            f,
+            ensure_ascii=False,
+        )
+    os.replace(tmp, path)
+    print(f"[RAG][BM25] Indexed {n} chunks, {len(terms)} terms -> {path}")
+    return len(terms)
+
+
+class BM25Index:
+    """Precomputed French BM25 index loaded from `build_index` output."""
+
+    def __init__(self, path: str = BM25_PATH):
+        self.path = path
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        self.ids = data["ids"]
+        self.documents = data["documents"]
+        self.source_rows = {}  # source -> row numbers
+        for row, source in enumerate(data.get("sources") or []):
+            self.source_rows.setdefault(source, []).append(row)
+        self.terms = {
+            term: (np.asarray(docs, dtype=np.int64), np.asarray(weights))
+            for term, (docs, weights) in data["terms"].items()
+        }
+
+    @staticmethod
+    def exists(path: str = BM25_PATH) -> bool:
+        return os.path.exists(path)
+
+    @staticmethod
+    def version(path: str = BM25_PATH) -> float:
+        return os.path.getmtime(path) if os.path.exists(path) else 0.0
+
+    def __len__(self):
+        return len(self.ids)
+
+    def search(self, query: str, k: int = 10, sources=None) -> list[int]:
+        """Row numbers of the top-k BM25 matches, best first, optionally within `sources`."""
+        scores = np.zeros(len(self.ids))
+        for term in set(tokenize(query)):
+            posting = self.terms.get(term)
+            if posting is not None:
+                scores[posting[0]] += posting[1]
+        if sources is not None and self.source_rows:
+            allowed = [row for s in sources for row in self.source_rows.get(s, [])]
+            scoped = np.zeros(len(self.ids))
+            scoped[allowed] = scores[allowed]
+            scores = scoped
+        matched = np.flatnonzero(scores)
+        if not len(matched):
+            return []
+        k = min(k, len(matched))
+        top = matched[np.argpartition(-scores[matched], k - 1)[:k]]
+        return top[np.argsort(-scores[top])].tolist()
+
+
+def reciprocal_rank_fusion(rankings: list[list], k: int, constant: int = 60) -> list:
+    """Merge ranked id lists: score(id) = sum of 1 / (constant + rank)."""
+    scores = {}
+    for ranking in rankings:
+        for rank, item in enumerate(ranking):
+            scores[item] = scores.get(item, 0.0) + 1.0 / (constant + rank + 1)
+    return sorted(scores, key=scores.get, reverse=True)[:k]
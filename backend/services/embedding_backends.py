@@ -0,0 +1,146 @@
+import os
+from pathlib import Path
+
+import numpy as np
+
+DEFAULT_MODEL = "sentence-transformers/all-mpnet-base-v2"
+ONNX_DIR = "backend/vectorstore/onnx"
+MAX_SEQ_LENGTH = 384  # all-mpnet-base-v2 training length
+
+
+def _default_threads() -> int:
+    return int(os.getenv("RAG_EMBEDDING_THREADS", str(min(4, os.cpu_count() or 1))))
+
+
+class TorchEmbedder:
+    """The sentence-transformers model as trained (PyTorch, float32)."""
+
+    name = "torch"
+
+    def __init__(self, model_name: str = DEFAULT_MODEL, threads: int = None):
+        import torch
+        from sentence_transformers import SentenceTransformer
+
+        torch.set_num_threads(threads or _default_threads())
+        self.model = SentenceTransformer(model_name)
+
+    def encode(self, texts: list[str], batch_size: int = 32) -> np.ndarray:
+        """L2-normalized float32 embeddings, one row per text."""
+        return self.model.encode(
+            texts, batch_size=batch_size, normalize_embeddings=True
+        ).astype(np.float32)
+
+
+class OnnxEmbedder:
+    """
+    The same encoder exported to ONNX and run by onnxruntime, optionally with
+    int8 dynamic quantization. Mean pooling and normalization reproduce the
+    sentence-transformers pipeline, so vectors are comparable with the
+    PyTorch model's. The export is done once and kept under ONNX_DIR.
+    """
+
+    def __init__(
+        self,
+        model_name: str = DEFAULT_MODEL,
+        quantize: bool = False,
+        threads: int = None,
+        onnx_dir: str = ONNX_DIR,
+    ):
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        self.name = "onnx-int8" if quantize else "onnx"
+        self.model_dir = Path(onnx_dir) / model_name.replace("/", "__")
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+
+        model_path = self.model_dir / "model.onnx"
+        if not model_path.exists():
+            self._export(model_name, model_path)
+        if quantize:
+            quantized_path = self.model_dir / "model_int8.onnx"
+            if not quantized_path.exists():
+                from onnxruntime.quantization import QuantType, quantize_dynamic
+
+                print(f"[RAG][ONNX] Quantizing to int8: {quantized_path}")
+                quantize_dynamic(
+                    str(model_path), str(quantized_path), weight_type=QuantType.QInt8
+                )
+            model_path = quantized_path
+
+        # Pinned thread counts: one query per turn, no oversubscription
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = threads or _default_threads()
+        options.inter_op_num_threads = 1
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(
+            str(model_path), options, providers=["CPUExecutionProvider"]
+        )
+        self.input_names = {i.name for i in self.session.get_inputs()}
+        print(
+            f"[RAG][ONNX] Loaded {model_path} ({options.intra_op_num_threads} threads)"
+        )
+
+    def _export(self, model_name: str, model_path: Path):
+        import torch
+        from transformers import AutoModel
+
+        print(f"[RAG][ONNX] Exporting {model_name} to {model_path}")
+        model_path.parent.mkdir(parents=True, exist_ok=True)
+        model = AutoModel.from_pretrained(model_name).eval()
+        sample = self.tokenizer(["exemple"], return_tensors="pt")
+        axes = {0: "batch", 1: "sequence"}
+        with torch.no_grad():
+            torch.onnx.export(
+                model,
+                (sample["input_ids"], sample["attention_mask"]),
+                str(model_path),
+                input_names=["input_ids", "attention_mask"],
+                output_names=["last_hidden_state"],
+                dynamic_axes={
+                    "input_ids": axes,
+                    "attention_mask": axes,
+                    "last_hidden_state": axes,
+                },
+                opset_version=17,
+            )
+
+    def encode(self, texts: list[str], batch_size: int = 32) -> np.ndarray:
+        """L2-normalized float32 embeddings, one row per text."""
+        rows = []
+        for start in range(0, len(texts), batch_size):
+            batch = self.tokenizer(
+                texts[start : start + batch_size],
+                padding=True,
+                truncation=True,
+                max_length=MAX_SEQ_LENGTH,
+                return_tensors="np",
+            )
+            inputs = {
+                k: v.astype(np.int64) for k, v in batch.items() if k in self.input_names
+            }
+            hidden = self.session.run(None, inputs)[0]
+            mask = batch["attention_mask"][..., None].astype(np.float32)
+            pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+            rows.append(pooled / np.clip(norms, 1e-12, None))
+        if not rows:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.concatenate(rows).astype(np.float32)
+
+
+BACKENDS = ("torch", "onnx", "onnx-int8")
+
+
+def get_embedder(backend: str = None, model_name: str = DEFAULT_MODEL, threads=None):
+    """
+    Embedding backend from RAG_EMBEDDING_BACKEND: "torch" (default),
+    "onnx" or "onnx-int8". Queries and stored documents must use the same one.
+    """
+    backend = backend or os.getenv("RAG_EMBEDDING_BACKEND", "torch")
+    if backend == "torch":
+        return TorchEmbedder(model_name, threads=threads)
+    if backend in ("onnx", "onnx-int8"):
+        return OnnxEmbedder(
+            model_name, quantize=backend == "onnx-int8", threads=threads
+        )
+    raise ValueError(f"Unknown embedding backend '{backend}' (expected {BACKENDS})")
@@ -1,14 +1,17 @@
 # backend/services/escalation_policy.py
 import os
-import requests
-from functools import lru_cache
 import hashlib
+import threading
+from collections import OrderedDict
 from dotenv import load_dotenv
+from backend.services.provider_client import get_provider_client
 
 load_dotenv()
 
 
 class EscalationPolicy:
+    SEVERITY_CACHE_SIZE = 500
+
     def __init__(
         self,
         confidence_limit: float = 0.3,
@@ -84,7 +87,12 @@ class EscalationPolicy:
             "menace",
         ]
 
+        # Severity verdicts by text hash, shared by the sync and async paths
+        self._severity_cache = OrderedDict()
+        self._severity_lock = threading.Lock()
+
         if self.use_ai_validation:
+            self.client = get_provider_client()
             self.api_key = os.getenv("GROQ_API_KEY")
             if self.api_key:
                 self.endpoint = "https://api.groq.com/openai/v1/chat/completions"
@@ -112,19 +120,34 @@ class EscalationPolicy:
         text_lower = text.lower().strip()
         return any(phrase in text_lower for phrase in self.explicit_agent_requests)
 
-    @lru_cache(maxsize=500)
-    def _analyze_severity_cached(self, text_hash: str, user_text: str) -> dict:
-        return self._analyze_severity(user_text)
-
-    def _analyze_severity(self, user_text: str) -> dict:
-
-        if not self.use_ai_validation:
-            return {
-                "requires_escalation": False,
-                "reason": "ai_disabled",
-                "confidence": 0.0,
-            }
+    def _needs_severity(self, user_text: str) -> bool:
+        """True when should_escalate will consult the AI severity check."""
+        text_lower = user_text.lower().strip()
+        if self._contains_explicit_agent_request(text_lower):
+            return False
+        has_keyword = any(word in text_lower for word in self.critical_keywords) or any(
+            word in text_lower for word in self.context_dependent_keywords
+        )
+        return has_keyword and not self._is_question_context(user_text)
 
+    def _analyze_severity_cached(self, text_hash: str, user_text: str) -> dict:
+        with self._severity_lock:
+            if text_hash in self._severity_cache:
+                self._severity_cache.move_to_end(text_hash)
+                return self._severity_cache[text_hash]
+
+        severity = self._analyze_severity(user_text)
+        self._store_severity(text_hash, severity)
+        return severity
+
+    def _store_severity(self, text_hash: str, severity: dict):
+        with self._severity_lock:
+            self._severity_cache[text_hash] = severity
+            self._severity_cache.move_to_end(text_hash)
+            while len(self._severity_cache) > self.SEVERITY_CACHE_SIZE:
+                self._severity_cache.popitem(last=False)
+
+    def _build_severity_payload(self, user_text: str) -> dict:
         prompt = f"""Analyze if this customer message requires IMMEDIATE human agent escalation.
 
 Escalate ONLY if:
@@ -146,7 +169,7 @@ ESCALATE: YES or NO
 REASON: brief reason
 CONFIDENCE: 0.0-1.0"""
 
-        payload = {
+        return {
             "model": self.model,
             "messages": [
                 {
@@ -159,51 +182,93 @@ CONFIDENCE: 0.0-1.0"""
             "temperature": 0.0,
         }
 
-        headers = {
+    def _headers(self) -> dict:
+        return {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json",
         }
 
-        try:
-            response = requests.post(
-                self.endpoint, json=payload, headers=headers, timeout=8
-            )
-            response.raise_for_status()
-            data = response.json()
-            content = data["choices"][0]["message"]["content"].strip()
-
-            # Parse response
-            lines = [line.strip() for line in content.split("\n") if line.strip()]
-            escalate = False
-            reason = "unknown"
-            confidence = 0.5
-
-            for line in lines:
-                if line.startswith("ESCALATE:"):
-                    escalate = "YES" in line.upper()
-                elif line.startswith("REASON:"):
-                    reason = line.split(":", 1)[1].strip()
-                elif line.startswith("CONFIDENCE:"):
-                    try:
-                        confidence = float(line.split(":", 1)[1].strip())
-                    except ValueError:
-                        confidence = 0.5
+    def _parse_severity(self, data: dict) -> dict:
+        content = data["choices"][0]["message"]["content"].strip()
+
+        # Parse response
+        lines = [line.strip() for line in content.split("\n") if line.strip()]
+        escalate = False
+        reason = "unknown"
+        confidence = 0.5
+
+        for line in lines:
+            if line.startswith("ESCALATE:"):
+                escalate = "YES" in line.upper()
+            elif line.startswith("REASON:"):
+                reason = line.split(":", 1)[1].strip()
+            elif line.startswith("CONFIDENCE:"):
+                try:
+                    confidence = float(line.split(":", 1)[1].strip())
+                except ValueError:
+                    confidence = 0.5
+
+        return {
+            "requires_escalation": escalate,
+            "reason": reason,
+            "confidence": confidence,
+        }
 
-            return {
-                "requires_escalation": escalate,
-                "reason": reason,
-                "confidence": confidence,
-            }
+    @staticmethod
+    def _severity_error(error: Exception) -> dict:
+        print(f"[ESCALATION] AI analysis failed: {error}")
+        # Conservative fallback: don't escalate on error
+        return {
+            "requires_escalation": False,
+            "reason": "ai_error",
+            "confidence": 0.0,
+        }
 
-        except Exception as e:
-            print(f"[ESCALATION] AI analysis failed: {e}")
-            # Conservative fallback: don't escalate on error
+    def _analyze_severity(self, user_text: str) -> dict:
+
+        if not self.use_ai_validation:
             return {
                 "requires_escalation": False,
-                "reason": "ai_error",
+                "reason": "ai_disabled",
                 "confidence": 0.0,
             }
 
+        try:
+            data = self.client.post_json_sync(
+                "escalation",
+                self.endpoint,
+                json=self._build_severity_payload(user_text),
+                headers=self._headers(),
+            )
+            return self._parse_severity(data)
+        except Exception as e:
+            return self._severity_error(e)
+
+    async def aprefetch_severity(self, user_text: str):
+        """
+        Run the AI severity check on the event loop when should_escalate
+        would need it, so the following should_escalate call is a cache hit.
+        """
+        if not self.use_ai_validation or not self._needs_severity(user_text):
+            return
+
+        text_hash = hashlib.md5(user_text.encode()).hexdigest()
+        with self._severity_lock:
+            if text_hash in self._severity_cache:
+                return
+
+        try:
+            data = await self.client.post_json(
+                "escalation",
+                self.endpoint,
+                json=self._build_severity_payload(user_text),
+                headers=self._headers(),
+            )
+            severity = self._parse_severity(data)
+        except Exception as e:
+            severity = self._severity_error(e)
+        self._store_severity(text_hash, severity)
+
     def should_escalate(
         self,
         global_confidence: float,
@@ -276,3 +341,16 @@ CONFIDENCE: 0.0-1.0"""
         # DEFAULT: AI CAN HANDLE
         # ═══════════════════════════════════════════════════════════
         return "AUTO_HANDLED", "AUTO_HANDLED"
+
+    async def ashould_escalate(
+        self,
+        global_confidence: float,
+        intent_name: str,
+        ambiguity_count: int = 0,
+        user_text: str = "",
+    ) -> tuple[str, str]:
+        """Async `should_escalate`: the AI check is awaited, not blocking."""
+        await self.aprefetch_severity(user_text)
+        return self.should_escalate(
+            global_confidence, intent_name, ambiguity_count, user_text
+        )
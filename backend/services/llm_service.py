@@ -1,10 +1,97 @@
 import os
-import requests
-from typing import Optional
+import json
+import httpx
+from typing import AsyncIterator, Iterator, Optional
 from dotenv import load_dotenv
+from backend.services.provider_client import get_provider_client
+from backend.services.phrase_bank import (
+    DEFAULT_FALLBACK_RESPONSE,
+    FALLBACK_RESPONSES,
+    PHRASES,
+)
 
 load_dotenv()
 
+DEFAULT_API_BASE = "https://api.groq.com/openai/v1"
+
+# Cleaning rules shared by `_clean_response` and the streaming `SentenceChunker`
+PREFIXES_TO_REMOVE = [
+    "En tant qu'assistant IA, ",
+    "Je suis désolé, mais ",
+    "Malheureusement, ",
+]
+MAX_SENTENCES = 3
+SAFE_REDIRECT_RESPONSE = PHRASES["safe_redirect"]
+STREAM_DONE = object()
+
+
+class SentenceChunker:
+    """
+    Incrementally cut streamed LLM tokens into sentences.
+
+    Applies the same rules as `LLMService._clean_response`: asterisks are
+    dropped, leading filler prefixes are removed, sentences end at ".", and
+    at most MAX_SENTENCES sentences are emitted.
+    """
+
+    def __init__(self, max_sentences: int = MAX_SENTENCES):
+        self.max_sentences = max_sentences
+        self.emitted = 0
+        self._buffer = ""
+        self._prefix_checked = False
+        self._prefix_window = max(len(p) for p in PREFIXES_TO_REMOVE)
+
+    @property
+    def done(self) -> bool:
+        return self.emitted >= self.max_sentences
+
+    def _strip_prefixes(self):
+        self._buffer = self._buffer.lstrip()
+        for prefix in PREFIXES_TO_REMOVE:
+            if self._buffer.startswith(prefix):
+                self._buffer = self._buffer[len(prefix) :]
+        self._prefix_checked = True
+
+    def feed(self, token: str) -> list[str]:
+        """Add a token, return the sentences completed by it."""
+        if self.done:
+            return []
+
+        self._buffer += token.replace("*", "")
+
+        if not self._prefix_checked:
+            if (
+                len(self._buffer.lstrip()) < self._prefix_window
+                and "." not in self._buffer
+            ):
+                return []
+            self._strip_prefixes()
+
+        sentences = []
+        while "." in self._buffer and not self.done:
+            sentence, self._buffer = self._buffer.split(".", 1)
+            sentence = sentence.strip()
+            if sentence:
+                sentences.append(sentence + ".")
+                self.emitted += 1
+        return sentences
+
+    def flush(self) -> list[str]:
+        """Return the trailing sentence once the stream has ended."""
+        if self.done:
+            return []
+        if not self._prefix_checked:
+            self._strip_prefixes()
+
+        sentence = self._buffer.strip()
+        self._buffer = ""
+        if not sentence:
+            return []
+        if not sentence.endswith((".", "!", "?")):
+            sentence += "."
+        self.emitted += 1
+        return [sentence]
+
 
 class LLMService:
     INTENT_GUIDELINES = {
@@ -22,7 +109,10 @@ class LLMService:
         if not self.api_key:
             raise EnvironmentError("Please set GROQ_API_KEY environment variable")
         self.model = model
-        self.endpoint = "https://api.groq.com/openai/v1/chat/completions"
+        # LLM_API_BASE points at any OpenAI-compatible server (e.g. a local mock)
+        api_base = os.getenv("LLM_API_BASE", DEFAULT_API_BASE).rstrip("/")
+        self.endpoint = f"{api_base}/chat/completions"
+        self.client = get_provider_client()
 
     def _build_system_prompt(self) -> str:
         """Build system prompt that encourages AI handling."""
@@ -59,8 +149,9 @@ RÈGLES:
         user_text: str,
         context: str,
         intent: str,
+        history: str = "",
     ) -> str:
-        """Build user prompt with context and intent guidance."""
+        """Build user prompt with retrieved context, history and intent guidance."""
         intent_guideline = self.INTENT_GUIDELINES.get(
             intent, "Réponse professionnelle et utile."
         )
@@ -68,17 +159,21 @@ RÈGLES:
         has_context = (
             context and context != "Aucun contexte fourni" and len(context) > 10
         )
+        has_history = bool(history) and len(history) > 10
 
-        if has_context:
-            prompt = f"""HISTORIQUE DE CONVERSATION:
-{context}
+        if has_context or has_history:
+            blocks = ""
+            if has_history:
+                blocks += f"HISTORIQUE DE CONVERSATION:\n{history}\n\n"
+            if has_context:
+                blocks += f"INFORMATIONS DE RÉFÉRENCE (FAQ):\n{context}\n\n"
 
-INTENTION: {intent}
+            prompt = f"""{blocks}INTENTION: {intent}
 APPROCHE: {intent_guideline}
 
 QUESTION ACTUELLE: "{user_text}"
 
-Répondez de manière utile en utilisant l'historique. NE transférez PAS sauf si absolument nécessaire.
+Répondez de manière utile en utilisant ces informations. NE transférez PAS sauf si absolument nécessaire.
 
 RÉPONSE (2-3 phrases max):"""
         else:
@@ -93,21 +188,20 @@ RÉPONSE (2-3 phrases max):"""
 
         return prompt
 
-    def generate_response(
+    def _build_payload(
         self,
         user_text: str,
         context: Optional[str],
-        language: str = "fr",
-        intent: Optional[str] = None,
-    ) -> str:
-        """
-        Generate contextual response with intent-aware behavior.
-        """
+        intent: str,
+        history: Optional[str],
+        stream: bool = False,
+    ) -> dict:
+        """Build the chat-completions payload shared by blocking and streaming calls."""
         context = context.strip() if context else ""
-        intent = intent or "INQUIRY"
+        history = history.strip() if history else ""
 
         system_prompt = self._build_system_prompt()
-        user_prompt = self._build_user_prompt(user_text, context, intent)
+        user_prompt = self._build_user_prompt(user_text, context, intent, history)
 
         payload = {
             "model": self.model,
@@ -119,48 +213,205 @@ RÉPONSE (2-3 phrases max):"""
             "temperature": 0.3,
             "top_p": 0.9,
         }
+        if stream:
+            payload["stream"] = True
+        return payload
 
-        headers = {
+    def _headers(self) -> dict:
+        return {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json",
         }
 
+    def generate_response(
+        self,
+        user_text: str,
+        context: Optional[str],
+        language: str = "fr",
+        intent: Optional[str] = None,
+        history: Optional[str] = None,
+    ) -> str:
+        """
+        Generate contextual response with intent-aware behavior (blocking).
+
+        `context` is the retrieved FAQ knowledge, `history` the recent turns.
+        """
+        intent = intent or "INQUIRY"
+        payload = self._build_payload(user_text, context, intent, history)
+
         try:
-            response = requests.post(
-                self.endpoint, json=payload, headers=headers, timeout=15
+            data = self.client.post_json_sync(
+                "llm", self.endpoint, json=payload, headers=self._headers()
             )
-            response.raise_for_status()
-            data = response.json()
-            text = data["choices"][0]["message"]["content"].strip()
+        except Exception as e:
+            return self._handle_error(e, intent)
 
-        except requests.exceptions.Timeout:
-            print("[LLM] Request timeout")
-            return self._get_fallback_response(intent)
-        except requests.exceptions.RequestException as e:
-            print(f"[LLM] API error: {e}")
-            return self._get_fallback_response(intent)
+        return self._finalize_text(data)
+
+    async def agenerate_response(
+        self,
+        user_text: str,
+        context: Optional[str],
+        language: str = "fr",
+        intent: Optional[str] = None,
+        history: Optional[str] = None,
+    ) -> str:
+        """Async `generate_response` over the shared connection pool."""
+        intent = intent or "INQUIRY"
+        payload = self._build_payload(user_text, context, intent, history)
+
+        try:
+            data = await self.client.post_json(
+                "llm", self.endpoint, json=payload, headers=self._headers()
+            )
         except Exception as e:
-            print(f"[LLM] Unexpected error: {e}")
-            return self._get_fallback_response(intent)
+            return self._handle_error(e, intent)
+
+        return self._finalize_text(data)
 
+    def _handle_error(self, error: Exception, intent: str) -> str:
+        if isinstance(error, httpx.TimeoutException):
+            print("[LLM] Request timeout")
+        elif isinstance(error, httpx.HTTPError):
+            print(f"[LLM] API error: {error}")
+        else:
+            print(f"[LLM] Unexpected error: {error}")
+        return self._get_fallback_response(intent)
+
+    def _finalize_text(self, data: dict) -> str:
+        """Extract, clean and safety-check a completion."""
+        text = data["choices"][0]["message"]["content"].strip()
         text = self._clean_response(text)
 
         if self._contains_dangerous_advice(text):
             print(f"[LLM] Blocked dangerous advice: {text}")
-            return "Pour cette question spécifique, un agent pourra mieux vous aider."
+            return SAFE_REDIRECT_RESPONSE
 
         return text
 
+    @staticmethod
+    def _parse_stream_line(line: str):
+        """Return the content delta of one SSE line, STREAM_DONE, or None."""
+        if not line or not line.startswith("data:"):
+            return None
+        data = line[len("data:") :].strip()
+        if data == "[DONE]":
+            return STREAM_DONE
+        try:
+            chunk = json.loads(data)
+            return chunk["choices"][0].get("delta", {}).get("content")
+        except (ValueError, KeyError, IndexError):
+            return None
+
+    def _screen_sentences(self, sentences: list[str]) -> tuple[list[str], bool]:
+        """Apply the dangerous-advice check; returns (sentences, stop)."""
+        screened = []
+        for sentence in sentences:
+            if self._contains_dangerous_advice(sentence):
+                print(f"[LLM] Blocked dangerous advice: {sentence}")
+                screened.append(SAFE_REDIRECT_RESPONSE)
+                return screened, True
+            screened.append(sentence)
+        return screened, False
+
+    def _stream_tail(self, chunker, error: Exception, intent: str) -> list[str]:
+        """Sentences to emit once the token stream has ended or failed."""
+        if error is not None:
+            print(f"[LLM] Stream error: {error}")
+            # Nothing spoken yet: fall back; otherwise drop the truncated tail
+            return [self._get_fallback_response(intent)] if chunker.emitted == 0 else []
+
+        tail = chunker.flush()
+        if chunker.emitted == 0:
+            return [self._get_fallback_response(intent)]
+        return self._screen_sentences(tail)[0]
+
+    def stream_response(
+        self,
+        user_text: str,
+        context: Optional[str],
+        language: str = "fr",
+        intent: Optional[str] = None,
+        history: Optional[str] = None,
+        outcome: Optional[dict] = None,
+    ) -> Iterator[str]:
+        """
+        Stream the response sentence by sentence as tokens arrive (blocking).
+
+        Sentences are cut with the `_clean_response` rules so they can be sent
+        to TTS while the rest of the completion is still being generated.
+        If given, `outcome["complete"]` is set to False when the stream failed
+        (the answer is a fallback or truncated), True otherwise.
+        """
+        intent = intent or "INQUIRY"
+        payload = self._build_payload(user_text, context, intent, history, stream=True)
+        chunker = SentenceChunker()
+        error = None
+
+        try:
+            with self.client.stream_sync(
+                "llm", self.endpoint, json=payload, headers=self._headers()
+            ) as response:
+                for line in response.iter_lines():
+                    token = self._parse_stream_line(line)
+                    if token is STREAM_DONE:
+                        break
+                    if not token:
+                        continue
+                    sentences, stop = self._screen_sentences(chunker.feed(token))
+                    yield from sentences
+                    if stop or chunker.done:
+                        return
+        except Exception as e:
+            error = e
+
+        if outcome is not None:
+            outcome["complete"] = error is None
+        yield from self._stream_tail(chunker, error, intent)
+
+    async def astream_response(
+        self,
+        user_text: str,
+        context: Optional[str],
+        language: str = "fr",
+        intent: Optional[str] = None,
+        history: Optional[str] = None,
+        outcome: Optional[dict] = None,
+    ) -> AsyncIterator[str]:
+        """Async `stream_response` over the shared connection pool."""
+        intent = intent or "INQUIRY"
+        payload = self._build_payload(user_text, context, intent, history, stream=True)
+        chunker = SentenceChunker()
+        error = None
+
+        try:
+            async with self.client.stream(
+                "llm", self.endpoint, json=payload, headers=self._headers()
+            ) as response:
+                async for line in response.aiter_lines():
+                    token = self._parse_stream_line(line)
+                    if token is STREAM_DONE:
+                        break
+                    if not token:
+                        continue
+                    sentences, stop = self._screen_sentences(chunker.feed(token))
+                    for sentence in sentences:
+                        yield sentence
+                    if stop or chunker.done:
+                        return
+        except Exception as e:
+            error = e
+
+        if outcome is not None:
+            outcome["complete"] = error is None
+        for sentence in self._stream_tail(chunker, error, intent):
+            yield sentence
+
     def _clean_response(self, text: str) -> str:
         """Clean and limit response length."""
         text = text.replace("**", "").replace("*", "").strip()
 
-        prefixes_to_remove = [
-            "En tant qu'assistant IA, ",
-            "Je suis désolé, mais ",
-            "Malheureusement, ",
-        ]
-        for prefix in prefixes_to_remove:
+        for prefix in PREFIXES_TO_REMOVE:
             if text.startswith(prefix):
                 text = text[len(prefix) :]
 
@@ -169,7 +420,7 @@ RÉPONSE (2-3 phrases max):"""
             sentence = sentence.strip()
             if sentence:
                 sentences.append(sentence)
-            if len(sentences) >= 3:
+            if len(sentences) >= MAX_SENTENCES:
                 break
 
         result = ". ".join(sentences).strip()
@@ -198,17 +449,4 @@ RÉPONSE (2-3 phrases max):"""
 
     def _get_fallback_response(self, intent: str) -> str:
         """Intent-specific fallback responses when API fails."""
-        fallbacks = {
-            "GREETING": "Bonjour ! Comment puis-je vous aider aujourd'hui ?",
-            "GOODBYE": "Au revoir et merci de votre appel !",
-            "CLAIM": "Pour déclarer un sinistre, je peux vous guider sur le processus général. Qu'est-il arrivé ?",
-            "PAYMENT": "Pour les questions de paiement, je peux vous expliquer les options disponibles.",
-            "COVERAGE": "Je peux vous renseigner sur nos différents types de couverture. Que souhaitez-vous savoir ?",
-            "PROBLEM": "Je comprends. Pouvez-vous m'expliquer le problème que vous rencontrez ?",
-            "INQUIRY": "Je suis là pour répondre à vos questions. Que souhaitez-vous savoir ?",
-        }
-
-        return fallbacks.get(
-            intent,
-            "Je suis à votre écoute. Comment puis-je vous aider ?",
-        )
+        return FALLBACK_RESPONSES.get(intent, DEFAULT_FALLBACK_RESPONSE)
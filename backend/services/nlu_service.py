@@ -1,15 +1,24 @@
 import os
 import re
-import requests
+import time
+import asyncio
+import threading
+from collections import OrderedDict
 from typing import Optional
-from functools import lru_cache
+
+import httpx
 from dotenv import load_dotenv
+from backend.logs.logger import Logger
 from backend.models.intent import Intent
+from backend.services.provider_client import get_provider_client
 
 load_dotenv()
+logger = Logger()
 
 
 class NLUService:
+    CACHE_SIZE = 1000
+
     # Base confidence levels (can be adjusted by actual model confidence)
     INTENT_BASE_CONFIDENCE = {
         "GREETING": 0.9,
@@ -56,13 +65,25 @@ class NLUService:
         ],
     }
 
-    def __init__(self, model: str = "llama-3.3-70b-versatile"):
+    def __init__(self, model: str = "llama-3.3-70b-versatile", classifier=None):
         self.api_key = os.getenv("GROQ_API_KEY")
         if not self.api_key:
             raise EnvironmentError("Please set GROQ_API_KEY environment variable")
         self.model = model
         self.endpoint = "https://api.groq.com/openai/v1/chat/completions"
         self.intent_labels = list(self.INTENT_BASE_CONFIDENCE.keys())
+        self.client = get_provider_client()
+
+        # LRU of LLM classifications, shared by the sync and async paths
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._cache_hits = 0
+        self._cache_misses = 0
+
+        # Local IntentClassifier; the LLM only sees turns it is unsure about
+        self.classifier = classifier
+        self._local_answered = 0
+        self._local_deferred = 0
 
     def _check_pattern_rules(self, text: str) -> Optional[Intent]:
         """Fast-path: Check regex patterns before API call."""
@@ -76,9 +97,26 @@ class NLUService:
 
         return None
 
-    @lru_cache(maxsize=1000)
-    def _classify_with_llm(self, text: str) -> Intent:
-        """LLM-based classification with caching."""
+    def _classify_locally(self, text: str) -> Optional[Intent]:
+        """Embedding classifier; None when its margin is too low to skip the LLM."""
+        if self.classifier is None:
+            return None
+        prediction = self.classifier.predict(text)
+        if not self.classifier.confident(prediction):
+            self._local_deferred += 1
+            return None
+        self._local_answered += 1
+
+        # Same blend with the base confidence as LLM classifications
+        base_confidence = self.INTENT_BASE_CONFIDENCE[prediction["intent"]]
+        confidence = prediction["probability"] * 0.6 + base_confidence * 0.4
+        print(
+            f"[NLU] Local: {prediction['intent']} "
+            f"(p={prediction['probability']:.2f}, margin={prediction['margin']:.2f})"
+        )
+        return Intent(name=prediction["intent"], confidence=round(confidence, 2))
+
+    def _build_classification_payload(self, text: str) -> dict:
         intent_descriptions = "\n".join(
             [f"- {name}: {desc}" for name, desc in self.INTENT_DEFINITIONS.items()]
         )
@@ -102,7 +140,7 @@ INTENT: [intent name]
 CONFIDENCE: [0.0-1.0]
 REASONING: [one sentence why]"""
 
-        payload = {
+        return {
             "model": self.model,
             "messages": [
                 {
@@ -115,62 +153,114 @@ REASONING: [one sentence why]"""
             "temperature": 0.0,
         }
 
-        headers = {
+    def _headers(self) -> dict:
+        return {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json",
         }
 
-        try:
-            response = requests.post(
-                self.endpoint, json=payload, headers=headers, timeout=10
-            )
-            response.raise_for_status()
-            data = response.json()
-            content = data["choices"][0]["message"]["content"].strip()
+    def _parse_classification(self, data: dict) -> Intent:
+        content = data["choices"][0]["message"]["content"].strip()
 
-            predicted_intent = "UNKNOWN"
-            llm_confidence = 0.5
+        predicted_intent = "UNKNOWN"
+        llm_confidence = 0.5
 
-            for line in content.split("\n"):
-                line = line.strip()
-                if line.startswith("INTENT:"):
-                    predicted_intent = line.split(":", 1)[1].strip().upper()
-                elif line.startswith("CONFIDENCE:"):
-                    try:
-                        llm_confidence = float(line.split(":", 1)[1].strip())
-                    except ValueError:
-                        llm_confidence = 0.5
+        for line in content.split("\n"):
+            line = line.strip()
+            if line.startswith("INTENT:"):
+                predicted_intent = line.split(":", 1)[1].strip().upper()
+            elif line.startswith("CONFIDENCE:"):
+                try:
+                    llm_confidence = float(line.split(":", 1)[1].strip())
+                except ValueError:
+                    llm_confidence = 0.5
 
-            if predicted_intent not in self.intent_labels:
-                predicted_intent = "UNKNOWN"
-                llm_confidence = 0.2
+        if predicted_intent not in self.intent_labels:
+            predicted_intent = "UNKNOWN"
+            llm_confidence = 0.2
 
-            base_confidence = self.INTENT_BASE_CONFIDENCE[predicted_intent]
-            final_confidence = (llm_confidence * 0.6) + (base_confidence * 0.4)
+        base_confidence = self.INTENT_BASE_CONFIDENCE[predicted_intent]
+        final_confidence = (llm_confidence * 0.6) + (base_confidence * 0.4)
 
-            return Intent(name=predicted_intent, confidence=round(final_confidence, 2))
+        return Intent(name=predicted_intent, confidence=round(final_confidence, 2))
 
-        except requests.exceptions.Timeout:
+    def _handle_error(self, error: Exception) -> Intent:
+        if isinstance(error, httpx.TimeoutException):
             print("[NLU] API timeout - falling back to UNKNOWN")
-            return Intent(name="UNKNOWN", confidence=0.2)
+        elif isinstance(error, httpx.HTTPError):
+            print(f"[NLU] API error: {error}")
+        else:
+            print(f"[NLU] Unexpected error: {error}")
+        return Intent(name="UNKNOWN", confidence=0.2)
+
+    def _cache_get(self, text: str) -> Optional[Intent]:
+        with self._cache_lock:
+            intent = self._cache.get(text)
+            if intent is None:
+                self._cache_misses += 1
+                return None
+            self._cache.move_to_end(text)
+            self._cache_hits += 1
+            return intent
+
+    def _cache_put(self, text: str, intent: Intent):
+        with self._cache_lock:
+            self._cache[text] = intent
+            self._cache.move_to_end(text)
+            while len(self._cache) > self.CACHE_SIZE:
+                self._cache.popitem(last=False)
+
+    def _remember(self, text: str, intent: Intent, started: float):
+        """Cache an LLM label and log it: examples for the local classifier."""
+        self._cache_put(text, intent)
+        latency_ms = round((time.perf_counter() - started) * 1000)
+        logger.log_intent(text, intent.name, intent.confidence, "llm", latency_ms)
 
-        except requests.exceptions.RequestException as e:
-            print(f"[NLU] API error: {e}")
-            return Intent(name="UNKNOWN", confidence=0.2)
+    def _classify_with_llm(self, text: str) -> Intent:
+        """LLM-based classification with caching."""
+        cached = self._cache_get(text)
+        if cached is not None:
+            return cached
 
+        started = time.perf_counter()
+        try:
+            data = self.client.post_json_sync(
+                "nlu",
+                self.endpoint,
+                json=self._build_classification_payload(text),
+                headers=self._headers(),
+            )
+            intent = self._parse_classification(data)
         except Exception as e:
-            print(f"[NLU] Unexpected error: {e}")
-            return Intent(name="UNKNOWN", confidence=0.2)
+            # Failures are not cached: the next turn retries the API
+            return self._handle_error(e)
 
-    def detect_intent(self, text: str) -> Intent:
-        """
-        Detect user intent with hybrid approach: patterns first, then LLM.
+        self._remember(text, intent, started)
+        return intent
 
-        Returns:
-            Intent(name: str, confidence: float)
-        """
-        text = text.strip()
+    async def _aclassify_with_llm(self, text: str) -> Intent:
+        """Async `_classify_with_llm`, sharing the same cache."""
+        cached = self._cache_get(text)
+        if cached is not None:
+            return cached
 
+        started = time.perf_counter()
+        try:
+            data = await self.client.post_json(
+                "nlu",
+                self.endpoint,
+                json=self._build_classification_payload(text),
+                headers=self._headers(),
+            )
+            intent = self._parse_classification(data)
+        except Exception as e:
+            return self._handle_error(e)
+
+        self._remember(text, intent, started)
+        return intent
+
+    def detect_intent_fast(self, text: str) -> Optional[Intent]:
+        """Empty/short input and regex fast-path; None when the LLM is needed."""
         if not text:
             return Intent(name="UNKNOWN", confidence=0.2)
 
@@ -182,25 +272,50 @@ REASONING: [one sentence why]"""
             print(
                 f"[NLU] Pattern match: {pattern_result.name} ({pattern_result.confidence})"
             )
-            return pattern_result
+        return pattern_result
+
+    def detect_intent(self, text: str) -> Intent:
+        """
+        Detect user intent: patterns first, then the local classifier, then LLM.
+
+        Returns:
+            Intent(name: str, confidence: float)
+        """
+        text = text.strip()
+        intent = self.detect_intent_fast(text) or self._classify_locally(text)
+        if intent:
+            return intent
 
         print(f"[NLU] LLM classification for: '{text[:50]}...'")
         return self._classify_with_llm(text)
 
+    async def adetect_intent(self, text: str) -> Intent:
+        """Async `detect_intent` for the event loop."""
+        text = text.strip()
+        intent = self.detect_intent_fast(text)
+        if intent is None and self.classifier is not None:
+            # Embedding the query is CPU work: keep it off the event loop
+            intent = await asyncio.to_thread(self._classify_locally, text)
+        if intent:
+            return intent
+
+        print(f"[NLU] LLM classification for: '{text[:50]}...'")
+        return await self._aclassify_with_llm(text)
+
     def detect_intent_batch(self, texts: list[str]) -> list[Intent]:
         """Batch classification for efficiency."""
         return [self.detect_intent(text) for text in texts]
 
     def get_intent_stats(self) -> dict:
         """Get cache statistics for monitoring."""
-        cache_info = self._classify_with_llm.cache_info()
+        hits, misses = self._cache_hits, self._cache_misses
+        local = self._local_answered + self._local_deferred
         return {
-            "cache_hits": cache_info.hits,
-            "cache_misses": cache_info.misses,
-            "cache_size": cache_info.currsize,
-            "cache_hit_rate": (
-                cache_info.hits / (cache_info.hits + cache_info.misses)
-                if (cache_info.hits + cache_info.misses) > 0
-                else 0.0
-            ),
+            "cache_hits": hits,
+            "cache_misses": misses,
+            "cache_size": len(self._cache),
+            "cache_hit_rate": (hits / (hits + misses) if (hits + misses) > 0 else 0.0),
+            "local_answered": self._local_answered,
+            "local_deferred": self._local_deferred,
+            "local_rate": self._local_answered / local if local else 0.0,
         }
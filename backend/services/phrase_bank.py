@@ -0,0 +1,126 @@
+import os
+import time
+import asyncio
+
+# Every fixed utterance the bot can speak. Modules take their strings from
+# here so the bank can pre-render all of them at startup.
+PHRASES = {
+    "greeting": "Bonjour ! Je suis Selene, votre assistant vocal pour l'assurance.",
+    "not_understood": "Désolé, je n'ai pas compris. Pouvez-vous répéter ?",
+    "clarification": "Je n'ai pas bien compris. Pourriez-vous préciser votre demande ?",
+    "goodbye": "Au revoir ! L'appel est terminé.",
+    "transfer_agent": (
+        "Votre demande nécessite l'intervention d'un agent humain. "
+        "Vous allez être transféré maintenant."
+    ),
+    "technical_issue": (
+        "Je suis désolé, je rencontre un problème. Un instant s'il vous plaît."
+    ),
+    "safe_redirect": (
+        "Pour cette question spécifique, un agent pourra mieux vous aider."
+    ),
+}
+
+# LLM fallback answers per intent (used when the API fails)
+FALLBACK_RESPONSES = {
+    "GREETING": "Bonjour ! Comment puis-je vous aider aujourd'hui ?",
+    "GOODBYE": "Au revoir et merci de votre appel !",
+    "CLAIM": "Pour déclarer un sinistre, je peux vous guider sur le processus général. Qu'est-il arrivé ?",
+    "PAYMENT": "Pour les questions de paiement, je peux vous expliquer les options disponibles.",
+    "COVERAGE": "Je peux vous renseigner sur nos différents types de couverture. Que souhaitez-vous savoir ?",
+    "PROBLEM": "Je comprends. Pouvez-vous m'expliquer le problème que vous rencontrez ?",
+    "INQUIRY": "Je suis là pour répondre à vos questions. Que souhaitez-vous savoir ?",
+}
+DEFAULT_FALLBACK_RESPONSE = "Je suis à votre écoute. Comment puis-je vous aider ?"
+
+for _intent, _text in FALLBACK_RESPONSES.items():
+    PHRASES[f"fallback_{_intent.lower()}"] = _text
+PHRASES["fallback_default"] = DEFAULT_FALLBACK_RESPONSE
+
+# Studio recordings used instead of TTS when the file exists
+RECORDINGS = {
+    "greeting": os.path.join("demo", "tts_outputs", "greeting.mp3"),
+    "transfer_agent": os.path.join("demo", "tts_outputs", "transfer_agent.mp3"),
+}
+
+
+def _read_recording(path: str):
+    if not os.path.exists(path):
+        return None
+    with open(path, "rb") as f:
+        return f.read()
+
+
+class PhraseBank:
+    """
+    Audio for the fixed utterances in PHRASES, rendered once at startup.
+
+    `prerender()` synthesizes every phrase concurrently through the TTS
+    service (which also fills its cache); afterwards `audio(key)` and
+    `audio_for_text(text)` return the clip bytes without any synthesis.
+    """
+
+    def __init__(self, tts, phrases: dict = None, concurrency: int = 4):
+        self.tts = tts
+        self.phrases = dict(phrases or PHRASES)
+        self.concurrency = concurrency
+        self._audio = {}
+        self._keys_by_text = {text: key for key, text in self.phrases.items()}
+        self.stats = {"rendered": 0, "failed": 0, "render_ms": 0, "hits": 0}
+
+    def text(self, key: str) -> str:
+        return self.phrases[key]
+
+    def audio(self, key: str):
+        """Pre-rendered clip for a phrase key, or None if not rendered."""
+        audio = self._audio.get(key)
+        if audio is not None:
+            self.stats["hits"] += 1
+        return audio
+
+    def missing(self) -> list:
+        """Phrase keys with no rendered clip (synthesized when spoken)."""
+        return [key for key in self.phrases if key not in self._audio]
+
+    def audio_for_text(self, text: str):
+        """Pre-rendered clip when `text` is one of the bank's phrases."""
+        key = self._keys_by_text.get(text.strip())
+        return self.audio(key) if key is not None else None
+
+    async def _render(self, key: str, semaphore: asyncio.Semaphore):
+        async with semaphore:
+            try:
+                audio = None
+                if key in RECORDINGS:
+                    audio = await asyncio.to_thread(_read_recording, RECORDINGS[key])
+                if audio is None:
+                    audio = await self.tts.asynthesize_bytes(self.phrases[key])
+            except Exception as e:
+                print(f"[PHRASES] Failed to render '{key}': {e}")
+                audio = None
+        if audio:
+            self._audio[key] = audio
+            self.stats["rendered"] += 1
+        else:
+            self.stats["failed"] += 1
+
+    async def prerender(self) -> dict:
+        """Render every phrase that is not loaded yet, concurrently."""
+        started = time.perf_counter()
+        semaphore = asyncio.Semaphore(self.concurrency)
+        await asyncio.gather(
+            *(
+                self._render(key, semaphore)
+                for key in self.phrases
+                if key not in self._audio
+            )
+        )
+        self.stats["render_ms"] = round((time.perf_counter() - started) * 1000)
+        print(
+            f"[PHRASES] {self.stats['rendered']}/{len(self.phrases)} phrases "
+            f"ready in {self.stats['render_ms']} ms"
+        )
+        return self.get_stats()
+
+    def get_stats(self) -> dict:
+        return {**self.stats, "phrases": len(self.phrases), "loaded": len(self._audio)}
@@ -0,0 +1,120 @@
+from backend.services.bm25_index import tokenize
+
+# FAQ PDF (metadata["source"]) -> keywords of its product line
+PRODUCT_KEYWORDS = {
+    "auto_assurance.pdf": [
+        "auto",
+        "automobile",
+        "voiture",
+        "véhicule",
+        "conducteur",
+        "permis",
+        "bris de glace",
+        "pare-brise",
+        "carte grise",
+        "bonus",
+        "malus",
+        "garage",
+        "fourrière",
+        "remorquage",
+        "dépannage",
+        "constat",
+    ],
+    "moto_assurance.pdf": [
+        "moto",
+        "motard",
+        "scooter",
+        "deux-roues",
+        "deux roues",
+        "cyclomoteur",
+        "casque",
+        "quad",
+    ],
+    "sante_prevoyance_assurance.pdf": [
+        "santé",
+        "mutuelle",
+        "hospitalisation",
+        "hôpital",
+        "médecin",
+        "médicament",
+        "lunettes",
+        "optique",
+        "dentaire",
+        "soins",
+        "prévoyance",
+        "invalidité",
+        "incapacité",
+        "arrêt de travail",
+    ],
+    "habitation_vie_quotidienne_assurance.pdf": [
+        "habitation",
+        "logement",
+        "maison",
+        "appartement",
+        "locataire",
+        "propriétaire",
+        "dégât des eaux",
+        "dégâts des eaux",
+        "cambriolage",
+        "cambriolé",
+        "incendie",
+        "responsabilité civile",
+        "déménagement",
+        "meubles",
+    ],
+    "loisirs_assurance.pdf": [
+        "loisirs",
+        "ski",
+        "sport",
+        "sports d'hiver",
+        "voyage",
+        "vacances",
+        "randonnée",
+        "bateau",
+        "vélo",
+        "chasse",
+    ],
+    "epargnage_retrait_assurance.pdf": [
+        "épargne",
+        "assurance vie",
+        "assurance-vie",
+        "retraite",
+        "rachat",
+        "retrait",
+        "retirer",
+        "placement",
+        "capital",
+        "bénéficiaire",
+        "fonds euros",
+    ],
+}
+# General terms apply to every product line: always searched with a scope
+GENERAL_SOURCES = ["conditions_generales_assurance.pdf"]
+
+
+def _phrase(text: str) -> str:
+    return " " + " ".join(tokenize(text)) + " "
+
+
+_KEYWORDS = {
+    source: [_phrase(keyword) for keyword in keywords]
+    for source, keywords in PRODUCT_KEYWORDS.items()
+}
+
+
+def route_sources(query: str):
+    """
+    Sources (PDF names) to search for `query`, or None for the whole corpus.
+
+    Keywords are matched on the BM25 token form (accents, stopwords and
+    plurals folded), so "les dégâts des eaux" matches "dégât des eaux".
+    """
+    text = _phrase(query)
+    sources = [
+        source
+        for source, keywords in _KEYWORDS.items()
+        if any(keyword in text for keyword in keywords)
+    ]
+    if not sources:
+        return None
+    return sources + GENERAL_SOURCES
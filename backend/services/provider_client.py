@@ -0,0 +1,158 @@
+import time
+import asyncio
+import threading
+import importlib.util
+from contextlib import asynccontextmanager, contextmanager
+
+import httpx
+
+from backend.utils.remote_calls import record_remote_call
+
+# HTTP/2 needs the optional `h2` package; fall back to HTTP/1.1 keep-alive
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# Per-endpoint budgets (seconds). Connect is short: pooled connections are reused.
+ENDPOINT_TIMEOUTS = {
+    "llm": httpx.Timeout(15.0, connect=3.0),
+    "nlu": httpx.Timeout(10.0, connect=3.0),
+    "escalation": httpx.Timeout(8.0, connect=3.0),
+    "tts": httpx.Timeout(10.0, connect=3.0),
+}
+DEFAULT_TIMEOUT = httpx.Timeout(10.0, connect=3.0)
+
+
+class ProviderClient:
+    """
+    Process-wide pooled HTTP client for the Groq and ElevenLabs APIs.
+
+    One keep-alive pool (HTTP/2 when available) is shared by LLMService,
+    NLUService, EscalationPolicy and TTSService, so a remote call reuses an
+    open TLS connection instead of paying a new handshake. Async methods are
+    used on the event loop; the *_sync variants serve blocking callers
+    (reports, CLI, scripts) from a second pool with the same settings.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 50,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 60.0,
+    ):
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self._async_client = None
+        self._sync_client = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def timeout_for(endpoint: str) -> httpx.Timeout:
+        return ENDPOINT_TIMEOUTS.get(endpoint, DEFAULT_TIMEOUT)
+
+    @property
+    def async_client(self) -> httpx.AsyncClient:
+        with self._lock:
+            if self._async_client is None or self._async_client.is_closed:
+                self._async_client = httpx.AsyncClient(
+                    http2=HTTP2_AVAILABLE, limits=self.limits, timeout=DEFAULT_TIMEOUT
+                )
+            return self._async_client
+
+    @property
+    def sync_client(self) -> httpx.Client:
+        with self._lock:
+            if self._sync_client is None or self._sync_client.is_closed:
+                self._sync_client = httpx.Client(
+                    http2=HTTP2_AVAILABLE, limits=self.limits, timeout=DEFAULT_TIMEOUT
+                )
+            return self._sync_client
+
+    # ─────────────────────────────────────────────────────────────
+    # Async API (event loop)
+    # ─────────────────────────────────────────────────────────────
+    async def post(self, endpoint: str, url: str, **kwargs) -> httpx.Response:
+        """POST and raise for HTTP errors. `endpoint` selects the timeout."""
+        record_remote_call(endpoint)
+        response = await self.async_client.post(
+            url, timeout=self.timeout_for(endpoint), **kwargs
+        )
+        response.raise_for_status()
+        return response
+
+    async def post_json(self, endpoint: str, url: str, **kwargs) -> dict:
+        response = await self.post(endpoint, url, **kwargs)
+        return response.json()
+
+    @asynccontextmanager
+    async def stream(self, endpoint: str, url: str, **kwargs):
+        """Streaming POST; yields the response for `aiter_lines()`."""
+        record_remote_call(endpoint)
+        async with self.async_client.stream(
+            "POST", url, timeout=self.timeout_for(endpoint), **kwargs
+        ) as response:
+            response.raise_for_status()
+            yield response
+
+    async def warm(self, urls) -> dict:
+        """
+        Open a pooled connection to the host of each URL; returns {host: ms}.
+
+        Only the host root is requested, without credentials: any HTTP answer
+        means the TLS session is up, and no provider API call is made.
+        """
+        origins = {}
+        for url in urls:
+            url = httpx.URL(url)
+            origins.setdefault(url.host, url.join("/"))
+
+        async def connect(origin):
+            started = time.perf_counter()
+            await self.async_client.get(origin, timeout=DEFAULT_TIMEOUT)
+            return round((time.perf_counter() - started) * 1000)
+
+        latencies = await asyncio.gather(*(connect(o) for o in origins.values()))
+        return dict(zip(origins, latencies))
+
+    async def aclose(self):
+        if self._async_client is not None:
+            await self._async_client.aclose()
+        if self._sync_client is not None:
+            self._sync_client.close()
+
+    # ─────────────────────────────────────────────────────────────
+    # Blocking API (worker threads, CLI)
+    # ─────────────────────────────────────────────────────────────
+    def post_sync(self, endpoint: str, url: str, **kwargs) -> httpx.Response:
+        record_remote_call(endpoint)
+        response = self.sync_client.post(
+            url, timeout=self.timeout_for(endpoint), **kwargs
+        )
+        response.raise_for_status()
+        return response
+
+    def post_json_sync(self, endpoint: str, url: str, **kwargs) -> dict:
+        return self.post_sync(endpoint, url, **kwargs).json()
+
+    @contextmanager
+    def stream_sync(self, endpoint: str, url: str, **kwargs):
+        record_remote_call(endpoint)
+        with self.sync_client.stream(
+            "POST", url, timeout=self.timeout_for(endpoint), **kwargs
+        ) as response:
+            response.raise_for_status()
+            yield response
+
+
+_provider_client = None
+_provider_lock = threading.Lock()
+
+
+def get_provider_client() -> ProviderClient:
+    """Return the process-wide ProviderClient."""
+    global _provider_client
+    with _provider_lock:
+        if _provider_client is None:
+            _provider_client = ProviderClient()
+        return _provider_client
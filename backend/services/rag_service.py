@@ -1,59 +1,330 @@
 import os
+import re
+import time
+import threading
 from typing import List
-import chromadb
-from chromadb.config import Settings
-from sentence_transformers import SentenceTransformer
+from collections import OrderedDict
+from concurrent.futures import Future
+from backend.services.bm25_index import BM25_PATH, BM25Index, reciprocal_rank_fusion
+from backend.services.embedding_backends import DEFAULT_MODEL, get_embedder
+from backend.services.product_router import route_sources
+from backend.utils.metrics import Histogram
+from backend.services.vector_index import INDEX_DIR, NumpyIndex, export_collection
+
+
+def normalize_query(query: str) -> str:
+    """Cache key for a query: lowercase, single spaces, no edge punctuation."""
+    query = " ".join(query.lower().split())
+    return re.sub(r"^[\W_]+|[\W_]+$", "", query)
 
 
 class RAGService:
+    # Query cache (embedding + top-k results per normalized query)
+    CACHE_SIZE = int(os.getenv("RAG_CACHE_SIZE", "1000"))
+    CACHE_TTL_S = float(os.getenv("RAG_CACHE_TTL_S", "3600"))
+    # How often the collection fingerprint is re-read to detect re-ingestion
+    CHANGE_CHECK_S = 5.0
+    # Hybrid retrieval: BM25 (built by embed_faqs.py) fused with dense results
+    HYBRID = os.getenv("RAG_HYBRID", "1") != "0"
+    CANDIDATES = 10  # per ranking, before fusion
+    # Product-line scoping: search only the PDFs a query is about, widened to
+    # the whole corpus when the best scoped chunk scores below SCOPE_MIN_SCORE
+    SCOPED = os.getenv("RAG_SCOPED", "1") != "0"
+    SCOPE_MIN_SCORE = float(os.getenv("RAG_SCOPE_MIN_SCORE", "0.35"))
+
     def __init__(
         self,
         persist_dir="backend/vectorstore/chroma",
         collection_name="insurance_faqs",
-        embedding_model="sentence-transformers/all-mpnet-base-v2",
+        embedding_model=DEFAULT_MODEL,
+        embedding_backend=None,
+        index=None,
+        index_dir=INDEX_DIR,
+        bm25_path=BM25_PATH,
     ):
         os.makedirs(persist_dir, exist_ok=True)
+        self.persist_dir = persist_dir
+        self.index_dir = index_dir
+        self.bm25_path = bm25_path
+
+        # RAG_INDEX: chroma (default) or numpy (exported in-process index,
+        # no Chroma client at runtime once the export exists)
+        self.index_mode = index or os.getenv("RAG_INDEX", "chroma")
+        self.collection = None
+        self.index = None
+        if self.index_mode == "numpy":
+            if not NumpyIndex.exists(index_dir):
+                export_collection(self._open_collection(collection_name), index_dir)
+            self.index = NumpyIndex(index_dir)
+            print(f"[RAG] NumPy index loaded: {len(self.index)} chunks")
+        else:
+            self.collection = self._open_collection(collection_name)
+
+        # RAG_EMBEDDING_BACKEND: torch (default), onnx or onnx-int8
+        self.embedder = get_embedder(embedding_backend, embedding_model)
+
+        self.has_data = self._count() > 0
+
+        self.lexical = None
+        if self.HYBRID and BM25Index.exists(bm25_path):
+            self.lexical = BM25Index(bm25_path)
+            print(f"[RAG] BM25 index loaded: {len(self.lexical.terms)} terms")
+        # Fused rankings put exact-term matches first, so fewer chunks suffice
+        self.top_k = int(os.getenv("RAG_TOP_K", "3" if self.lexical else "4"))
+        self.fusion_ms = Histogram([0.1, 0.25, 0.5, 1, 2, 5])
+        self.scope_stats = {"scoped": 0, "widened": 0, "unscoped": 0}
+
+        self._cache = OrderedDict()  # query -> {"embedding", "results", "created"}
+        self._cache_lock = threading.Lock()
+        self._cache_hits = 0
+        self._cache_misses = 0
+        self._embedding_hits = 0
+        self._embedding_shared = 0
+        self._embedding_inflight = {}  # query key -> Future of its embedding
+        self._invalidations = 0
+        self._fingerprint = self._collection_fingerprint()
+        self._checked_at = time.monotonic()
+
+    def _open_collection(self, collection_name: str):
+        import chromadb
+        from chromadb.config import Settings
 
         self.client = chromadb.PersistentClient(
-            path=persist_dir,
+            path=self.persist_dir,
             settings=Settings(anonymized_telemetry=False),
         )
+        collection = self.client.get_or_create_collection(name=collection_name)
+        self._space = (collection.metadata or {}).get("hnsw:space", "l2")
+        return collection
 
-        self.collection = self.client.get_or_create_collection(name=collection_name)
-
-        self.embedder = SentenceTransformer(embedding_model)
-
-        self.has_data = self.collection.count() > 0
+    def _count(self) -> int:
+        if self.index is not None:
+            return len(self.index)
+        return self.collection.count()
 
     def check_collection_status(self) -> bool:
         """Return True if collection has documents."""
         try:
-            count = self.collection.count()
+            count = self._count()
             return count > 0
         except Exception:
             return False
 
-    def retrieve(self, query: str, k: int = 4) -> List[str]:
-        """Retrieve top-k relevant documents from Chroma."""
-        if not self.has_data:
-            return []
+    # ─────────────────────────────────────────────────────────────
+    # Query cache
+    # ─────────────────────────────────────────────────────────────
+    def _collection_fingerprint(self) -> tuple:
+        """Changes whenever the collection or the BM25 index is written."""
+        lexical = BM25Index.version(self.bm25_path)
+        if self.index is not None:
+            return "numpy", NumpyIndex.version(self.index_dir), lexical
+        try:
+            count = self.collection.count()
+        except Exception:
+            count = -1
+        store = os.path.join(self.persist_dir, "chroma.sqlite3")
+        mtime = os.path.getmtime(store) if os.path.exists(store) else 0.0
+        return count, mtime, lexical
+
+    def _check_collection_changed(self):
+        now = time.monotonic()
+        if now - self._checked_at < self.CHANGE_CHECK_S:
+            return
+        self._checked_at = now
+        fingerprint = self._collection_fingerprint()
+        if fingerprint != self._fingerprint:
+            print(f"[RAG] Collection changed {self._fingerprint} -> {fingerprint}")
+            self._fingerprint = fingerprint
+            if self.index is not None:
+                self.index = NumpyIndex(self.index_dir)
+            if self.HYBRID and BM25Index.exists(self.bm25_path):
+                self.lexical = BM25Index(self.bm25_path)
+            self.has_data = self.check_collection_status()
+            self.invalidate_cache()
+
+    @property
+    def generation(self) -> int:
+        """Bumped whenever retrieval results may have changed."""
+        return self._invalidations
+
+    def invalidate_cache(self):
+        with self._cache_lock:
+            self._cache.clear()
+            self._invalidations += 1  # also drops results still in flight
+
+    def _cache_entry(self, key: str):
+        """Live cache entry for `key` (expired entries are dropped)."""
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() - entry["created"] > self.CACHE_TTL_S:
+            del self._cache[key]
+            return None
+        self._cache.move_to_end(key)
+        return entry
+
+    def _cache_put(
+        self, key: str, embedding=None, k=None, results=None, generation=None
+    ):
+        with self._cache_lock:
+            if generation is not None and generation != self._invalidations:
+                return
+            entry = self._cache_entry(key)
+            if entry is None:
+                entry = {"embedding": None, "results": {}, "created": time.monotonic()}
+                self._cache[key] = entry
+            if embedding is not None:
+                entry["embedding"] = embedding
+            if results is not None:
+                entry["results"][k] = results
+            while len(self._cache) > self.CACHE_SIZE:
+                self._cache.popitem(last=False)
+
+    def embed_query(self, query: str) -> list:
+        """
+        Normalized query embedding, computed once per cached query.
+
+        Concurrent calls for the same query (NLU and retrieval of one turn)
+        wait for the encode already in flight instead of running their own.
+        """
+        key = normalize_query(query)
+        with self._cache_lock:
+            entry = self._cache_entry(key)
+            if entry is not None and entry["embedding"] is not None:
+                self._embedding_hits += 1
+                return entry["embedding"]
+            inflight = self._embedding_inflight.get(key)
+            if inflight is None:
+                future = self._embedding_inflight[key] = Future()
+            else:
+                self._embedding_shared += 1
+        if inflight is not None:
+            return inflight.result()
 
         try:
-            embedding = self.embedder.encode(
-                [query], normalize_embeddings=True
-            ).tolist()
+            embedding = self.embedder.encode([query])[0].tolist()
+            self._cache_put(key, embedding=embedding)
+            future.set_result(embedding)
+            return embedding
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._cache_lock:
+                self._embedding_inflight.pop(key, None)
 
+    # ─────────────────────────────────────────────────────────────
+    # Retrieval
+    # ─────────────────────────────────────────────────────────────
+    def _dense_search(self, embedding, n_results: int, sources=None) -> tuple:
+        """(ids, documents, cosine scores) best first, optionally within `sources`."""
+        if self.index is not None:
+            results = self.index.search(embedding, n_results, sources)
+            return results["ids"], results["documents"], results["scores"]
+
+        where = {"source": {"$in": sources}} if sources is not None else None
+        try:
             results = self.collection.query(
-                query_embeddings=embedding,
-                n_results=k,
-                include=["documents", "metadatas"],
+                query_embeddings=[embedding],
+                n_results=n_results,
+                where=where,
+                include=["documents", "distances"],
             )
+        except Exception as e:
+            if where is None:
+                raise
+            print(f"[RAG] Scoped query failed ({e}), searching everything")
+            return [], [], []
+        ids = results.get("ids", [[]])[0]
+        docs = (results.get("documents") or [[]])[0]
+        distances = (results.get("distances") or [[]])[0]
+        # Unit vectors: squared L2 = 2 - 2 cos; cosine distance = 1 - cos
+        if self._space == "l2":
+            scores = [1 - d / 2 for d in distances]
+        else:
+            scores = [1 - d for d in distances]
+        return ids, docs, scores
+
+    def _scoped_search(self, query: str, embedding, n_results: int, k: int):
+        """Dense search inside the query's product line, widened when weak."""
+        sources = route_sources(query) if self.SCOPED else None
+        if sources is None:
+            self.scope_stats["unscoped"] += 1
+            return (*self._dense_search(embedding, n_results), None)
+
+        ids, docs, scores = self._dense_search(embedding, n_results, sources)
+        if len(ids) >= k and scores and scores[0] >= self.SCOPE_MIN_SCORE:
+            self.scope_stats["scoped"] += 1
+            return ids, docs, scores, sources
+
+        self.scope_stats["widened"] += 1
+        return (*self._dense_search(embedding, n_results), None)
 
-            docs = results.get("documents", [[]])
-            if docs and docs[0]:
-                return docs[0]
+    def _fuse(self, query: str, ids: list, docs: list, k: int, sources=None):
+        """Reciprocal rank fusion of the dense ranking with BM25."""
+        started = time.perf_counter()
+        texts = dict(zip(ids, docs))
+        lexical_ids = []
+        for row in self.lexical.search(query, self.CANDIDATES, sources):
+            lexical_ids.append(self.lexical.ids[row])
+            texts.setdefault(self.lexical.ids[row], self.lexical.documents[row])
+        fused = reciprocal_rank_fusion([ids, lexical_ids], k)
+        self.fusion_ms.observe((time.perf_counter() - started) * 1000)
+        return fused, [texts[i] for i in fused]
+
+    def retrieve(self, query: str, k: int = None) -> List[str]:
+        """Retrieve top-k relevant documents (dense, fused with BM25 if built)."""
+        k = k or self.top_k
+        self._check_collection_changed()
+        if not self.has_data:
+            return []
+
+        key = normalize_query(query)
+        with self._cache_lock:
+            entry = self._cache_entry(key)
+            if entry is not None and k in entry["results"]:
+                self._cache_hits += 1
+                return list(entry["results"][k]["documents"])
+            self._cache_misses += 1
+            generation = self._invalidations
+
+        try:
+            embedding = self.embed_query(query)
+            lexical = self.lexical
+            n_results = max(k, self.CANDIDATES) if lexical is not None else k
+
+            ids, docs, _, sources = self._scoped_search(query, embedding, n_results, k)
+
+            if lexical is not None:
+                ids, docs = self._fuse(query, ids, docs, k, sources)
+
+            if docs:
+                self._cache_put(
+                    key,
+                    k=k,
+                    results={"ids": ids, "documents": docs},
+                    generation=generation,
+                )
+                return docs
 
         except Exception:
             return []
 
         return []
+
+    def get_cache_stats(self) -> dict:
+        hits, misses = self._cache_hits, self._cache_misses
+        return {
+            "cache_hits": hits,
+            "cache_misses": misses,
+            "cache_size": len(self._cache),
+            "cache_hit_rate": (hits / (hits + misses) if (hits + misses) > 0 else 0.0),
+            "embedding_hits": self._embedding_hits,
+            "embedding_shared": self._embedding_shared,
+            "invalidations": self._invalidations,
+            "index": self.index_mode,
+            "hybrid": self.lexical is not None,
+            "top_k": self.top_k,
+            "scope": dict(self.scope_stats),
+            "fusion_ms": self.fusion_ms.snapshot(),
+        }
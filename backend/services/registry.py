@@ -0,0 +1,161 @@
+"""
+Process-wide service registry.
+
+Every heavy service (Whisper, the embedding model and vector store, TTS
+engines, HTTP clients) is built on first `get`, exactly once per process,
+and shared by the FastAPI app, the WebSocket handler, the controllers and
+the console demo. Service modules are imported inside the factories, so
+importing the app loads no model; `startup` builds everything in
+STARTUP_ORDER before the first request.
+"""
+
+import os
+import time
+import threading
+
+
+def _asr():
+    # ASR_WORKERS>0 runs Whisper in that many worker processes
+    workers = int(os.getenv("ASR_WORKERS", "0"))
+    if workers:
+        from backend.services.asr_worker_pool import ASRWorkerPool
+
+        return ASRWorkerPool(workers)
+    from backend.services.asr_service import ASRService
+
+    return ASRService()
+
+
+def _rag():
+    from backend.services.rag_service import RAGService
+
+    return RAGService()
+
+
+def _nlu():
+    from backend.services.nlu_service import NLUService
+
+    if os.getenv("NLU_LOCAL", "1") == "0":
+        return NLUService()
+    from backend.services.intent_classifier import IntentClassifier
+
+    # Same embedder as retrieval; query embeddings are shared through its cache
+    rag = get("rag")
+    classifier = IntentClassifier(rag.embedder.encode, embed=rag.embed_query)
+    return NLUService(classifier=classifier)
+
+
+def _llm():
+    from backend.services.llm_service import LLMService
+
+    return LLMService()
+
+
+def _tts():
+    from backend.services.tts_service import TTSService
+
+    return TTSService()
+
+
+def _phrases():
+    from backend.services.phrase_bank import PhraseBank
+
+    return PhraseBank(get("tts"))
+
+
+def _answer_cache():
+    from backend.services.answer_cache import SemanticAnswerCache
+
+    rag = get("rag")
+    return SemanticAnswerCache(rag.embed_query, generation=lambda: rag.generation)
+
+
+def _confidence():
+    from backend.services.confidence_manager import ConfidenceManager
+
+    return ConfidenceManager()
+
+
+def _escalation():
+    from backend.services.escalation_policy import EscalationPolicy
+
+    # AI severity validation uses the shared provider client
+    return EscalationPolicy(confidence_limit=0.3, use_ai_validation=True)
+
+
+def _orchestrator():
+    from backend.controllers.orchestrator import Orchestrator
+
+    return Orchestrator(
+        llm_service=get("llm"),
+        answer_cache=get("answer_cache"),
+        confidence_manager=get("confidence"),
+        escalation_policy=get("escalation"),
+    )
+
+
+def _pipeline():
+    from backend.services.voice_pipeline import VoicePipeline
+
+    return VoicePipeline()
+
+
+FACTORIES = {
+    "asr": _asr,
+    "rag": _rag,
+    "nlu": _nlu,
+    "llm": _llm,
+    "tts": _tts,
+    "phrases": _phrases,
+    "answer_cache": _answer_cache,
+    "confidence": _confidence,
+    "escalation": _escalation,
+    "orchestrator": _orchestrator,
+    "pipeline": _pipeline,
+}
+# Dependencies before dependents, the slowest model loads first
+STARTUP_ORDER = list(FACTORIES)
+
+_instances = {}
+_load_seconds = {}
+_lock = threading.RLock()  # re-entrant: factories get their dependencies
+
+
+def get(name: str):
+    """The process-wide instance of `name`, built on first use."""
+    service = _instances.get(name)
+    if service is not None:
+        return service
+    with _lock:
+        if name not in _instances:
+            started = time.perf_counter()
+            _instances[name] = FACTORIES[name]()
+            _load_seconds[name] = time.perf_counter() - started
+            print(f"[REGISTRY] {name} ready in {_load_seconds[name]:.2f}s")
+        return _instances[name]
+
+
+def startup(names=None) -> dict:
+    """Build services in order; returns {name: load seconds}."""
+    for name in names or STARTUP_ORDER:
+        get(name)
+    return dict(_load_seconds)
+
+
+def loaded() -> dict:
+    """Services built so far, with their load time in seconds."""
+    return dict(_load_seconds)
+
+
+def shutdown():
+    """Close built services in reverse startup order and forget them."""
+    with _lock:
+        for name in reversed(list(_instances)):
+            close = getattr(_instances[name], "close", None)
+            if callable(close):
+                try:
+                    close()
+                except Exception as e:
+                    print(f"[REGISTRY] Closing {name} failed: {e}")
+        _instances.clear()
+        _load_seconds.clear()
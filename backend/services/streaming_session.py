@@ -1,20 +1,238 @@
+import math
 import time
+import threading
 from collections import deque
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from backend.utils.audio_utils import EnergyVAD, pcm16_to_float32
+
+if TYPE_CHECKING:
+    from backend.services.asr_service import ASRService
 
 
 class StreamingSession:
-    def __init__(self):
-        self.audio_chunks = deque()
-        self.last_activity = time.time()
-        self.text_buffer = []
+    """
+    Per-connection buffer for streamed PCM16 (16 kHz mono) audio frames.
 
-    def add_chunk(self, audio_path: str):
-        self.audio_chunks.append(audio_path)
+    An energy VAD detects speech onset and end-of-utterance. While the caller
+    speaks, `decode_partial` transcribes the not-yet-committed part of the
+    utterance (a sliding window) and commits words that are old enough to be
+    stable, so at the endpoint `finalize` only has to decode a short tail.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = 16000,
+        frame_ms: int = 30,
+        min_speech_ms: int = 150,
+        endpoint_silence_ms: int = 700,
+        pre_roll_ms: int = 300,
+        partial_every_ms: int = 600,
+        holdback_s: float = 1.0,
+        min_commit_window_s: float = 2.0,
+        max_utterance_s: float = 30.0,
+    ):
+        self.sample_rate = sample_rate
+        self.vad = EnergyVAD(sample_rate=sample_rate, frame_ms=frame_ms)
+        self.frame_ms = frame_ms
+        self.min_speech_ms = min_speech_ms
+        self.endpoint_silence_ms = endpoint_silence_ms
+        self.partial_every_samples = sample_rate * partial_every_ms // 1000
+        self.holdback_s = holdback_s
+        self.min_commit_window_s = min_commit_window_s
+        self.max_utterance_samples = int(sample_rate * max_utterance_s)
+
+        self.audio_chunks = deque()  # frames of the current utterance
+        self.pre_roll = deque(maxlen=max(1, pre_roll_ms // frame_ms))
         self.last_activity = time.time()
+        self.text_buffer = []  # committed (stable) words of the utterance
 
-    def get_buffered_audio(self):
-        return list(self.audio_chunks)
+        self._lock = threading.Lock()
+        self._odd_byte = b""
+        self._speech_run_ms = 0
+        self._reset_utterance()
 
-    def clear(self):
+    def _reset_utterance(self):
         self.audio_chunks.clear()
         self.text_buffer.clear()
+        self.in_speech = False
+        self.endpoint_reached = False
+        self.language = None
+        self.partial_text = ""
+        self._audio = np.zeros(0, dtype=np.float32)
+        self._total_samples = 0
+        self._committed_samples = 0
+        self._decoded_samples = 0
+        self._silence_ms = 0
+        self._logprobs = []
+
+    # ─────────────────────────────────────────────────────────────
+    # Buffering and endpointing (event loop)
+    # ─────────────────────────────────────────────────────────────
+    def add_frame(self, pcm: bytes, min_speech_ms: int = None):
+        """
+        Buffer one PCM16 frame. Returns "speech_start" when speech begins,
+        "endpoint" when the utterance is complete, otherwise None.
+
+        `min_speech_ms` overrides the onset threshold, e.g. a stricter one
+        while the AI is speaking (barge-in) to ignore echo and short noises.
+        """
+        min_speech_ms = min_speech_ms or self.min_speech_ms
+        self.last_activity = time.time()
+        pcm = self._odd_byte + pcm
+        if len(pcm) % 2:
+            pcm, self._odd_byte = pcm[:-1], pcm[-1:]
+        else:
+            self._odd_byte = b""
+
+        event = None
+        for frame, is_speech in self.vad.frames(pcm16_to_float32(pcm)):
+            if self.endpoint_reached:
+                # Utterance waiting for finalize: keep context for the next one
+                self.pre_roll.append(frame)
+                continue
+
+            if not self.in_speech:
+                self.pre_roll.append(frame)
+                self._speech_run_ms = (
+                    self._speech_run_ms + self.frame_ms if is_speech else 0
+                )
+                if self._speech_run_ms >= min_speech_ms:
+                    self.in_speech = True
+                    for buffered in self.pre_roll:
+                        self._append(buffered)
+                    self.pre_roll.clear()
+                    event = "speech_start"
+                continue
+
+            self._append(frame)
+            self._silence_ms = 0 if is_speech else self._silence_ms + self.frame_ms
+            if (
+                self._silence_ms >= self.endpoint_silence_ms
+                or self._total_samples >= self.max_utterance_samples
+            ):
+                self.endpoint_reached = True
+                self._speech_run_ms = 0
+                event = "endpoint"
+
+        return event
+
+    def _append(self, frame: np.ndarray):
+        with self._lock:
+            self.audio_chunks.append(frame)
+            self._total_samples += len(frame)
+
+    def needs_partial(self) -> bool:
+        """True when enough new speech arrived since the last partial decode."""
+        return (
+            self.in_speech
+            and not self.endpoint_reached
+            and self._total_samples - self._decoded_samples
+            >= self.partial_every_samples
+        )
+
+    def get_buffered_audio(self) -> np.ndarray:
+        """Return the current utterance as one float32 array."""
+        with self._lock:
+            if self.audio_chunks:
+                self._audio = np.concatenate([self._audio, *self.audio_chunks])
+                self.audio_chunks.clear()
+            return self._audio
+
+    # ─────────────────────────────────────────────────────────────
+    # Incremental decoding (worker thread)
+    # ─────────────────────────────────────────────────────────────
+    def decode_partial(self, asr: "ASRService") -> str:
+        """
+        Decode the uncommitted window and commit words ending more than
+        `holdback_s` before the end of the window. Returns the partial transcript.
+        """
+        audio = self.get_buffered_audio()
+        window = audio[self._committed_samples :]
+        window_s = len(window) / self.sample_rate
+        self._decoded_samples = len(audio)
+        if window_s < 0.5:
+            return self.partial_text
+
+        result = asr.transcribe_window(
+            window,
+            beam_size=1,
+            language=self.language,
+            initial_prompt=" ".join(self.text_buffer) or None,
+            word_timestamps=True,
+        )
+        self.language = self.language or result["language"]
+
+        words = [w for seg in result["segments"] for w in seg["words"]]
+        stable = []
+        if window_s >= self.min_commit_window_s:
+            cutoff = window_s - self.holdback_s
+            stable = [w for w in words if w["end"] <= cutoff]
+
+        if stable:
+            self.text_buffer.append("".join(w["word"] for w in stable).strip())
+            self._logprobs.extend(math.log(max(w["probability"], 1e-6)) for w in stable)
+            self._committed_samples += int(stable[-1]["end"] * self.sample_rate)
+            tail = "".join(w["word"] for w in words[len(stable) :]).strip()
+        else:
+            tail = result["text"]
+
+        self.partial_text = " ".join(t for t in [*self.text_buffer, tail] if t)
+        return self.partial_text
+
+    def finalize(self, asr: "ASRService") -> dict:
+        """Decode the remaining tail and return the full utterance transcript."""
+        audio = self.get_buffered_audio()
+        window = audio[self._committed_samples :]
+        total_s = len(audio) / self.sample_rate
+        tail_s = len(window) / self.sample_rate
+
+        texts = list(self.text_buffer)
+        logprobs = list(self._logprobs)
+        language = self.language or "fr"
+
+        if tail_s >= 0.2:
+            result = asr.transcribe_window(
+                window,
+                beam_size=3,
+                language=self.language,
+                initial_prompt=" ".join(self.text_buffer) or None,
+            )
+            language = self.language or result["language"]
+            texts.append(result["text"])
+            logprobs.extend(
+                seg["avg_logprob"]
+                for seg in result["segments"]
+                if seg["avg_logprob"] is not None
+            )
+
+        from backend.services.asr_service import ASRService
+
+        confidence = (
+            ASRService.calibrate_confidence(sum(logprobs) / len(logprobs))
+            if logprobs
+            else 0.0
+        )
+        predecoded = 1 - tail_s / total_s if total_s else 0.0
+        print(
+            f"[ASR][STREAM] utterance={total_s:.1f}s tail={tail_s:.1f}s "
+            f"pre-decoded={predecoded:.0%}"
+        )
+
+        with self._lock:
+            self._reset_utterance()
+
+        return {
+            "text": " ".join(t for t in texts if t).strip(),
+            "language": language,
+            "confidence": round(confidence, 2),
+            "audio_seconds": round(total_s, 2),
+            "predecoded_ratio": round(predecoded, 2),
+        }
+
+    def clear(self):
+        with self._lock:
+            self._reset_utterance()
+        self.pre_roll.clear()
@@ -0,0 +1,220 @@
+import os
+import tempfile
+import threading
+from pathlib import Path
+from collections import OrderedDict
+
+
+class MemoryLRU:
+    """Byte-budgeted in-memory LRU of audio clips (key -> bytes)."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, key: str):
+        with self._lock:
+            data = self._items.get(key)
+            if data is not None:
+                self._items.move_to_end(key)
+            return data
+
+    def put(self, key: str, data: bytes):
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._items.pop(key, None)
+            if previous is not None:
+                self.size -= len(previous)
+            self._items[key] = data
+            self.size += len(data)
+            while self.size > self.max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self.size -= len(evicted)
+                self.evictions += 1
+
+    def __len__(self):
+        return len(self._items)
+
+
+class DiskLRU:
+    """
+    Content-addressed, size-bounded clip store: one file per key in one
+    directory (`<key>.mp3`, or the key itself when it has an extension, e.g.
+    `<hash>.ulaw_8k` for other output formats). Writes go to a temp file
+    renamed into place, so readers never see a partial clip. The LRU order
+    is kept in memory and seeded from file mtimes at startup; hits refresh
+    the mtime so the order survives restarts.
+    """
+
+    def __init__(self, directory, max_bytes: int, suffix: str = ".mp3"):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.suffix = suffix
+        self.size = 0
+        self.evictions = 0
+        self._index = OrderedDict()  # key -> size, oldest first
+        self._lock = threading.Lock()
+        self._load_index()
+
+    def _load_index(self):
+        files = []
+        for path in self.directory.iterdir():
+            if path.suffix == ".tmp" or not path.is_file():
+                continue
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            files.append((stat.st_mtime, self._key_for(path), stat.st_size))
+        for _, key, size in sorted(files):
+            self._index[key] = size
+            self.size += size
+        with self._lock:
+            self._evict()
+
+    def _key_for(self, path: Path) -> str:
+        return path.stem if path.suffix == self.suffix else path.name
+
+    def path_for(self, key: str) -> Path:
+        return self.directory / (key if "." in key else f"{key}{self.suffix}")
+
+    def get_path(self, key: str):
+        """Path of a cached clip (marked as recently used), or None."""
+        with self._lock:
+            if key not in self._index:
+                return None
+            self._index.move_to_end(key)
+        path = self.path_for(key)
+        try:
+            os.utime(path)
+        except OSError:
+            with self._lock:
+                self.size -= self._index.pop(key, 0)
+            return None
+        return path
+
+    def get(self, key: str):
+        path = self.get_path(key)
+        if path is None:
+            return None
+        try:
+            return path.read_bytes()
+        except OSError:
+            return None
+
+    def put(self, key: str, data: bytes) -> Path:
+        path = self.path_for(key)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+        with self._lock:
+            self.size -= self._index.pop(key, 0)
+            self._index[key] = len(data)
+            self.size += len(data)
+            self._evict(keep=key)
+        return path
+
+    def _evict(self, keep: str = None):
+        """Drop least recently used files until under budget (lock held)."""
+        while self.size > self.max_bytes and self._index:
+            key, size = next(iter(self._index.items()))
+            if key == keep:
+                break
+            del self._index[key]
+            self.size -= size
+            self.evictions += 1
+            try:
+                self.path_for(key).unlink()
+            except OSError:
+                pass
+
+    def __len__(self):
+        return len(self._index)
+
+
+class TTSCache:
+    """
+    Two-tier cache of synthesized audio: hot clips as bytes in memory, the
+    rest on disk. Disk hits are promoted to memory.
+    """
+
+    def __init__(self, directory, memory_bytes: int = None, disk_bytes: int = None):
+        memory_bytes = memory_bytes or int(
+            float(os.getenv("TTS_MEMORY_CACHE_MB", "32")) * 1024 * 1024
+        )
+        disk_bytes = disk_bytes or int(
+            float(os.getenv("TTS_DISK_CACHE_MB", "512")) * 1024 * 1024
+        )
+        self.memory = MemoryLRU(memory_bytes)
+        self.disk = DiskLRU(directory, disk_bytes)
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "writes": 0}
+
+    def get(self, key: str):
+        """Cached clip bytes, or None on a miss."""
+        data = self.get_memory(key)
+        return data if data is not None else self.get_disk(key)
+
+    def get_memory(self, key: str):
+        """Memory tier only (never blocks on IO); misses are not counted."""
+        data = self.memory.get(key)
+        if data is not None:
+            self.stats["memory_hits"] += 1
+        return data
+
+    def get_disk(self, key: str):
+        """Disk tier, promoting hits to memory. Blocking file IO."""
+        data = self.disk.get(key)
+        if data is None:
+            self.stats["misses"] += 1
+            return None
+        self.stats["disk_hits"] += 1
+        self.memory.put(key, data)
+        return data
+
+    def get_path(self, key: str):
+        """Path of a cached clip on disk, or None on a miss."""
+        path = self.disk.get_path(key)
+        if path is not None:
+            self.stats["disk_hits"] += 1
+        else:
+            self.stats["misses"] += 1
+        return path
+
+    def put(self, key: str, data: bytes) -> Path:
+        self.stats["writes"] += 1
+        self.memory.put(key, data)
+        return self.disk.put(key, data)
+
+    def get_stats(self) -> dict:
+        lookups = (
+            self.stats["memory_hits"] + self.stats["disk_hits"] + self.stats["misses"]
+        )
+        hits = self.stats["memory_hits"] + self.stats["disk_hits"]
+        return {
+            **self.stats,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "memory": {
+                "entries": len(self.memory),
+                "bytes": self.memory.size,
+                "max_bytes": self.memory.max_bytes,
+                "evictions": self.memory.evictions,
+            },
+            "disk": {
+                "entries": len(self.disk),
+                "bytes": self.disk.size,
+                "max_bytes": self.disk.max_bytes,
+                "evictions": self.disk.evictions,
+            },
+        }
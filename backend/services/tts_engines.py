@@ -0,0 +1,233 @@
+import io
+import os
+import asyncio
+import importlib.util
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+
+import httpx
+import numpy as np
+from gtts import gTTS
+
+from backend.services.provider_client import get_provider_client
+from backend.utils.audio_utils import encode_mp3
+
+# Offline synthesis needs the optional `piper-tts` package and a voice model
+PIPER_AVAILABLE = importlib.util.find_spec("piper") is not None
+
+
+class TTSEngine:
+    """
+    One way of turning a sentence into MP3 bytes.
+
+    `synthesize` blocks (worker threads, CLI); `asynthesize` is used on the
+    event loop. Both return None on failure so TTSService can try the next
+    engine. `cache_tag` identifies the voice in cache keys.
+    """
+
+    name = "engine"
+    cache_tag = "engine"
+
+    def synthesize(self, text: str, lang: str):
+        raise NotImplementedError
+
+    async def asynthesize(self, text: str, lang: str):
+        return await asyncio.to_thread(self.synthesize, text, lang)
+
+    def close(self):
+        pass
+
+
+class ElevenLabsEngine(TTSEngine):
+    """ElevenLabs API over the shared provider connection pool."""
+
+    name = "elevenlabs"
+
+    def __init__(self, api_key: str, voice_id: str = "hpp4J3VqNfWAUOO0d1Us"):
+        self.api_key = api_key
+        self.voice_id = voice_id
+        self.cache_tag = voice_id
+        api_base = os.getenv("ELEVENLABS_API_BASE", "https://api.elevenlabs.io/v1")
+        self.url = f"{api_base.rstrip('/')}/text-to-speech/{voice_id}"
+        self.client = get_provider_client()
+
+    def _request(self, text: str) -> dict:
+        headers = {
+            "Accept": "audio/mpeg",
+            "Content-Type": "application/json",
+            "xi-api-key": self.api_key,
+        }
+
+        payload = {
+            "text": text,
+            "model_id": "eleven_multilingual_v2",
+            "voice_settings": {
+                "stability": 0.35,
+                "similarity_boost": 0.45,
+                "style": 0.0,
+                "use_speaker_boost": False,
+            },
+        }
+        return {"json": payload, "headers": headers}
+
+    @staticmethod
+    def _error(error: Exception):
+        if isinstance(error, httpx.TimeoutException):
+            print("[TTS] ElevenLabs timeout")
+        elif isinstance(error, httpx.HTTPError):
+            print(f"[TTS] ElevenLabs error: {error}")
+        else:
+            print(f"[TTS] Unexpected error: {error}")
+
+    def synthesize(self, text: str, lang: str):
+        try:
+            response = self.client.post_sync("tts", self.url, **self._request(text))
+            print(f"[TTS] ElevenLabs success: {len(response.content)} bytes")
+            return response.content
+        except Exception as e:
+            self._error(e)
+            return None
+
+    async def asynthesize(self, text: str, lang: str):
+        try:
+            response = await self.client.post("tts", self.url, **self._request(text))
+            print(f"[TTS] ElevenLabs success: {len(response.content)} bytes")
+            return response.content
+        except Exception as e:
+            self._error(e)
+            return None
+
+
+class GTTSEngine(TTSEngine):
+    """Google Translate TTS (remote, no key), run in a worker thread."""
+
+    name = "gtts"
+    cache_tag = "gtts"
+
+    def synthesize(self, text: str, lang: str):
+        try:
+            buffer = io.BytesIO()
+            gTTS(text=text, lang=lang, slow=False).write_to_fp(buffer)
+            print("[TTS] gTTS fallback success")
+            return buffer.getvalue()
+        except Exception as e:
+            print(f"[TTS] gTTS error: {e}")
+            return None
+
+
+# ─────────────────────────────────────────────────────────────
+# Local engine (worker processes)
+# ─────────────────────────────────────────────────────────────
+_piper_voice = None
+
+
+def _init_piper_worker(model_path: str, threads: int):
+    global _piper_voice
+    os.environ["OMP_NUM_THREADS"] = str(threads)
+    from piper import PiperVoice
+
+    _piper_voice = PiperVoice.load(model_path)
+
+
+def _piper_synthesize(text: str) -> bytes:
+    """Runs in a worker process: Piper PCM16 -> MP3 bytes."""
+    if hasattr(_piper_voice, "synthesize_stream_raw"):  # piper-tts < 1.3
+        pcm = b"".join(_piper_voice.synthesize_stream_raw(text))
+        samples = np.frombuffer(pcm, dtype=np.int16)
+        sample_rate = _piper_voice.config.sample_rate
+    else:
+        chunks = list(_piper_voice.synthesize(text))
+        samples = np.concatenate([chunk.audio_int16_array for chunk in chunks])
+        sample_rate = chunks[0].sample_rate
+    return encode_mp3(samples, sample_rate)
+
+
+class LocalEngine(TTSEngine):
+    """
+    Offline synthesis in a pool of worker processes, each holding its own
+    voice model, so CPU-bound synthesis never holds the server's GIL and
+    several sentences render at once.
+
+    `synthesize_fn(text) -> bytes` runs in the workers after
+    `initializer(*initargs)`; both must be importable module-level functions.
+    """
+
+    name = "local"
+
+    def __init__(
+        self,
+        synthesize_fn=_piper_synthesize,
+        initializer=None,
+        initargs=(),
+        workers: int = None,
+        cache_tag: str = "local",
+    ):
+        self.workers = workers or int(os.getenv("TTS_LOCAL_WORKERS", "2"))
+        self.synthesize_fn = synthesize_fn
+        self.cache_tag = cache_tag
+        self.pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=mp.get_context("spawn"),  # no fork of a threaded server
+            initializer=initializer,
+            initargs=initargs,
+        )
+        print(f"[TTS][LOCAL] {self.workers} worker processes ({cache_tag})")
+
+    @classmethod
+    def piper(cls, model_path: str = None, workers: int = None):
+        """Piper voice (e.g. fr_FR-siwis-medium.onnx) from TTS_LOCAL_MODEL."""
+        model_path = model_path or os.getenv("TTS_LOCAL_MODEL")
+        if not PIPER_AVAILABLE or not model_path or not os.path.exists(model_path):
+            raise RuntimeError(
+                "Local TTS needs `piper-tts` and TTS_LOCAL_MODEL pointing to a voice"
+            )
+        workers = workers or int(os.getenv("TTS_LOCAL_WORKERS", "2"))
+        threads = max(1, (os.cpu_count() or 2) // workers)
+        return cls(
+            _piper_synthesize,
+            initializer=_init_piper_worker,
+            initargs=(model_path, threads),
+            workers=workers,
+            cache_tag=f"piper:{os.path.basename(model_path)}",
+        )
+
+    def synthesize(self, text: str, lang: str):
+        try:
+            return self.pool.submit(self.synthesize_fn, text).result()
+        except Exception as e:
+            print(f"[TTS][LOCAL] Synthesis failed: {e}")
+            return None
+
+    async def asynthesize(self, text: str, lang: str):
+        try:
+            return await asyncio.wrap_future(self.pool.submit(self.synthesize_fn, text))
+        except Exception as e:
+            print(f"[TTS][LOCAL] Synthesis failed: {e}")
+            return None
+
+    def close(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+
+def build_engines(names: str = None) -> list:
+    """
+    Engines in fallback order from TTS_ENGINES (comma-separated, default
+    "elevenlabs,gtts"). ElevenLabs is skipped without an API key;
+    "local" alone runs a node with no remote TTS at all.
+    """
+    names = names or os.getenv("TTS_ENGINES", "elevenlabs,gtts")
+    engines = []
+    for name in (n.strip().lower() for n in names.split(",") if n.strip()):
+        if name == "elevenlabs":
+            api_key = os.getenv("ELEVENLABS_API_KEY")
+            if not api_key:
+                print("[TTS] ElevenLabs API key not found, using gTTS fallback")
+                continue
+            engines.append(ElevenLabsEngine(api_key))
+        elif name == "gtts":
+            engines.append(GTTSEngine())
+        elif name == "local":
+            engines.append(LocalEngine.piper())
+        else:
+            print(f"[TTS] Unknown engine '{name}' ignored")
+    return engines or [GTTSEngine()]
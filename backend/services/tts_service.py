@@ -1,147 +1,204 @@
 import os
-import uuid
+import re
+import asyncio
 import hashlib
-import requests
 from pathlib import Path
-from gtts import gTTS
+
 from dotenv import load_dotenv
+from backend.services.tts_cache import TTSCache
+from backend.services.tts_engines import build_engines
+from concurrent.futures import ThreadPoolExecutor
 
 load_dotenv()
 
 OUTPUT_DIR = "demo/tts_outputs"
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
+# Sentences missing from the cache are synthesized this many at a time
+TTS_MAX_PARALLEL = int(os.getenv("TTS_MAX_PARALLEL", "4"))
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?…])\s+")
+
+
+def normalize_sentence(sentence: str) -> str:
+    """Canonical form used for the cache key (quotes and spacing unified)."""
+    sentence = sentence.replace("’", "'").replace("\u00a0", " ")
+    return " ".join(sentence.split())
 
-class TTSService:
-    """Text-to-Speech service using ElevenLabs with gTTS fallback and caching."""
 
-    def __init__(self, lang: str = "fr"):
+def split_sentences(text: str) -> list[str]:
+    """Split a reply into normalized sentences, the unit of TTS caching."""
+    sentences = (normalize_sentence(s) for s in SENTENCE_BOUNDARY.split(text))
+    return [s for s in sentences if s]
+
+
+class TTSService:
+    """
+    Text-to-Speech service over pluggable engines (ElevenLabs with gTTS
+    fallback by default, or an offline local engine) and a two-tier
+    (memory + disk) cache. Replies are cached per sentence, so a sentence
+    repeated across answers is synthesized once; clips are synthesized
+    straight to bytes and written once, into the content-addressed disk cache.
+    """
+
+    def __init__(self, lang: str = "fr", engines: list = None):
         self.lang = lang
         self.cache_dir = Path(OUTPUT_DIR) / "cache"
-        self.cache_dir.mkdir(exist_ok=True)
+        self.cache = TTSCache(self.cache_dir)
 
-        self.api_key = os.getenv("ELEVENLABS_API_KEY")
-        self.voice_id = "hpp4J3VqNfWAUOO0d1Us"
-        self.elevenlabs_url = (
-            f"https://api.elevenlabs.io/v1/text-to-speech/{self.voice_id}"
-        )
-
-        self.use_elevenlabs = bool(self.api_key)
+        # Tried in order until one returns audio
+        self.engines = engines or build_engines()
+        self._executor = ThreadPoolExecutor(max_workers=TTS_MAX_PARALLEL)
+        self._synthesis_slots = asyncio.Semaphore(TTS_MAX_PARALLEL)
 
-        if not self.use_elevenlabs:
-            print("[TTS] ElevenLabs API key not found, using gTTS fallback")
-        else:
-            print(f"[TTS] ElevenLabs initialized with voice: {self.voice_id}")
+        print(f"[TTS] Engines: {', '.join(e.name for e in self.engines)}")
 
     def _get_cache_key(self, text: str, lang: str) -> str:
-        """Generate cache key from text and language."""
-        content = f"{text}_{lang}_{self.voice_id}".encode("utf-8")
-        return hashlib.md5(content).hexdigest()
+        """Generate cache key from text, language and the primary engine's voice."""
+        content = f"{text}_{lang}_{self.engines[0].cache_tag}".encode("utf-8")
+        return hashlib.sha256(content).hexdigest()
+
+    # ─────────────────────────────────────────────────────────────
+    # Per-sentence synthesis
+    # ─────────────────────────────────────────────────────────────
+    def _sentence_audio(self, sentence: str, lang: str):
+        key = self._get_cache_key(sentence, lang)
+        audio = self.cache.get(key)
+        if audio is not None:
+            return audio
+        return self._render(key, sentence, lang)
+
+    async def _asentence_audio(self, sentence: str, lang: str):
+        key = self._get_cache_key(sentence, lang)
+        audio = self.cache.get_memory(key)
+        if audio is None:
+            audio = await asyncio.to_thread(self.cache.get_disk, key)
+        if audio is not None:
+            return audio
+
+        audio = None
+        async with self._synthesis_slots:
+            for engine in self.engines:
+                audio = await engine.asynthesize(sentence, lang)
+                if audio:
+                    break
+        if not audio:
+            print("[TTS] All synthesis methods failed")
+            return None
+        await asyncio.to_thread(self._save_to_cache, key, audio)
+        return audio
+
+    def _render(self, key: str, text: str, lang: str):
+        """Synthesize a cache miss and store it."""
+        audio = None
+        for engine in self.engines:
+            audio = engine.synthesize(text, lang)
+            if audio:
+                break
+        if not audio:
+            print("[TTS] All synthesis methods failed")
+            return None
+        self._save_to_cache(key, audio)
+        return audio
 
-    def _synthesize_elevenlabs(self, text: str, output_path: str) -> bool:
+    def synthesize_bytes(self, text: str, lang: str = None):
         """
-        Synthesize speech using ElevenLabs API.
-        Returns True on success, False on failure.
+        Convert text to speech, one cached clip per sentence, missing
+        sentences synthesized in parallel. Falls back to gTTS if ElevenLabs
+        fails. Returns the joined MP3 bytes, or None on failure.
         """
-        headers = {
-            "Accept": "audio/mpeg",
-            "Content-Type": "application/json",
-            "xi-api-key": self.api_key,
-        }
-
-        payload = {
-            "text": text,
-            "model_id": "eleven_multilingual_v2",
-            "voice_settings": {
-                "stability": 0.35,
-                "similarity_boost": 0.45,
-                "style": 0.0,
-                "use_speaker_boost": False,
-            },
-        }
+        lang = lang or self.lang
+        sentences = split_sentences(text)
+        if not sentences:
+            return None
+        if len(sentences) == 1:
+            return self._sentence_audio(sentences[0], lang)
+
+        clips = list(
+            self._executor.map(lambda s: self._sentence_audio(s, lang), sentences)
+        )
+        return b"".join(clip for clip in clips if clip) or None
 
+    async def asynthesize_sentences(self, text: str, lang: str = None):
+        """
+        Yield `(sentence, audio)` in order. All sentences start synthesizing
+        at once, so the first clip is ready while the rest are still rendering.
+        """
+        lang = lang or self.lang
+        tasks = [
+            (sentence, asyncio.ensure_future(self._asentence_audio(sentence, lang)))
+            for sentence in split_sentences(text)
+        ]
         try:
-            response = requests.post(
-                self.elevenlabs_url,
-                json=payload,
-                headers=headers,
-                timeout=10,
-            )
-            response.raise_for_status()
-
-            with open(output_path, "wb") as f:
-                f.write(response.content)
-
-            print(f"[TTS] ElevenLabs success: {output_path}")
-            return True
-
-        except requests.exceptions.Timeout:
-            print("[TTS] ElevenLabs timeout")
-            return False
-        except requests.exceptions.RequestException as e:
-            print(f"[TTS] ElevenLabs error: {e}")
-            return False
-        except Exception as e:
-            print(f"[TTS] Unexpected error: {e}")
-            return False
+            for sentence, task in tasks:
+                audio = await task
+                if audio:
+                    yield sentence, audio
+        finally:
+            for _, task in tasks:
+                task.cancel()
+
+    async def asynthesize_bytes(self, text: str, lang: str = None):
+        """
+        Async `synthesize_bytes`: memory hits return without leaving the loop,
+        disk IO and the gTTS fallback run in a worker thread.
+        """
+        clips = [audio async for _, audio in self.asynthesize_sentences(text, lang)]
+        return b"".join(clips) or None
 
-    def _synthesize_gtts(self, text: str, lang: str, output_path: str) -> bool:
+    async def aencode(self, text: str, audio: bytes, fmt, lang: str = None):
         """
-        Fallback synthesis using gTTS.
-        Returns True on success, False on failure.
+        `audio` (the MP3 clip for `text`) in output format `fmt`, transcoded
+        once and then served from the cache like the MP3 itself.
         """
+        if fmt.codec == "mp3":
+            return audio
+        lang = lang or self.lang
+        key = f"{self._get_cache_key(normalize_sentence(text), lang)}.{fmt.name}"
+        data = self.cache.get_memory(key)
+        if data is None:
+            data = await asyncio.to_thread(self.cache.get_disk, key)
+        if data is None:
+            data = await asyncio.to_thread(fmt.encode, audio)
+            await asyncio.to_thread(self._save_to_cache, key, data)
+        return data
+
+    def _save_to_cache(self, key: str, audio: bytes):
         try:
-            tts = gTTS(text=text, lang=lang, slow=False)
-            tts.save(output_path)
-            print(f"[TTS] gTTS fallback success: {output_path}")
-            return True
+            self.cache.put(key, audio)
         except Exception as e:
-            print(f"[TTS] gTTS error: {e}")
-            return False
+            print(f"[TTS] Cache save failed: {e}")
+            self.cache.memory.put(key, audio)
 
     def synthesize(self, text: str, lang: str = None) -> str:
         """
-        Convert text to speech using ElevenLabs with caching.
-        Falls back to gTTS if ElevenLabs fails.
-        Returns path to the generated MP3 file, or None on failure.
+        Like `synthesize_bytes`, for callers that play a file.
+        Returns the path of the cached MP3, or None on failure.
         """
-        if lang is None:
-            lang = self.lang
-
-        text = text.strip()
-        if not text:
+        lang = lang or self.lang
+        sentences = split_sentences(text)
+        if not sentences:
             return None
 
-        cache_key = self._get_cache_key(text, lang)
-        cached_file = self.cache_dir / f"tts_{cache_key}.mp3"
-
-        if cached_file.exists():
-            print(f"[TTS] Cache hit: {cached_file}")
+        # A one-sentence reply shares its file with the sentence clip
+        key = self._get_cache_key(" ".join(sentences), lang)
+        cached_file = self.cache.get_path(key)
+        if cached_file is not None:
             return str(cached_file)
+        audio = self.synthesize_bytes(text, lang)
+        if audio is None:
+            return None
+        if len(sentences) > 1:
+            self._save_to_cache(key, audio)
+        cached_file = self.cache.disk.get_path(key)
+        return str(cached_file) if cached_file is not None else None
 
-        filename = f"tts_{uuid.uuid4().hex}.mp3"
-        output_path = os.path.join(OUTPUT_DIR, filename)
-
-        if self.use_elevenlabs:
-            if self._synthesize_elevenlabs(text, output_path):
-                try:
-                    import shutil
-
-                    shutil.copy(output_path, cached_file)
-                except Exception as e:
-                    print(f"[TTS] Cache save failed: {e}")
-
-                return output_path
-
-        if self._synthesize_gtts(text, lang, output_path):
-            try:
-                import shutil
-
-                shutil.copy(output_path, cached_file)
-            except Exception as e:
-                print(f"[TTS] Cache save failed: {e}")
+    async def asynthesize(self, text: str, lang: str = None) -> str:
+        """Async `synthesize`."""
+        return await asyncio.to_thread(self.synthesize, text, lang)
 
-            return output_path
+    def get_cache_stats(self) -> dict:
+        return self.cache.get_stats()
 
-        print("[TTS] All synthesis methods failed")
-        return None
+    def close(self):
+        for engine in self.engines:
+            engine.close()
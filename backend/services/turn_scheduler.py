@@ -0,0 +1,227 @@
+import time
+import asyncio
+
+
+class SpeculativeAnswer:
+    """
+    An LLM answer started before the turn decision is known.
+
+    Sentences are buffered as they arrive; `sentences()` replays the buffer
+    and then follows the live stream, so committing loses no head start.
+    """
+
+    def __init__(self, stream, intent_name: str):
+        self.intent_name = intent_name
+        self.started = time.perf_counter()
+        self.buffer = []
+        self.done = False
+        self.wasted = None
+        self._updated = asyncio.Event()
+        self.task = asyncio.ensure_future(self._pump(stream))
+
+    async def _pump(self, stream):
+        try:
+            async for sentence in stream:
+                self.buffer.append(sentence)
+                self._updated.set()
+        finally:
+            self.done = True
+            self._updated.set()
+
+    async def sentences(self):
+        index = 0
+        try:
+            while True:
+                if index < len(self.buffer):
+                    yield self.buffer[index]
+                    index += 1
+                    continue
+                if self.done:
+                    break
+                self._updated.clear()
+                await self._updated.wait()
+            await self.task  # surface stream errors to the consumer
+        finally:
+            if not self.task.done():
+                self.task.cancel()
+
+    def cancel(self, reason: str) -> dict:
+        """Abort the answer and return what it had cost so far."""
+        finished = self.done
+        self.task.cancel()
+        self.wasted = {
+            "reason": reason,
+            "elapsed_ms": round((time.perf_counter() - self.started) * 1000),
+            "sentences": len(self.buffer),
+            "completed": finished,
+        }
+        return self.wasted
+
+
+class TurnScheduler:
+    """
+    Runs one turn's independent steps concurrently once the transcript is known.
+
+    Intent detection, retrieval, the escalation severity check and a
+    speculative LLM answer all start together. The answer is only speculated
+    when the NLU regex fast-path already knows the intent, so it is written
+    for the intent the turn is decided on; it is cancelled when the decision
+    is escalate/clarify/goodbye. Other turns generate once, after deciding:
+    at most one generation call per turn. Every turn returns a trace of the
+    speculative work wasted.
+    """
+
+    def __init__(self, nlu, rag, orchestrator, escalation_policy, k: int = None):
+        self.nlu = nlu
+        self.rag = rag
+        self.orchestrator = orchestrator
+        self.escalation_policy = escalation_policy
+        self.k = k
+        self.stats = {
+            "turns": 0,
+            "speculated": 0,
+            "committed": 0,
+            "cancelled": 0,
+            "wasted_ms": 0,
+        }
+
+    def _speculative_intent(self, text: str):
+        """Intent to speculate on, or None when the turn will not be answered."""
+        guess = self.nlu.detect_intent_fast(text)
+        # A guessed intent could differ from the detected one and cost a
+        # second generation: only a fast-path match is speculated on
+        if guess is None or guess.name in ("GOODBYE", "UNKNOWN"):
+            return None
+        if self.orchestrator.is_explicit_agent_request(text.lower().strip()):
+            return None
+        return guess.name
+
+    async def _answer(self, call_session, text, intent_name, retrieval, stream):
+        contexts = await retrieval
+        context = "\n".join(contexts) if contexts else ""
+        async for sentence in self.orchestrator.answer_sentences(
+            call_session, text, intent_name, context, stream=stream
+        ):
+            yield sentence
+
+    async def run(
+        self, text, call_session, asr_conf, remote_calls, stream=False
+    ) -> dict:
+        """
+        Run the turn for the user message already added to `call_session`.
+        Must be called inside the turn's `count_remote_calls` scope.
+        """
+        decision_started = time.perf_counter()
+        self.stats["turns"] += 1
+
+        retrieval = asyncio.ensure_future(
+            asyncio.to_thread(self.rag.retrieve, text, self.k)
+        )
+        intent_task = asyncio.ensure_future(self.nlu.adetect_intent(text))
+        severity_task = asyncio.ensure_future(
+            self.escalation_policy.aprefetch_severity(text)
+        )
+
+        speculative = None
+        speculative_intent = self._speculative_intent(text)
+        if speculative_intent is not None:
+            self.stats["speculated"] += 1
+            speculative = SpeculativeAnswer(
+                self._answer(call_session, text, speculative_intent, retrieval, stream),
+                speculative_intent,
+            )
+
+        try:
+            detected_intent, contexts, _ = await asyncio.gather(
+                intent_task, retrieval, severity_task
+            )
+        except BaseException:
+            if speculative is not None:
+                speculative.cancel("error")
+            raise
+
+        # Severity is cached by now, so deciding makes no further remote call
+        decision = self.orchestrator.decide_turn(
+            call_session,
+            detected_intent,
+            asr_conf,
+            detected_intent.confidence if detected_intent else 0.0,
+        )
+        decision_ms = round((time.perf_counter() - decision_started) * 1000)
+
+        trace = {
+            "speculative_intent": speculative_intent,
+            "decision": decision["action"],
+            "decision_ms": decision_ms,
+            "outcome": "not_speculated",
+            "head_start_ms": 0,
+            "wasted": None,
+        }
+
+        answer = None
+        if speculative is not None:
+            if decision["action"] != "AUTO_HANDLED":
+                trace["outcome"] = "cancelled"
+                trace["wasted"] = speculative.cancel(decision["action"].lower())
+            elif decision["intent_name"] != speculative.intent_name:
+                trace["outcome"] = "cancelled"
+                trace["wasted"] = speculative.cancel("intent_mismatch")
+            else:
+                trace["outcome"] = "committed"
+                trace["head_start_ms"] = round(
+                    (time.perf_counter() - speculative.started) * 1000
+                )
+                answer = speculative.sentences()
+
+        if trace["outcome"] == "committed":
+            self.stats["committed"] += 1
+        elif trace["outcome"] == "cancelled":
+            self.stats["cancelled"] += 1
+            self.stats["wasted_ms"] += trace["wasted"]["elapsed_ms"]
+
+        response_stream = None
+        result = self.orchestrator.respond_without_llm(call_session, decision)
+        if result is not None:
+            result["remote_calls"] = remote_calls.total
+        else:
+            if answer is None:
+                context = "\n".join(contexts) if contexts else ""
+                answer = self.orchestrator.answer_sentences(
+                    call_session,
+                    text,
+                    decision["intent_name"],
+                    context,
+                    stream=stream,
+                )
+            result, response_stream = await self.orchestrator.acomplete_turn(
+                call_session, decision, answer, remote_calls, stream=stream
+            )
+
+        print(
+            f"[SCHED] decision={decision['action']} in {decision_ms} ms | "
+            f"speculation={trace['outcome']}"
+            + (
+                f" wasted={trace['wasted']['elapsed_ms']} ms "
+                f"({trace['wasted']['reason']})"
+                if trace["wasted"]
+                else ""
+            )
+        )
+
+        return {
+            "intent": detected_intent,
+            "contexts": contexts,
+            "orchestration_result": result,
+            "response_stream": response_stream,
+            "trace": trace,
+        }
+
+    def get_stats(self) -> dict:
+        """Cumulative speculation outcomes, for tuning the escalation policy."""
+        speculated = self.stats["speculated"]
+        return {
+            **self.stats,
+            "commit_rate": (
+                self.stats["committed"] / speculated if speculated else 0.0
+            ),
+        }
@@ -0,0 +1,138 @@
+import os
+import json
+import shutil
+import tempfile
+
+import numpy as np
+
+INDEX_DIR = "backend/vectorstore/numpy_index"
+MATRIX_FILE = "embeddings.f16.npy"
+TABLE_FILE = "documents.json"
+# Rows widened to float32 at a time when scoring (1.5 MB at 768 dims)
+SCORE_BLOCK_ROWS = 512
+
+
+def _source(metadata) -> str:
+    return (metadata or {}).get("source") or ""
+
+
+def export_collection(collection, directory: str = INDEX_DIR) -> int:
+    """
+    Export a Chroma collection to `directory`: the L2-normalized embeddings as
+    a float16 .npy matrix plus a JSON table of ids, documents and metadata,
+    rows grouped by metadata["source"]. The directory is replaced atomically.
+    Returns the number of rows.
+    """
+    data = collection.get(include=["embeddings", "documents", "metadatas"])
+    embeddings = np.asarray(data["embeddings"], dtype=np.float32)
+    if embeddings.ndim != 2:
+        embeddings = embeddings.reshape(len(data["ids"]), -1)
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    embeddings = embeddings / np.clip(norms, 1e-12, None)
+
+    # Written in source order, so the index can memory-map the file as is
+    metadatas = data["metadatas"] or [None] * len(data["ids"])
+    order = sorted(range(len(data["ids"])), key=lambda i: _source(metadatas[i]))
+    embeddings = embeddings[order]
+
+    parent = os.path.dirname(os.path.abspath(directory))
+    os.makedirs(parent, exist_ok=True)
+    staging = tempfile.mkdtemp(dir=parent, prefix=".index-")
+    np.save(os.path.join(staging, MATRIX_FILE), embeddings.astype(np.float16))
+    with open(os.path.join(staging, TABLE_FILE), "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "ids": [data["ids"][i] for i in order],
+                "documents": [data["documents"][i] for i in order],
+                "metadatas": [metadatas[i] for i in order],
+            },
+            f,
+            ensure_ascii=False,
+        )
+
+    previous = directory + ".old"
+    if os.path.exists(directory):
+        os.replace(directory, previous)
+    os.replace(staging, directory)
+    shutil.rmtree(previous, ignore_errors=True)
+    print(f"[RAG][INDEX] Exported {len(data['ids'])} vectors to {directory}")
+    return len(data["ids"])
+
+
+class NumpyIndex:
+    """
+    Exact in-process vector search over an exported collection.
+
+    The float16 matrix stays memory-mapped: every worker process shares the
+    same page-cache copy of the file instead of holding its own. A query is
+    a product over blocks of rows widened to float32 (numpy has no fast
+    float16 matrix-vector product) plus `argpartition`; for a few thousand
+    FAQ chunks that is a few milliseconds, mostly the widening, with no
+    Chroma client, SQLite store or HNSW graph. Rows are grouped by metadata["source"] so a
+    search scoped to some sources only touches their contiguous slices.
+    """
+
+    def __init__(self, directory: str = INDEX_DIR):
+        self.directory = directory
+        with open(os.path.join(directory, TABLE_FILE), encoding="utf-8") as f:
+            table = json.load(f)
+        self.ids = table["ids"]
+        self.documents = table["documents"]
+        self.metadatas = table["metadatas"] or [None] * len(self.ids)
+        self.matrix = np.load(os.path.join(directory, MATRIX_FILE), mmap_mode="r")
+
+        # source -> [(start, end), ...]: one run per source unless the index
+        # was exported before rows were grouped
+        self.spans = {}
+        for row, metadata in enumerate(self.metadatas):
+            runs = self.spans.setdefault(_source(metadata), [])
+            if runs and runs[-1][1] == row:
+                runs[-1] = (runs[-1][0], row + 1)
+            else:
+                runs.append((row, row + 1))
+
+    @staticmethod
+    def exists(directory: str = INDEX_DIR) -> bool:
+        return os.path.exists(os.path.join(directory, MATRIX_FILE))
+
+    @staticmethod
+    def version(directory: str = INDEX_DIR) -> float:
+        """Changes whenever the index is re-exported."""
+        path = os.path.join(directory, TABLE_FILE)
+        return os.path.getmtime(path) if os.path.exists(path) else 0.0
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _scores(self, start: int, end: int, query: np.ndarray) -> np.ndarray:
+        blocks = [
+            self.matrix[i : min(i + SCORE_BLOCK_ROWS, end)].astype(np.float32) @ query
+            for i in range(start, end, SCORE_BLOCK_ROWS)
+        ]
+        return np.concatenate(blocks or [np.zeros(0, dtype=np.float32)])
+
+    def search(self, embedding, k: int = 4, sources=None) -> dict:
+        """Top-k rows by cosine similarity, best first, optionally within `sources`."""
+        query = np.asarray(embedding, dtype=np.float32)
+        if sources is None:
+            spans = [(0, len(self.ids))]
+        else:
+            spans = [span for s in sources for span in self.spans.get(s, [])]
+        rows = np.concatenate(
+            [np.arange(start, end) for start, end in spans] or [[]]
+        ).astype(np.int64)
+        if not len(rows):
+            return {"ids": [], "documents": [], "metadatas": [], "scores": []}
+        scores = np.concatenate(
+            [self._scores(start, end, query) for start, end in spans]
+        )
+        k = min(k, len(scores))
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best])]
+        scores, top = scores[best], rows[best]
+        return {
+            "ids": [self.ids[i] for i in top],
+            "documents": [self.documents[i] for i in top],
+            "metadatas": [self.metadatas[i] for i in top],
+            "scores": scores.tolist(),
+        }
@@ -1,10 +1,12 @@
-from backend.services.asr_service import ASRService
-from backend.services.nlu_service import NLUService
-from backend.services.llm_service import LLMService
-from backend.services.rag_service import RAGService
-from backend.services.tts_service import TTSService
-from backend.controllers.orchestrator import Orchestrator
+from backend.services import registry
+from backend.services.asr_scheduler import ASRScheduler
+from backend.services.turn_scheduler import TurnScheduler
+from backend.models.call_session import CallSession
+from backend.utils.remote_calls import count_remote_calls
 from concurrent.futures import ThreadPoolExecutor
+import contextvars
+import asyncio
+import os
 import time
 
 
@@ -12,74 +14,260 @@ class VoicePipeline:
     MIN_CONFIDENCE = 0.35
 
     def __init__(self):
-        self.asr = ASRService()
-        self.nlu = NLUService()
-        self.llm = LLMService()
-        self.rag = RAGService()
-        self.tts = TTSService()
-        self.llm_service = LLMService()
-        self.orchestrator = Orchestrator(llm_service=self.llm_service)
+        # Models and clients are process-wide singletons (see registry)
+        self.asr = registry.get("asr")
+        # All calls share the model(s) through one batching queue
+        asr_workers = int(os.getenv("ASR_WORKERS", "0"))
+        self.asr_scheduler = ASRScheduler(self.asr, dispatchers=max(1, asr_workers))
+        self.nlu = registry.get("nlu")
+        self.llm = registry.get("llm")
+        self.rag = registry.get("rag")
+        self.tts = registry.get("tts")
+        # Fixed utterances, pre-rendered at startup (see main.lifespan)
+        self.phrases = registry.get("phrases")
+        # Near-duplicate FAQ questions reuse answers, keyed by the RAG embedding
+        self.answer_cache = registry.get("answer_cache")
+        # Single turn engine: decides first, then makes at most one LLM call
+        self.orchestrator = registry.get("orchestrator")
+        self.escalation_policy = registry.get("escalation")
+        # Stream LLM sentences to TTS as they complete (LLM_STREAMING=0 disables)
+        self.stream_responses = os.getenv("LLM_STREAMING", "1") == "1"
+        # Speculate the LLM answer alongside NLU/RAG/escalation (SPECULATIVE_TURNS=0 disables)
+        self.speculative_turns = os.getenv("SPECULATIVE_TURNS", "1") == "1"
+        self.scheduler = TurnScheduler(
+            self.nlu, self.rag, self.orchestrator, self.escalation_policy
+        )
 
         self.executor = ThreadPoolExecutor(max_workers=3)
 
-    def process_audio(self, audio_path: str, call_session=None) -> dict:
-        """Process audio → text → intent → response (optimized with parallelization)."""
+    def _submit(self, fn, *args):
+        """Submit to the pool inside a copy of the caller context (remote call counting)."""
+        return self.executor.submit(contextvars.copy_context().run, fn, *args)
+
+    def process_audio(self, audio, call_session=None) -> dict:
+        """
+        Process audio → text → intent → response (optimized with parallelization).
+
+        `audio` is a 16 kHz mono float32 array (or an audio file path).
+        """
         start_time = time.time()
 
-        asr_result = self.asr.transcribe_voice(audio_path)
+        asr_result = self.asr_scheduler.transcribe_voice(audio)
+        return self.process_transcript(
+            asr_result, call_session=call_session, start_time=start_time
+        )
+
+    def _asr_failure(self, asr_result: dict):
+        """Return the `asr_failed` result when the transcript is unusable, else None."""
         text = asr_result.get("text", "").strip()
-        language = asr_result.get("language", "unknown")
         asr_conf = asr_result.get("confidence", 0.0)
 
         if not text or asr_conf < self.MIN_CONFIDENCE:
             return {
                 "error": "asr_failed",
-                "language": language,
+                "language": asr_result.get("language", "unknown"),
                 "confidence": asr_conf,
             }
+        return None
 
-        nlu_future = self.executor.submit(self.nlu.detect_intent, text)
-        rag_future = self.executor.submit(self.rag.retrieve, text, 4)
+    def process_transcript(
+        self, asr_result: dict, call_session=None, start_time=None
+    ) -> dict:
+        """Gate an ASR result on confidence, then run the turn on its text."""
+        failure = self._asr_failure(asr_result)
+        if failure:
+            return failure
 
-        detected_intent = nlu_future.result()
-        contexts = rag_future.result()
+        return self.process_text(
+            asr_result["text"].strip(),
+            call_session=call_session,
+            asr_conf=asr_result["confidence"],
+            language=asr_result.get("language", "unknown"),
+            start_time=start_time,
+        )
 
-        nlu_conf = detected_intent.confidence if detected_intent else 0.0
-        intent_name = detected_intent.name if detected_intent else "UNKNOWN"
-        context = "\n".join(contexts) if contexts else ""
+    def process_text(
+        self,
+        text: str,
+        call_session=None,
+        asr_conf: float = 1.0,
+        language: str = "fr",
+        start_time: float = None,
+    ) -> dict:
+        """Run one turn from a transcript: NLU ∥ RAG, then the orchestrator."""
+        start_time = start_time or time.time()
+        call_session = self._add_user_message(text, call_session)
 
-        try:
-            response_text = self.llm.generate_response(
-                user_text=text,
-                context=context,
-                language=language,
-                intent=intent_name,
-            )
-        except Exception as e:
-            response_text = "Je suis désolé, je n'ai pas pu générer de réponse."
-            print(f"[LLM ERROR] {e}")
+        with count_remote_calls() as remote_calls:
+            nlu_future = self._submit(self.nlu.detect_intent, text)
+            rag_future = self._submit(self.rag.retrieve, text)
+
+            detected_intent = nlu_future.result()
+            contexts = rag_future.result()
 
-        orchestration_result = None
-        if call_session:
             orchestration_result = self.orchestrator.process_turn(
-                call_session=call_session,
-                intent=detected_intent,
-                asr_conf=asr_conf,
-                nlu_conf=nlu_conf,
-                ambiguous=False,
+                **self._turn_args(call_session, detected_intent, asr_conf, contexts)
+            )
+
+        return self._turn_result(
+            text,
+            detected_intent,
+            asr_conf,
+            language,
+            orchestration_result,
+            None,
+            remote_calls,
+            start_time,
+        )
+
+    # ─────────────────────────────────────────────────────────────
+    # Async API (event loop)
+    # ─────────────────────────────────────────────────────────────
+    async def aprocess_audio(self, audio, call_session=None, stream=False) -> dict:
+        """Async `process_audio`: ASR is batched with other calls off the loop."""
+        start_time = time.time()
+
+        asr_result = await self.asr_scheduler.atranscribe_voice(audio)
+        return await self.aprocess_transcript(
+            asr_result, call_session=call_session, stream=stream, start_time=start_time
+        )
+
+    async def aprocess_transcript(
+        self, asr_result: dict, call_session=None, stream=False, start_time=None
+    ) -> dict:
+        """Async `process_transcript`."""
+        failure = self._asr_failure(asr_result)
+        if failure:
+            return failure
+
+        return await self.aprocess_text(
+            asr_result["text"].strip(),
+            call_session=call_session,
+            asr_conf=asr_result["confidence"],
+            language=asr_result.get("language", "unknown"),
+            start_time=start_time,
+            stream=stream,
+        )
+
+    async def aprocess_text(
+        self,
+        text: str,
+        call_session=None,
+        asr_conf: float = 1.0,
+        language: str = "fr",
+        start_time: float = None,
+        stream: bool = False,
+    ) -> dict:
+        """
+        Async `process_text`: the NLU call is awaited on the shared connection
+        pool while retrieval runs in a worker thread. With speculative turns,
+        the scheduler also starts the escalation check and the LLM answer.
+
+        With `stream=True` an AI answer is not generated here: the result holds
+        a `response_stream` async sentence iterator that the caller consumes.
+        """
+        start_time = start_time or time.time()
+        call_session = self._add_user_message(text, call_session)
+
+        if self.speculative_turns:
+            with count_remote_calls() as remote_calls:
+                turn = await self.scheduler.run(
+                    text, call_session, asr_conf, remote_calls, stream=stream
+                )
+            result = self._turn_result(
+                text,
+                turn["intent"],
+                asr_conf,
+                language,
+                turn["orchestration_result"],
+                turn["response_stream"],
+                remote_calls,
+                start_time,
+            )
+            result["speculation"] = turn["trace"]
+            return result
+
+        with count_remote_calls() as remote_calls:
+            detected_intent, contexts = await asyncio.gather(
+                self.nlu.adetect_intent(text),
+                asyncio.to_thread(self.rag.retrieve, text),
             )
 
+            turn_args = self._turn_args(
+                call_session, detected_intent, asr_conf, contexts
+            )
+            response_stream = None
+            if stream:
+                orchestration_result, response_stream = (
+                    await self.orchestrator.aprocess_turn_stream(**turn_args)
+                )
+            else:
+                orchestration_result = await self.orchestrator.aprocess_turn(
+                    **turn_args
+                )
+
+        return self._turn_result(
+            text,
+            detected_intent,
+            asr_conf,
+            language,
+            orchestration_result,
+            response_stream,
+            remote_calls,
+            start_time,
+        )
+
+    # ─────────────────────────────────────────────────────────────
+    # Helpers
+    # ─────────────────────────────────────────────────────────────
+    @staticmethod
+    def _add_user_message(text: str, call_session):
+        if call_session is None:
+            call_session = CallSession(call_id=None, client_id=None)
+        call_session.add_message(text)
+        return call_session
+
+    @staticmethod
+    def _turn_args(call_session, detected_intent, asr_conf, contexts) -> dict:
+        return dict(
+            call_session=call_session,
+            intent=detected_intent,
+            asr_conf=asr_conf,
+            nlu_conf=detected_intent.confidence if detected_intent else 0.0,
+            ambiguous=False,
+            context="\n".join(contexts) if contexts else "",
+        )
+
+    @staticmethod
+    def _turn_result(
+        text,
+        detected_intent,
+        asr_conf,
+        language,
+        orchestration_result,
+        response_stream,
+        remote_calls,
+        start_time,
+    ) -> dict:
         elapsed = time.time() - start_time
-        print(f"[PERF] Total processing time: {elapsed:.2f}s")
+        print(
+            f"[PERF] Total processing time: {elapsed:.2f}s | "
+            f"remote calls: {remote_calls.total} {remote_calls.summary()}"
+        )
 
         return {
             "text": text,
-            "intent": intent_name,
+            "intent": detected_intent.name if detected_intent else "UNKNOWN",
             "asr_confidence": asr_conf,
-            "nlu_confidence": nlu_conf,
-            "response_text": response_text,
+            "nlu_confidence": detected_intent.confidence if detected_intent else 0.0,
+            "response_text": orchestration_result.get("message"),
             "language": language,
             "orchestration_result": orchestration_result,
+            "response_stream": response_stream,
+            # Keeps counting while `response_stream` is consumed
+            "remote_call_counter": remote_calls,
+            "remote_calls": remote_calls.total,
+            "remote_calls_by_service": remote_calls.summary(),
             "processing_time": round(elapsed, 2),
         }
 
@@ -0,0 +1,187 @@
+"""
+Startup warmup and readiness.
+
+Once the registry has built every service, `Warmup.run` sends one synthetic
+request through each of them, so the first caller on a node does not pay the
+cold-start costs: CTranslate2 kernel JIT and buffer allocation in Whisper,
+the first embedding forward pass and index page-in, phrase rendering, and
+the TLS handshakes to the providers. No paid LLM completion is made.
+`/ready` reports each probe and stays 503 until the required ones succeed.
+"""
+
+import os
+import time
+import asyncio
+
+import numpy as np
+
+from backend.services.provider_client import get_provider_client
+
+SAMPLE_RATE = 16000
+WARMUP_QUERY = "Comment déclarer un sinistre ?"
+PROBES = ["asr", "rag", "nlu", "tts", "connections"]
+# A node whose provider connections failed still serves: the pool reconnects
+DEFAULT_REQUIRED = "asr,rag,nlu,tts"
+# Phrases the tts probe needs (call opening, LLM fallback, call closing); the
+# others are synthesized on demand when missing, so they do not gate /ready
+REQUIRED_PHRASES = ["greeting", "technical_issue", "goodbye"]
+
+
+def synthetic_utterance(seconds: float = 2.0, sample_rate: int = SAMPLE_RATE):
+    """Vowel-like 16 kHz float32 audio: harmonics of a gliding pitch, in syllables."""
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    pitch = 120 + 20 * np.sin(2 * np.pi * 0.5 * t)
+    phase = 2 * np.pi * np.cumsum(pitch) / sample_rate
+    voice = sum(np.sin(h * phase) / h for h in range(1, 9))
+    envelope = 0.5 - 0.5 * np.cos(2 * np.pi * 4 * t)  # ~4 syllables per second
+    noise = np.random.default_rng(0).normal(0, 0.01, len(t))
+    audio = 0.3 * voice * envelope / np.abs(voice).max() + noise
+    return audio.astype(np.float32)
+
+
+class Warmup:
+    """Runs the warmup probes and keeps their outcome for `/ready` and `/health`."""
+
+    def __init__(self, required=None):
+        if required is None:
+            required = os.getenv("READY_REQUIRE", DEFAULT_REQUIRED)
+            required = [name.strip() for name in required.split(",") if name.strip()]
+        self.required = list(required)
+        self.probes = {name: self._pending() for name in PROBES}
+        self.warmup_ms = None
+
+    @staticmethod
+    def _pending() -> dict:
+        return {"warm": False, "latency_ms": None, "error": None}
+
+    async def _probe(self, name: str, run):
+        started = time.perf_counter()
+        try:
+            detail = await run()
+        except Exception as e:
+            self.probes[name]["error"] = f"{type(e).__name__}: {e}"
+            print(f"[WARMUP] {name} failed: {e}")
+            return
+        latency_ms = round((time.perf_counter() - started) * 1000)
+        self.probes[name].update(warm=True, latency_ms=latency_ms)
+        if detail:
+            self.probes[name]["detail"] = detail
+        print(f"[WARMUP] {name} warm in {latency_ms} ms")
+
+    # ─────────────────────────────────────────────────────────────
+    # Probes
+    # ─────────────────────────────────────────────────────────────
+    @staticmethod
+    async def _asr(pipeline):
+        audio = synthetic_utterance()
+        # Batched final decode (language detection, beam search)...
+        await pipeline.asr_scheduler.atranscribe_voice(audio)
+        # ...then the word-timestamp decode of streaming partials, on every worker
+        workers = getattr(pipeline.asr, "num_workers", 1)
+        await asyncio.gather(
+            *(
+                asyncio.to_thread(
+                    pipeline.asr_scheduler.transcribe_window,
+                    audio,
+                    language="fr",
+                    word_timestamps=True,
+                )
+                for _ in range(workers)
+            )
+        )
+
+    @staticmethod
+    async def _rag(pipeline):
+        documents = await asyncio.to_thread(pipeline.rag.retrieve, WARMUP_QUERY)
+        return {"documents": len(documents)}
+
+    @staticmethod
+    async def _nlu(pipeline):
+        intent = await pipeline.nlu.adetect_intent("Bonjour")
+        return {"intent": intent.name}
+
+    @staticmethod
+    async def _tts(pipeline):
+        stats = await pipeline.phrases.prerender()
+        missing = pipeline.phrases.missing()
+        required = [key for key in REQUIRED_PHRASES if key in missing]
+        if required:
+            raise RuntimeError(f"required phrases not rendered: {', '.join(required)}")
+        return {"phrases": stats["loaded"], "missing": missing}
+
+    @staticmethod
+    async def _connections(pipeline):
+        urls = [pipeline.llm.endpoint, pipeline.nlu.endpoint]
+        urls += [e.url for e in pipeline.tts.engines if getattr(e, "url", None)]
+        return await get_provider_client().warm(urls)
+
+    async def _run_probes(self, pipeline, names):
+        runs = {
+            "asr": self._asr,
+            "rag": self._rag,
+            "nlu": self._nlu,
+            "tts": self._tts,
+            "connections": self._connections,
+        }
+        for name in names:
+            self.probes[name] = self._pending()
+
+        async def models():
+            for name in ["asr", "rag", "nlu"]:
+                if name in names:
+                    await self._probe(name, lambda: runs[name](pipeline))
+
+        network = [n for n in names if n in ("tts", "connections")]
+        await asyncio.gather(
+            models(),
+            *(self._probe(n, lambda n=n: runs[n](pipeline)) for n in network),
+        )
+
+    async def run(self, pipeline):
+        """
+        Run every probe, the CPU-bound ones in turn and network ones alongside,
+        then retry failed required probes every `WARMUP_RETRY_S` seconds.
+        """
+        started = time.perf_counter()
+        await self._run_probes(pipeline, PROBES)
+        self.warmup_ms = round((time.perf_counter() - started) * 1000)
+        state = "ready" if self.ready else "NOT ready"
+        print(f"[WARMUP] Done in {self.warmup_ms} ms, node {state}")
+
+        retry_s = float(os.getenv("WARMUP_RETRY_S", "30"))
+        while not self.ready and retry_s > 0:
+            await asyncio.sleep(retry_s)
+            failed = [n for n in self.required if not self.probes[n]["warm"]]
+            print(f"[WARMUP] Retrying {', '.join(failed)}")
+            await self._run_probes(pipeline, failed)
+
+    # ─────────────────────────────────────────────────────────────
+    # Status
+    # ─────────────────────────────────────────────────────────────
+    @property
+    def ready(self) -> bool:
+        return all(self.probes.get(name, {}).get("warm") for name in self.required)
+
+    def service_states(self) -> dict:
+        """{probe: "ok" | "degraded" | "warming" | "error"} for `/health`."""
+        states = {}
+        for name, p in self.probes.items():
+            if p["warm"]:
+                states[name] = (
+                    "degraded" if p.get("detail", {}).get("missing") else "ok"
+                )
+            else:
+                states[name] = "error" if p["error"] else "warming"
+        return states
+
+    def missing_phrases(self) -> list:
+        """Phrases the tts probe could not render (not required for `/ready`)."""
+        return self.probes["tts"].get("detail", {}).get("missing", [])
+
+    def get_status(self) -> dict:
+        return {
+            "ready": self.ready,
+            "required": self.required,
+            "probes": self.probes,
+            "warmup_ms": self.warmup_ms,
+        }
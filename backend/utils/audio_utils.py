@@ -1,40 +1,169 @@
-import subprocess
-from pathlib import Path
-import wave
-import audioop
-
-
-def normalize_for_asr(input_path: str, output_path: str):
-
-    input_path = Path(input_path)
-    output_path = Path(output_path)
-
-    subprocess.run(
-        [
-            "ffmpeg",
-            "-y",
-            "-i",
-            str(input_path),
-            "-ac",
-            "1",
-            "-ar",
-            "16000",
-            str(output_path),
-        ],
-        stdout=subprocess.DEVNULL,
-        stderr=subprocess.DEVNULL,
-        check=True,
-    )
+import io
+import av
+import numpy as np
+
+ASR_SAMPLE_RATE = 16000
+
+
+def decode_audio_bytes(data: bytes, sample_rate: int = ASR_SAMPLE_RATE) -> np.ndarray:
+    """
+    Decode a compressed audio blob (webm/opus, ogg, mp3, wav...) in process.
 
+    Returns mono float32 samples in [-1, 1] resampled to `sample_rate`, ready
+    for the silence check and for WhisperModel.transcribe. No temp files, no
+    ffmpeg subprocess.
+    """
+    resampler = av.AudioResampler(format="s16", layout="mono", rate=sample_rate)
+    chunks = []
 
-def is_silent_wav(path: str, rms_threshold: int = 300) -> bool:
+    with av.open(io.BytesIO(data), mode="r") as container:
+        stream = container.streams.audio[0]
+        for frame in container.decode(stream):
+            frame.pts = None
+            for resampled in resampler.resample(frame):
+                chunks.append(resampled.to_ndarray().reshape(-1))
+        for resampled in resampler.resample(None):
+            chunks.append(resampled.to_ndarray().reshape(-1))
 
+    if not chunks:
+        return np.zeros(0, dtype=np.float32)
+    return np.concatenate(chunks).astype(np.float32) / 32768.0
+
+
+def audio_duration(data: bytes, default_bytes_per_second: int = 16000) -> float:
+    """
+    Playback duration (seconds) of a compressed clip from its container header,
+    falling back to a 128 kbps estimate when the header has none.
+    """
     try:
-        with wave.open(path, "rb") as wf:
-            frames = wf.readframes(wf.getnframes())
-            rms = audioop.rms(frames, wf.getsampwidth())
-            print(f"[AUDIO] RMS energy = {rms}")
-            return rms < rms_threshold
-    except Exception as e:
-        print(f"[AUDIO][ERROR] Silence check failed: {e}")
+        with av.open(io.BytesIO(data), mode="r") as container:
+            if container.duration:
+                return container.duration / av.time_base
+    except Exception:
+        pass
+    return len(data) / default_bytes_per_second
+
+
+def encode_mp3(samples: np.ndarray, sample_rate: int, bitrate: int = 64000) -> bytes:
+    """Encode mono PCM (int16, or float32 in [-1, 1]) to MP3 bytes in process."""
+    if samples.dtype != np.int16:
+        samples = (np.clip(samples, -1.0, 1.0) * 32767).astype(np.int16)
+    buffer = io.BytesIO()
+    with av.open(buffer, mode="w", format="mp3") as container:
+        stream = container.add_stream("libmp3lame", rate=sample_rate)
+        stream.layout = "mono"
+        stream.bit_rate = bitrate
+        frame = av.AudioFrame.from_ndarray(
+            samples.reshape(1, -1), format="s16", layout="mono"
+        )
+        frame.sample_rate = sample_rate
+        for packet in stream.encode(frame):
+            container.mux(packet)
+        for packet in stream.encode(None):
+            container.mux(packet)
+    return buffer.getvalue()
+
+
+def float32_to_pcm16(samples: np.ndarray) -> bytes:
+    """Float32 samples in [-1, 1] to little-endian PCM16 bytes."""
+    return (np.clip(samples, -1.0, 1.0) * 32767).astype("<i2").tobytes()
+
+
+def pcm16_to_ulaw(pcm: bytes) -> bytes:
+    """G.711 mu-law encoding of little-endian PCM16 bytes (one byte per sample)."""
+    samples = np.frombuffer(pcm, dtype="<i2").astype(np.int32) >> 2  # 14-bit
+    mask = np.where(samples < 0, 0x7F, 0xFF)
+    magnitude = np.minimum(np.abs(samples), 8159) + 0x21
+    segment = np.searchsorted(
+        [0x3F, 0x7F, 0xFF, 0x1FF, 0x3FF, 0x7FF, 0xFFF, 0x1FFF], magnitude
+    )
+    ulaw = np.where(
+        segment > 7, 0x7F, (segment << 4) | ((magnitude >> (segment + 1)) & 0x0F)
+    )
+    return (ulaw ^ mask).astype(np.uint8).tobytes()
+
+
+def encode_opus_packets(
+    samples: np.ndarray, sample_rate: int, bitrate: int = 24000
+) -> list[bytes]:
+    """Encode mono float32 samples to raw 20 ms Opus packets (no container)."""
+    codec = av.CodecContext.create("libopus", "w")
+    codec.sample_rate = sample_rate
+    codec.layout = "mono"
+    codec.format = "s16"
+    codec.bit_rate = bitrate
+    pcm = np.frombuffer(float32_to_pcm16(samples), dtype="<i2")
+    frame = av.AudioFrame.from_ndarray(pcm.reshape(1, -1), format="s16", layout="mono")
+    frame.sample_rate = sample_rate
+    packets = list(codec.encode(frame)) + list(codec.encode(None))
+    return [bytes(packet) for packet in packets]
+
+
+def is_silent(samples: np.ndarray, rms_threshold: int = 300) -> bool:
+    """RMS silence check on float32 samples, threshold on the PCM16 scale."""
+    if samples is None or len(samples) == 0:
         return True
+    rms = float(np.sqrt(np.mean(np.square(samples)))) * 32768
+    print(f"[AUDIO] RMS energy = {rms:.0f}")
+    return rms < rms_threshold
+
+
+def pcm16_to_float32(pcm: bytes) -> np.ndarray:
+    """Convert little-endian PCM16 bytes to float32 samples in [-1, 1]."""
+    return np.frombuffer(pcm, dtype="<i2").astype(np.float32) / 32768.0
+
+
+class EnergyVAD:
+    """
+    Frame-level energy VAD with an adaptive noise floor.
+
+    A frame is speech when its RMS exceeds both an absolute floor (the same
+    300/32768 level `is_silent` uses) and a multiple of the running noise
+    estimate. Cheap enough to run on every incoming frame.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = 16000,
+        frame_ms: int = 30,
+        min_rms: float = 300 / 32768,
+        noise_ratio: float = 3.0,
+        noise_alpha: float = 0.05,
+    ):
+        self.sample_rate = sample_rate
+        self.frame_ms = frame_ms
+        self.frame_size = sample_rate * frame_ms // 1000
+        self.min_rms = min_rms
+        self.noise_ratio = noise_ratio
+        self.noise_alpha = noise_alpha
+        self.noise_floor = min_rms / noise_ratio
+        self._remainder = np.zeros(0, dtype=np.float32)
+
+    def is_speech(self, frame: np.ndarray) -> bool:
+        rms = float(np.sqrt(np.mean(np.square(frame)))) if len(frame) else 0.0
+        speech = rms > max(self.min_rms, self.noise_floor * self.noise_ratio)
+        if not speech:
+            self.noise_floor += self.noise_alpha * (rms - self.noise_floor)
+        return speech
+
+    def frames(self, samples: np.ndarray):
+        """Yield (frame, is_speech) for each complete frame, buffering the rest."""
+        samples = np.concatenate([self._remainder, samples])
+        n_frames = len(samples) // self.frame_size
+        for i in range(n_frames):
+            frame = samples[i * self.frame_size : (i + 1) * self.frame_size]
+            yield frame, self.is_speech(frame)
+        self._remainder = samples[n_frames * self.frame_size :]
+
+
+def contains_speech(
+    samples: np.ndarray, min_speech_ms: int = 300, sample_rate: int = ASR_SAMPLE_RATE
+) -> bool:
+    """True when `samples` hold a continuous speech run of at least `min_speech_ms`."""
+    vad = EnergyVAD(sample_rate=sample_rate)
+    run_ms = 0
+    for _, speech in vad.frames(samples):
+        run_ms = run_ms + vad.frame_ms if speech else 0
+        if run_ms >= min_speech_ms:
+            return True
+    return False
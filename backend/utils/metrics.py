@@ -0,0 +1,95 @@
+import bisect
+import asyncio
+import threading
+
+
+class Histogram:
+    """Thread-safe fixed-bucket histogram (Prometheus-style cumulative buckets)."""
+
+    def __init__(self, buckets):
+        self.buckets = sorted(buckets)
+        self._counts = [0] * (len(self.buckets) + 1)  # last slot: +Inf
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        with self._lock:
+            self._counts[bisect.bisect_left(self.buckets, value)] += 1
+            self._sum += value
+            self._count += 1
+
+    def quantile(self, q: float):
+        """Upper bound of the bucket holding the q-quantile (None if empty)."""
+        with self._lock:
+            if not self._count:
+                return None
+            target = q * self._count
+            seen = 0
+            for bound, count in zip(self.buckets + [float("inf")], self._counts):
+                seen += count
+                if seen >= target:
+                    return bound
+        return None
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            cumulative, seen = {}, 0
+            for bound, count in zip(self.buckets, self._counts):
+                seen += count
+                cumulative[str(bound)] = seen
+            cumulative["+Inf"] = self._count
+            count, total = self._count, self._sum
+        return {
+            "count": count,
+            "sum": round(total, 3),
+            "mean": round(total / count, 3) if count else None,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "buckets": cumulative,
+        }
+
+
+class LoopLagMonitor:
+    """
+    Measures how long the asyncio event loop was blocked.
+
+    A task sleeps `interval` seconds in a loop; any extra delay before it
+    wakes up is time the loop spent running something that did not yield.
+    """
+
+    def __init__(self, interval: float = 0.05, blocked_threshold_ms: float = 20.0):
+        self.interval = interval
+        self.blocked_threshold_ms = blocked_threshold_ms
+        self.lag_ms = Histogram([1, 5, 10, 20, 50, 100, 250, 500, 1000])
+        self.max_lag_ms = 0.0
+        self.blocked_ms = 0.0  # total lag in samples above the threshold
+        self._task = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._run())
+        return self
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag_ms = max(0.0, (loop.time() - expected) * 1000)
+            self.lag_ms.observe(lag_ms)
+            self.max_lag_ms = max(self.max_lag_ms, lag_ms)
+            if lag_ms >= self.blocked_threshold_ms:
+                self.blocked_ms += lag_ms
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def snapshot(self) -> dict:
+        return {
+            "max_lag_ms": round(self.max_lag_ms, 1),
+            "blocked_ms": round(self.blocked_ms, 1),
+            "p95_lag_ms": self.lag_ms.quantile(0.95),
+        }
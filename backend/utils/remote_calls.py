@@ -0,0 +1,60 @@
+import contextvars
+from collections import Counter
+from contextlib import contextmanager
+
+_active_counter = contextvars.ContextVar("remote_call_counter", default=None)
+
+
+class RemoteCallCounter:
+    """Counts remote provider calls (LLM, NLU, escalation...) made during a turn."""
+
+    def __init__(self, parent=None):
+        self.parent = parent
+        self.calls = []
+
+    def record(self, name: str):
+        self.calls.append(name)
+        if self.parent is not None:
+            self.parent.record(name)
+
+    @property
+    def total(self) -> int:
+        return len(self.calls)
+
+    def summary(self) -> dict:
+        return dict(Counter(self.calls))
+
+
+@contextmanager
+def count_remote_calls():
+    """
+    Open a counting scope. Nested scopes also report to their parent, so a
+    pipeline-level counter sees the calls made inside the orchestrator.
+    Worker threads must run inside a copied context (contextvars.copy_context).
+    """
+    counter = RemoteCallCounter(parent=_active_counter.get())
+    token = _active_counter.set(counter)
+    try:
+        yield counter
+    finally:
+        _active_counter.reset(token)
+
+
+@contextmanager
+def use_counter(counter: RemoteCallCounter):
+    """
+    Re-enter an existing counting scope, e.g. around each step of a stream
+    that is consumed after its `count_remote_calls` block has exited.
+    """
+    token = _active_counter.set(counter)
+    try:
+        yield counter
+    finally:
+        _active_counter.reset(token)
+
+
+def record_remote_call(name: str):
+    """Record one remote call against the active counting scope, if any."""
+    counter = _active_counter.get()
+    if counter is not None:
+        counter.record(name)
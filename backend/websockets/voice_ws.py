@@ -1,18 +1,44 @@
 import os
 import json
+import time
 import asyncio
+import numpy as np
+from typing import TYPE_CHECKING
 from fastapi import WebSocket, WebSocketDisconnect
-from backend.utils.audio_utils import is_silent_wav, normalize_for_asr
-from backend.services.voice_pipeline import VoicePipeline
+from backend.utils.audio_utils import (
+    ASR_SAMPLE_RATE,
+    audio_duration,
+    contains_speech,
+    decode_audio_bytes,
+    is_silent,
+)
+from backend.utils.metrics import LoopLagMonitor
+from backend.services.phrase_bank import RECORDINGS
+from backend.services.audio_formats import (
+    DEFAULT_FORMAT,
+    OUTPUT_FORMATS,
+    OutputFormat,
+    negotiate_format,
+)
 from backend.services.session_manager import SessionManager
+from backend.services.streaming_session import StreamingSession
 from backend.models.call_session import CallSession
-from backend.models.intent import Intent
-from backend.controllers.orchestrator import Orchestrator
-from backend.services.llm_service import LLMService
 from backend.controllers.callbot_controller import finalize_call
 
-llm_service = LLMService()
-orchestrator = Orchestrator(llm_service=llm_service)
+if TYPE_CHECKING:
+    from backend.services.voice_pipeline import VoicePipeline
+
+# Speech needed to interrupt the AI; longer than a normal onset to ignore echo
+BARGE_IN_MIN_SPEECH_MS = 300
+# Samples of earlier blobs kept for the barge-in check, so a speech run
+# split across two blobs is still seen; older samples are dropped
+BARGE_IN_TAIL_SAMPLES = BARGE_IN_MIN_SPEECH_MS * ASR_SAMPLE_RATE // 1000
+
+# Audio goes out in chunks (MP3) or fixed-duration frames (telephony formats),
+# paced to stay at most AUDIO_MAX_LEAD_S ahead of playback: no multi-second
+# frames hog the socket and barge-in stops quickly
+AUDIO_CHUNK_BYTES = 16 * 1024
+AUDIO_MAX_LEAD_S = 2.0
 
 
 class VoiceWSState:
@@ -22,34 +48,119 @@ class VoiceWSState:
         self.session_id = session_id
         self.is_ai_speaking = False
         self.speaking_lock = asyncio.Lock()  # Prevent race conditions
-        self.pending_user_audio = []  # Queue for audio received during AI speech
+        # Trailing samples received during AI speech (barge-in)
+        self.pending_user_audio = np.zeros(0, dtype=np.float32)
+        self.speak_task = None  # Interruptible AI speech in progress
+        self.barge_ins = 0
+        self.time_to_first_audio_ms = []  # One entry per spoken turn
+        self.stream = None  # StreamingSession when the client streams PCM frames
+        self.partial_task = None  # In-flight partial decode
+        self.playback_started = None  # Clock for audio flow control
+        self.audio_sent_s = 0.0
+        self.loop_monitor = LoopLagMonitor().start()
+        self.output_format = OUTPUT_FORMATS[DEFAULT_FORMAT]
+
+    def reset_playback_clock(self):
+        self.playback_started = time.perf_counter()
+        self.audio_sent_s = 0.0
+
+
+def _record_first_audio(state: VoiceWSState, turn_started: float):
+    """Record time-to-first-audio for a turn, measured from audio receipt."""
+    if turn_started is None:
+        return None
+    ttfa_ms = round((time.perf_counter() - turn_started) * 1000)
+    state.time_to_first_audio_ms.append(ttfa_ms)
+    print(f"[PERF] Time to first audio: {ttfa_ms} ms")
+    return ttfa_ms
+
+
+async def synthesize_audio(pipeline: "VoicePipeline", text: str, fmt: OutputFormat):
+    """
+    Synthesize one sentence (hot phrases come from memory) and return it in
+    the connection's output format, or None.
+    """
+    audio = pipeline.phrases.audio_for_text(text)
+    if audio is None:
+        audio = await pipeline.tts.asynthesize_bytes(text=text, lang="fr")
+    if audio is None:
+        return None
+    return await pipeline.tts.aencode(text, audio, fmt)
 
 
-async def send_mp3(ws: WebSocket, mp3_path: str):
-    """Send MP3 file over WebSocket."""
-    if not mp3_path or not os.path.exists(mp3_path):
-        print(f"[AUDIO][WARN] MP3 not found: {mp3_path}")
+async def speech_clips(
+    pipeline: "VoicePipeline", text: str, fmt: OutputFormat, phrase: str = None
+):
+    """
+    Audio for `text` in playback order and in format `fmt`: the phrase-bank
+    clip when there is one, else per-sentence TTS (sentences render in
+    parallel).
+    """
+    audio = pipeline.phrases.audio(phrase) if phrase else None
+    if audio is None:
+        audio = pipeline.phrases.audio_for_text(text)
+    if audio is not None:
+        yield await pipeline.tts.aencode(text, audio, fmt)
         return
-    try:
-        with open(mp3_path, "rb") as f:
-            await ws.send_bytes(f.read())
-    except Exception as e:
-        print(f"[AUDIO][ERROR] Failed to send MP3: {e}")
+    async for sentence, clip in pipeline.tts.asynthesize_sentences(
+        text=text, lang="fr"
+    ):
+        yield await pipeline.tts.aencode(sentence, clip, fmt)
+
+
+async def send_audio(ws: WebSocket, state: VoiceWSState, audio: bytes):
+    """
+    Send one clip between `audio_start` and `audio_end` events: fixed
+    FRAME_MS frames for telephony formats, AUDIO_CHUNK_BYTES chunks for MP3.
+    Sending pauses while the client already holds more than AUDIO_MAX_LEAD_S
+    of unplayed audio.
+    """
+    fmt = state.output_format
+    frames = fmt.frames(audio, AUDIO_CHUNK_BYTES)
+    if not frames:
+        return
+    if fmt.frame_s:
+        duration = len(frames) * fmt.frame_s
+    else:
+        duration = await asyncio.to_thread(audio_duration, audio)
+    if state.playback_started is None:
+        state.reset_playback_clock()
+
+    await ws.send_json(
+        {
+            "event": "audio_start",
+            "format": fmt.name,
+            "bytes": len(audio),
+            "duration": round(duration, 2),
+        }
+    )
+    for frame in frames:
+        played = time.perf_counter() - state.playback_started
+        lead = state.audio_sent_s - played
+        if lead > AUDIO_MAX_LEAD_S:
+            await asyncio.sleep(lead - AUDIO_MAX_LEAD_S)
+        await ws.send_bytes(frame)
+        state.audio_sent_s = max(state.audio_sent_s, played) + (
+            fmt.frame_s or duration * len(frame) / len(audio)
+        )
+    await ws.send_json({"event": "audio_end"})
 
 
 async def ai_speak(
     ws: WebSocket,
     state: VoiceWSState,
     text: str,
-    pipeline: VoicePipeline,
-    mp3_path: str = None,
+    pipeline: "VoicePipeline",
+    phrase: str = None,
+    turn_started: float = None,
 ):
     """
     AI speech with proper locking to prevent race conditions.
 
-    If `mp3_path` is provided and the file exists, the handler will stream that file
-    directly to the client. Otherwise it will synthesize audio with the pipeline TTS.
+    If `phrase` names a phrase-bank entry, its pre-rendered audio is sent.
+    Otherwise the audio is synthesized with the pipeline TTS.
     """
+    ttfa_ms = None
     async with state.speaking_lock:  # Acquire lock
         state.is_ai_speaking = True
 
@@ -57,77 +168,345 @@ async def ai_speak(
             # Signal AI is about to speak (client can show visual indicator)
             await ws.send_json({"event": "ai_speaking", "text": text})
 
-            # If caller provided a pre-generated MP3 path, use it
-            if mp3_path and os.path.exists(mp3_path):
-                await send_mp3(ws, mp3_path)
-            else:
-                # Generate TTS (this can be slow)
-                mp3_path_generated = pipeline.tts.synthesize(text=text, lang="fr")
-                await send_mp3(ws, mp3_path_generated)
+            state.reset_playback_clock()
+
+            clips_sent = 0
+            async for clip in speech_clips(pipeline, text, state.output_format, phrase):
+                if clips_sent == 0:
+                    ttfa_ms = _record_first_audio(state, turn_started)
+                await send_audio(ws, state, clip)
+                clips_sent += 1
+            if clips_sent == 0:
+                print(f"[AUDIO][WARN] No audio for: {text[:50]}")
 
             # Only set to False AFTER audio is fully sent
             state.is_ai_speaking = False
-            await ws.send_json({"event": "ai_done"})
+            await ws.send_json(
+                {
+                    "event": "ai_done",
+                    "time_to_first_audio_ms": ttfa_ms,
+                    "loop": state.loop_monitor.snapshot(),
+                }
+            )
 
         except Exception as e:
             print(f"[TTS][ERROR] {e}")
+        finally:
+            # Also reached when a barge-in cancels the speech
+            state.is_ai_speaking = False
+
+
+async def ai_speak_stream(
+    ws: WebSocket,
+    state: VoiceWSState,
+    sentences,
+    pipeline: "VoicePipeline",
+    turn_started: float = None,
+):
+    """
+    Stream an AI answer sentence by sentence.
+
+    `sentences` is an async iterator (the LLM stream). Each sentence is sent
+    to TTS as soon as it completes and its audio goes out in order (as chunked
+    frames), while the rest of the answer is still being generated.
+    """
+    async with state.speaking_lock:
+        state.is_ai_speaking = True
+        ttfa_ms = None
+        pending = asyncio.Queue()
+
+        async def produce():
+            try:
+                async for sentence in sentences:
+                    task = asyncio.ensure_future(
+                        synthesize_audio(pipeline, sentence, state.output_format)
+                    )
+                    await pending.put((sentence, task))
+            finally:
+                await pending.put(None)
+
+        producer = asyncio.ensure_future(produce())
+        try:
+            await ws.send_json({"event": "ai_speaking", "stream": True})
+            state.reset_playback_clock()
+
+            while True:
+                item = await pending.get()
+                if item is None:
+                    break
+                sentence, task = item
+                audio = await task
+                if not audio:
+                    continue
+                await ws.send_json({"event": "ai_sentence", "text": sentence})
+                if ttfa_ms is None:
+                    ttfa_ms = _record_first_audio(state, turn_started)
+                await send_audio(ws, state, audio)
+
+            await producer
             state.is_ai_speaking = False
+            await ws.send_json(
+                {
+                    "event": "ai_done",
+                    "time_to_first_audio_ms": ttfa_ms,
+                    "loop": state.loop_monitor.snapshot(),
+                }
+            )
+
+        except Exception as e:
+            print(f"[TTS][ERROR] Streaming failed: {e}")
+        finally:
+            # Also reached when a barge-in cancels the speech: stop the LLM
+            # stream and drop sentences that were synthesized but not sent
+            producer.cancel()
+            while not pending.empty():
+                item = pending.get_nowait()
+                if item is not None:
+                    item[1].cancel()
+            state.is_ai_speaking = False
+
+
+async def speak_turn_answer(
+    ws: WebSocket,
+    state: VoiceWSState,
+    result: dict,
+    pipeline: "VoicePipeline",
+    turn_started: float = None,
+):
+    """
+    Speak a streamed answer, then send `turn_done` with the turn's final
+    remote-call count: the decision event was sent before the LLM answer was
+    generated, so its `remote_calls` does not include it.
+    """
+    await ai_speak_stream(
+        ws, state, result["response_stream"], pipeline, turn_started=turn_started
+    )
+    counter = result.get("remote_call_counter")
+    if counter is not None:
+        await ws.send_json(
+            {
+                "event": "turn_done",
+                "remote_calls": counter.total,
+                "remote_calls_by_service": counter.summary(),
+            }
+        )
+
+
+def speak_in_background(state: VoiceWSState, speech) -> asyncio.Task:
+    """Run an `ai_speak*` coroutine as the connection's interruptible speech."""
+    state.speak_task = asyncio.ensure_future(speech)
+    return state.speak_task
+
+
+def is_speaking(state: VoiceWSState) -> bool:
+    return state.speak_task is not None and not state.speak_task.done()
+
+
+async def barge_in(ws: WebSocket, state: VoiceWSState, reason: str = "speech"):
+    """Cancel the AI speech in flight and tell the client to stop playback."""
+    if not is_speaking(state):
+        return
+    state.speak_task.cancel()
+    try:
+        await state.speak_task
+    except asyncio.CancelledError:
+        pass
+    state.speak_task = None
+    state.barge_ins += 1
+    print(f"[WS] Barge-in ({reason}) | call_id={state.session_id}")
+    await ws.send_json({"event": "barge_in", "reason": reason})
+
+
+async def check_barge_in_blob(ws: WebSocket, state: VoiceWSState, audio_bytes: bytes):
+    """
+    Check a blob received while the AI speaks. Only the new blob is decoded;
+    it is checked after the tail kept from earlier blobs. When it contains
+    speech, interrupt the AI and return the samples to process now; otherwise
+    keep their tail and return None (echo and noise are dropped).
+    """
+    try:
+        blob = await asyncio.to_thread(decode_audio_bytes, audio_bytes)
+    except Exception as e:
+        print(f"[AUDIO][ERROR] Barge-in decode failed: {e}")
+        clear_pending_audio(state)
+        return None
+
+    samples = np.concatenate([state.pending_user_audio, blob])
+    if not contains_speech(samples, BARGE_IN_MIN_SPEECH_MS):
+        state.pending_user_audio = samples[-BARGE_IN_TAIL_SAMPLES:].copy()
+        return None
+
+    clear_pending_audio(state)
+    await barge_in(ws, state)
+    return samples
+
+
+def clear_pending_audio(state: VoiceWSState):
+    state.pending_user_audio = np.zeros(0, dtype=np.float32)
 
 
 async def process_user_audio(
     audio_bytes: bytes,
     session: CallSession,
-    pipeline: VoicePipeline,
-    temp_dir: str,
+    pipeline: "VoicePipeline",
 ) -> dict:
     """
     Process user audio in isolated async function.
+    Decodes the blob in memory (16 kHz mono float32) off the event loop.
     Returns processing result or error dict.
     """
-    os.makedirs(temp_dir, exist_ok=True)
-    tmp_path = os.path.join(
-        temp_dir, f"{session.call_id}_{asyncio.get_event_loop().time()}.webm"
-    )
-
     try:
-        # Save audio
-        with open(tmp_path, "wb") as f:
-            f.write(audio_bytes)
-
-        # Normalize
-        normalized_path = os.path.join(
-            temp_dir, f"{session.call_id}_{asyncio.get_event_loop().time()}_16k.wav"
-        )
-        normalize_for_asr(tmp_path, normalized_path)
+        if isinstance(audio_bytes, np.ndarray):
+            samples = audio_bytes  # already decoded (barge-in buffer)
+        else:
+            samples = await asyncio.to_thread(decode_audio_bytes, audio_bytes)
 
         # Check silence
-        if is_silent_wav(normalized_path):
+        if is_silent(samples):
             return {"error": "silent_audio"}
 
         # Process with pipeline
-        result = await asyncio.to_thread(
-            pipeline.process_audio, normalized_path, session
+        return await pipeline.aprocess_audio(
+            samples, session, stream=pipeline.stream_responses
         )
 
-        # Cleanup temp files
-        try:
-            os.remove(tmp_path)
-            os.remove(normalized_path)
-        except:
-            pass
-
-        return result
-
     except Exception as e:
         print(f"[AUDIO][ERROR] Processing failed: {e}")
         return {"error": "processing_failed"}
 
 
+async def emit_partial(ws: WebSocket, state: VoiceWSState, pipeline: "VoicePipeline"):
+    """Decode the current window in a worker thread and send the partial text."""
+    try:
+        text = await asyncio.to_thread(
+            state.stream.decode_partial, pipeline.asr_scheduler
+        )
+        if text:
+            await ws.send_json({"event": "partial", "text": text})
+    except Exception as e:
+        print(f"[ASR][STREAM] Partial decode failed: {e}")
+
+
+async def handle_stream_frame(
+    ws: WebSocket, state: VoiceWSState, pipeline: "VoicePipeline", frame: bytes
+):
+    """
+    Buffer one streamed PCM frame. Starts partial decodes while the caller
+    speaks; at the endpoint, decodes the remaining tail and returns the ASR
+    result for the utterance. Returns None while the utterance is ongoing.
+    """
+    ai_speaking = is_speaking(state)
+    event = state.stream.add_frame(
+        frame, min_speech_ms=BARGE_IN_MIN_SPEECH_MS if ai_speaking else None
+    )
+
+    if event == "speech_start":
+        if ai_speaking:
+            await barge_in(ws, state)
+        await ws.send_json({"event": "speech_start"})
+
+    if event == "endpoint":
+        if state.partial_task is not None:
+            await state.partial_task  # let its commit land before the tail decode
+            state.partial_task = None
+        asr_result = await asyncio.to_thread(
+            state.stream.finalize, pipeline.asr_scheduler
+        )
+        await ws.send_json({"event": "final", "text": asr_result["text"]})
+        return asr_result
+
+    if state.stream.needs_partial() and (
+        state.partial_task is None or state.partial_task.done()
+    ):
+        state.partial_task = asyncio.ensure_future(emit_partial(ws, state, pipeline))
+
+    return None
+
+
+async def respond_to_turn(
+    ws: WebSocket,
+    state: VoiceWSState,
+    session: CallSession,
+    pipeline: "VoicePipeline",
+    result: dict,
+    turn_started: float,
+) -> bool:
+    """
+    Send the decision and speak the answer for one processed user turn.
+    Returns True when the call has ended (goodbye or escalation).
+    """
+    if result.get("error") == "silent_audio":
+        return False
+
+    # A new turn always supersedes speech that is still playing
+    await barge_in(ws, state, reason="new_turn")
+
+    if "error" in result:
+        fallback = pipeline.phrases.text("not_understood")
+        session.add_message(fallback)
+        speak_in_background(
+            state, ai_speak(ws, state, fallback, pipeline, phrase="not_understood")
+        )
+        return False
+
+    # --- Orchestrator decision (already taken by the pipeline turn) ---
+    turn_result = dict(result.get("orchestration_result") or {})
+    turn_result["call_id"] = session.call_id
+    turn_result["remote_calls"] = result.get("remote_calls", 0)
+    if result.get("speculation"):
+        turn_result["speculation"] = result["speculation"]
+    # Indicate if we're going to stream a pre-generated audio for escalation
+    if turn_result.get("decision") == "AGENT" and os.path.exists(
+        RECORDINGS["transfer_agent"]
+    ):
+        turn_result["audio_stream"] = True
+    await ws.send_json(turn_result)
+
+    # 🔚 Call end handling (GOODBYE)
+    if turn_result.get("reason") == "USER_GOODBYE":
+        print(f"[WS] Call ended by goodbye | call_id={session.call_id}")
+        # Spoken in the foreground, like the transfer message: not interruptible
+        goodbye_text = pipeline.phrases.text("goodbye")
+        await ai_speak(ws, state, goodbye_text, pipeline, phrase="goodbye")
+        session.end_call(status="ENDED")
+        await asyncio.to_thread(finalize_call, session)
+        return True
+
+    # --- Escalation handling ---
+    if turn_result.get("decision") == "AGENT":
+        print("[WS] Escalation detected -> sending transfer audio and ending call")
+        transfer_text = pipeline.phrases.text("transfer_agent")
+        await ai_speak(ws, state, transfer_text, pipeline, phrase="transfer_agent")
+        session.end_call(status="ESCALATED")
+        await asyncio.to_thread(finalize_call, session)
+        return True
+
+    # --- Send AI response (in the background: the caller may barge in) ---
+    if result.get("response_stream") is not None:
+        speak_in_background(
+            state,
+            speak_turn_answer(ws, state, result, pipeline, turn_started=turn_started),
+        )
+        return False
+
+    ai_text = (
+        turn_result.get("message")
+        or turn_result.get("response")
+        or result.get("response_text")
+    )
+
+    if ai_text:
+        speak_in_background(
+            state, ai_speak(ws, state, ai_text, pipeline, turn_started=turn_started)
+        )
+
+    return False
+
+
 async def voice_ws_endpoint(
     ws: WebSocket,
-    pipeline: VoicePipeline,
+    pipeline: "VoicePipeline",
     session_manager: SessionManager,
-    temp_dir: str,
 ):
     await ws.accept()
     session = None
@@ -162,17 +541,30 @@ async def voice_ws_endpoint(
                     phone_number=phone_number,
                 )
                 state = VoiceWSState(session.call_id)
-                print(f"[WS] Connection accepted | call_id={session.call_id}")
+                # TTS output: mp3 (default), pcm16_8k/16k, ulaw_8k, opus_16k/48k
+                state.output_format = negotiate_format(payload.get("audio_format"))
+                # "stream": continuous PCM16 16 kHz frames with server endpointing
+                if payload.get("audio_mode") == "stream":
+                    state.stream = StreamingSession()
+                await ws.send_json(
+                    {
+                        "event": "registered",
+                        "call_id": session.call_id,
+                        "audio_format": state.output_format.describe(),
+                    }
+                )
+                print(
+                    f"[WS] Connection accepted | call_id={session.call_id} "
+                    f"| audio_format={state.output_format.name}"
+                )
                 break
 
     try:
         # --- Initial greeting ---
-        greeting = "Bonjour ! Je suis Selene, votre assistant vocal pour l'assurance."
-        greeting_mp3 = os.path.join("demo", "tts_outputs", "greeting.mp3")
-        if os.path.exists(greeting_mp3):
-            await ai_speak(ws, state, greeting, pipeline, mp3_path=greeting_mp3)
-        else:
-            await ai_speak(ws, state, greeting, pipeline)
+        greeting = pipeline.phrases.text("greeting")
+        speak_in_background(
+            state, ai_speak(ws, state, greeting, pipeline, phrase="greeting")
+        )
         while True:
             try:
                 message = await ws.receive()
@@ -195,7 +587,7 @@ async def voice_ws_endpoint(
                 if payload.get("event") == "end_call":
                     print(f"[SESSION] End call requested | call_id={session.call_id}")
                     session.end_call(status="RESOLVED")
-                    finalize_call(session)
+                    await asyncio.to_thread(finalize_call, session)
                     break
                 continue
 
@@ -203,95 +595,54 @@ async def voice_ws_endpoint(
             if "bytes" not in message:
                 continue
 
-            if state.is_ai_speaking:
-                print("[WS] Dropping audio - AI is speaking")
-                # Optionally: queue for later processing
-                # state.pending_user_audio.append(message["bytes"])
-                continue
-
             audio_bytes = message["bytes"]
 
-            # Process audio asynchronously (non-blocking)
-            result = await process_user_audio(audio_bytes, session, pipeline, temp_dir)
-
-            if result.get("error") == "silent_audio":
-                continue
-
-            if "error" in result:
-                fallback = "Désolé, je n'ai pas compris. Pouvez-vous répéter ?"
-                session.add_message(fallback)
-                await ai_speak(ws, state, fallback, pipeline)
-                continue
-
-            # --- Extract results ---
-            user_text = result.get("text", "")
-            session.add_message(user_text)
-            asr_conf = result.get("asr_confidence", 0.8)
-            nlu_conf = result.get("nlu_confidence", 0.8)
-
-            intent_obj = result.get("intent")
-            if isinstance(intent_obj, str):
-                intent_obj = Intent(name=intent_obj.upper(), confidence=nlu_conf)
-            elif intent_obj is None:
-                intent_obj = Intent(name="UNKNOWN", confidence=0.2)
-
-            # --- Orchestrator decision ---
-            turn_result = orchestrator.process_turn(
-                call_session=session,
-                intent=intent_obj,
-                asr_conf=asr_conf,
-                nlu_conf=nlu_conf,
-                ambiguous=False,
-            )
-            turn_result["call_id"] = session.call_id
-            # Indicate if we're going to stream a pre-generated audio for escalation
-            transfer_mp3 = os.path.join("demo", "tts_outputs", "transfer_agent.mp3")
-            if turn_result.get("decision") == "AGENT" and os.path.exists(transfer_mp3):
-                turn_result["audio_stream"] = True
-            await ws.send_json(turn_result)
-
-            # 🔚 Call end handling (GOODBYE)
-            if turn_result.get("reason") == "USER_GOODBYE":
-                print(f"[WS] Call ended by goodbye | call_id={session.call_id}")
-                session.end_call(status="ENDED")
-                finalize_call(session)
-                break
+            if state.stream is None and is_speaking(state):
+                # Blob mode: buffer and interrupt the AI only on real speech
+                audio_bytes = await check_barge_in_blob(ws, state, audio_bytes)
+                if audio_bytes is None:
+                    continue
+            elif state.stream is None:
+                clear_pending_audio(state)
 
-            # --- Escalation handling ---
-            if turn_result.get("decision") == "AGENT":
-                print(
-                    "[WS] Escalation detected -> sending transfer audio (if available) and ending call"
+            if state.stream is not None:
+                asr_result = await handle_stream_frame(ws, state, pipeline, audio_bytes)
+                if asr_result is None:
+                    continue
+                turn_started = time.perf_counter()
+                result = await pipeline.aprocess_transcript(
+                    asr_result, session, stream=pipeline.stream_responses
                 )
-                transfer_mp3 = os.path.join("demo", "tts_outputs", "transfer_agent.mp3")
-                if os.path.exists(transfer_mp3):
-                    transfer_text = (
-                        turn_result.get("message") or "Transferring to agent"
-                    )
-                    await ai_speak(
-                        ws, state, transfer_text, pipeline, mp3_path=transfer_mp3
-                    )
-                else:
-                    # fallback to synthesized or text-based TTS
-                    transfer_text = (
-                        turn_result.get("message")
-                        or "Votre demande nécessite l'intervention d'un agent humain. Vous allez être transféré maintenant."
-                    )
-                    await ai_speak(ws, state, transfer_text, pipeline)
-                session.end_call(status="ESCALATED")
-                finalize_call(session)
-                break
-
-            # --- Send AI response ---
-            ai_text = (
-                turn_result.get("message")
-                or turn_result.get("response")
-                or result.get("response_text")
-            )
+            else:
+                turn_started = time.perf_counter()
+                # Process audio asynchronously (non-blocking)
+                result = await process_user_audio(audio_bytes, session, pipeline)
 
-            if ai_text:
-                await ai_speak(ws, state, ai_text, pipeline)
+            if await respond_to_turn(
+                ws, state, session, pipeline, result, turn_started
+            ):
+                break
 
     finally:
+        if state and is_speaking(state):
+            state.speak_task.cancel()
+        if state and state.partial_task is not None:
+            state.partial_task.cancel()
+        if state and state.time_to_first_audio_ms:
+            samples = state.time_to_first_audio_ms
+            print(
+                f"[PERF] call_id={session.call_id} time-to-first-audio "
+                f"avg={sum(samples) / len(samples):.0f} ms max={max(samples)} ms "
+                f"barge-ins={state.barge_ins}"
+            )
+        if state:
+            state.loop_monitor.stop()
+            loop_stats = state.loop_monitor.snapshot()
+            print(
+                f"[PERF] call_id={session.call_id} event loop "
+                f"max_lag={loop_stats['max_lag_ms']} ms "
+                f"blocked={loop_stats['blocked_ms']} ms"
+            )
         print(f"[SESSION] Cleaning up | call_id={session.call_id}")
         session_manager.clear(session.call_id)
         if ws.client_state.name != "DISCONNECTED":
@@ -11,22 +11,19 @@ Allows you to feed text questions and see:
 import sys
 import os
 from backend.models.call_session import CallSession
-from backend.services.voice_pipeline import VoicePipeline
-from backend.services.nlu_service import NLUService
-from backend.services.llm_service import LLMService
-from backend.services.tts_service import TTSService
-from backend.services.rag_service import RAGService
+from backend.services import registry
 from backend.logs.logger import Logger
 
 
 class CallbotCLITest:
     def __init__(self):
         print("[INIT] Initializing Callbot components...")
-        self.pipeline = VoicePipeline()
-        self.nlu = NLUService()
-        self.llm = LLMService()
-        self.tts = TTSService()
-        self.rag = RAGService()
+        # The pipeline's own services: each model is loaded once
+        self.pipeline = registry.get("pipeline")
+        self.nlu = registry.get("nlu")
+        self.llm = registry.get("llm")
+        self.tts = registry.get("tts")
+        self.rag = registry.get("rag")
         self.logger = Logger()
 
         # Start a call session
@@ -52,7 +49,7 @@ class CallbotCLITest:
         print(f"USER INPUT: {user_input}")
         print("=" * 80)
 
-        # Add to session
+        # Add to session (the orchestrator reads the latest message)
         self.call_session.add_message(user_input)
 
         # ─────────────────────────────────────────────────────────────
@@ -83,26 +80,32 @@ class CallbotCLITest:
             context_str = ""
 
         # ─────────────────────────────────────────────────────────────
-        # STEP 3: LLM (Response Generation)
+        # STEP 3: Orchestrator (decide, then at most one LLM generation)
         # ─────────────────────────────────────────────────────────────
-        print("\n[LLM] Generating response...")
+        print("\n[ORCHESTRATOR] Processing turn...")
+        response_text = ""
         try:
-            response_text = self.llm.generate_response(
-                user_text=user_input,
+            orch_result = self.pipeline.orchestrator.process_turn(
+                call_session=self.call_session,
+                intent=detected_intent,
+                asr_conf=0.95,  # Simulated high confidence (text input is 100% accurate)
+                nlu_conf=intent_confidence,
+                ambiguous=False,
                 context=context_str,
-                language="fr",
-                intent=intent_name,
             )
-            print(f"  Response: {response_text}")
+            response_text = orch_result.get("message", "")
+            print(f"  Decision: {orch_result.get('decision', 'UNKNOWN')}")
+            print(f"  Reason: {orch_result.get('reason', 'N/A')}")
+            print(f"  Remote calls: {orch_result.get('remote_calls', 0)}")
+            if "message" in orch_result:
+                print(f"  Message: {orch_result['message']}")
         except Exception as e:
-            response_text = "Je suis désolé, je n'ai pas pu générer de réponse."
             print(f"  [ERROR] {e}")
-            print(f"  Fallback: {response_text}")
 
         # ─────────────────────────────────────────────────────────────
         # STEP 4: TTS (Text-to-Speech)
         # ─────────────────────────────────────────────────────────────
-        if generate_audio:
+        if generate_audio and response_text:
             print("\n[TTS] Generating audio...")
             try:
                 audio_path = self.tts.synthesize(response_text, "fr")
@@ -115,25 +118,6 @@ class CallbotCLITest:
         else:
             print("\n[TTS] Skipped (use --no-audio flag to disable)")
 
-        # ─────────────────────────────────────────────────────────────
-        # STEP 5: Orchestrator Processing
-        # ─────────────────────────────────────────────────────────────
-        print("\n[ORCHESTRATOR] Processing turn...")
-        try:
-            orch_result = self.pipeline.orchestrator.process_turn(
-                call_session=self.call_session,
-                intent=detected_intent,
-                asr_conf=0.95,  # Simulated high confidence (text input is 100% accurate)
-                nlu_conf=intent_confidence,
-                ambiguous=False,
-            )
-            print(f"  Decision: {orch_result.get('decision', 'UNKNOWN')}")
-            print(f"  Reason: {orch_result.get('reason', 'N/A')}")
-            if "message" in orch_result:
-                print(f"  Message: {orch_result['message']}")
-        except Exception as e:
-            print(f"  [ERROR] {e}")
-
         # ─────────────────────────────────────────────────────────────
         # SUMMARY
         # ─────────────────────────────────────────────────────────────
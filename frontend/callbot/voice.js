@@ -63,17 +63,21 @@ submitUserBtn.onclick = async () => {
 };
 
 // ---------- Audio playback ----------
+let currentAudio = null;
+
 function playAIAudio(mp3Bytes, callback = null) {
     if (stopAudio) return;
 
     const blob = new Blob([mp3Bytes], { type: "audio/mpeg" });
     const url = URL.createObjectURL(blob);
     const audio = new Audio(url);
+    currentAudio = audio;
 
     statusText.textContent = "AI speaking...";
 
     audio.onended = () => {
         URL.revokeObjectURL(url);
+        currentAudio = null;
         if (stopAudio) return;
         statusText.textContent = "Listening...";
         if (callback) callback();
@@ -83,10 +87,96 @@ function playAIAudio(mp3Bytes, callback = null) {
     audio.play();
 }
 
+// ---------- Audio queue (streamed answers arrive as one clip per sentence) ----------
+let audioQueue = [];
+let isPlayingQueue = false;
+let aiTurnDone = true;
+
+function enqueueAIAudio(mp3Bytes) {
+    audioQueue.push(mp3Bytes);
+    if (!isPlayingQueue) playNextAudio();
+}
+
+// Each clip arrives as binary chunks between "audio_start" and "audio_end"
+let incomingChunks = null;
+
+// Barge-in: the caller spoke over the AI, drop everything still queued
+function stopAIPlayback() {
+    audioQueue = [];
+    incomingChunks = null;
+    isPlayingQueue = false;
+    if (currentAudio) {
+        currentAudio.onended = null;
+        currentAudio.pause();
+        currentAudio = null;
+    }
+}
+
+function playNextAudio() {
+    if (stopAudio) { audioQueue = []; isPlayingQueue = false; return; }
+
+    const next = audioQueue.shift();
+    if (!next) {
+        isPlayingQueue = false;
+        if (aiTurnDone && isCallActive) setTimeout(startRecording, 500);
+        return;
+    }
+
+    isPlayingQueue = true;
+    playAIAudio(next, playNextAudio);
+}
+
+// ---------- Streaming capture (PCM16 16 kHz frames, server-side endpointing) ----------
+const STREAM_AUDIO = true;
+const TARGET_SAMPLE_RATE = 16000;
+let audioContext = null;
+let captureNode = null;
+let isStreamingPaused = true;
+
+function downsampleToPCM16(input, inputRate) {
+    const ratio = inputRate / TARGET_SAMPLE_RATE;
+    const length = Math.floor(input.length / ratio);
+    const out = new Int16Array(length);
+    for (let i = 0; i < length; i++) {
+        const start = Math.floor(i * ratio);
+        const end = Math.min(Math.floor((i + 1) * ratio), input.length);
+        let sum = 0;
+        for (let j = start; j < end; j++) sum += input[j];
+        const s = Math.max(-1, Math.min(1, sum / Math.max(1, end - start)));
+        out[i] = s < 0 ? s * 0x8000 : s * 0x7FFF;
+    }
+    return out.buffer;
+}
+
+async function startStreamingCapture() {
+    isStreamingPaused = false;
+    if (audioContext) return;
+
+    stream = await navigator.mediaDevices.getUserMedia({
+        audio: { channelCount: 1, echoCancellation: true, noiseSuppression: true }
+    });
+    audioContext = new AudioContext();
+    const source = audioContext.createMediaStreamSource(stream);
+    captureNode = audioContext.createScriptProcessor(2048, 1, 1);
+    captureNode.onaudioprocess = (e) => {
+        if (isStreamingPaused || !ws || ws.readyState !== WebSocket.OPEN) return;
+        ws.send(downsampleToPCM16(e.inputBuffer.getChannelData(0), audioContext.sampleRate));
+    };
+    source.connect(captureNode);
+    captureNode.connect(audioContext.destination);
+}
+
+function stopStreamingCapture() {
+    isStreamingPaused = true;
+    if (captureNode) { captureNode.disconnect(); captureNode = null; }
+    if (audioContext) { audioContext.close(); audioContext = null; }
+}
+
 // ---------- Recording ----------
 let isAISpeaking = false;
 
 function stopRecording() {
+    if (STREAM_AUDIO) isStreamingPaused = true;
     if (mediaRecorder && mediaRecorder.state === "recording") {
         mediaRecorder.stop();
     }
@@ -96,6 +186,18 @@ function stopRecording() {
 async function startRecording() {
     if (isRecording || !isCallActive || stopAudio || !ws || ws.readyState !== WebSocket.OPEN || isAISpeaking) return;
 
+    if (STREAM_AUDIO) {
+        try {
+            await startStreamingCapture();
+            isRecording = true;
+            statusText.textContent = "Listening...";
+        } catch (error) {
+            console.error("Error starting audio stream:", error);
+            statusText.textContent = "Error accessing microphone";
+        }
+        return;
+    }
+
     try {
         if (stream) stream.getTracks().forEach(track => track.stop());
         stream = await navigator.mediaDevices.getUserMedia({ audio: true });
@@ -127,6 +229,17 @@ async function startRecording() {
 }
 
 // ---------- End call ----------
+// The server closed the call (e.g. after its goodbye): let the last clips play out
+function endCallAfterAudio() {
+    if (!isCallActive) return;
+    aiTurnDone = false; // do not reopen the microphone when the queue empties
+    if (isPlayingQueue || audioQueue.length) {
+        setTimeout(endCallAfterAudio, 200);
+        return;
+    }
+    endCall();
+}
+
 function endCall({ keepEscalationUI = false } = {}) {
     if (!isCallActive) return;
     console.log("[DEBUG] Ending call");
@@ -134,6 +247,7 @@ function endCall({ keepEscalationUI = false } = {}) {
     stopAudio = true;
 
     if (mediaRecorder && mediaRecorder.state === "recording") mediaRecorder.stop();
+    stopStreamingCapture();
     if (stream) { stream.getTracks().forEach(track => track.stop()); stream = null; }
     isRecording = false;
 
@@ -187,7 +301,8 @@ function startCall() {
             event: "register_client",
             client_id: clientId,
             user_name: userName,
-            phone_number: userPhone
+            phone_number: userPhone,
+            audio_mode: STREAM_AUDIO ? "stream" : "blob"
         }));
     };
 
@@ -223,17 +338,56 @@ function startCall() {
                 return;
             }
 
+            // ---------- Streaming ASR transcripts ----------
+            if (msg.event === "partial" || msg.event === "final") {
+                statusText.textContent = `Vous : ${msg.text}`;
+                return;
+            }
+            if (msg.event === "speech_start") return;
+
+            // ---------- Chunked AI audio ----------
+            if (msg.event === "audio_start") {
+                incomingChunks = [];
+                return;
+            }
+            if (msg.event === "audio_end") {
+                const chunks = incomingChunks || [];
+                incomingChunks = null;
+                if (chunks.length && !stopAudio && isCallActive) enqueueAIAudio(new Blob(chunks));
+                return;
+            }
+
             // ---------- Handle AI speaking ----------
             if (msg.event === "ai_speaking") {
-                console.log("[DEBUG] AI is speaking, stopping recording");
                 isAISpeaking = true;
-                stopRecording();
+                aiTurnDone = false;
+                if (STREAM_AUDIO) {
+                    // Keep streaming: the server detects barge-in
+                    startStreamingCapture().catch(err => console.error("Error starting audio stream:", err));
+                    isRecording = true;
+                } else {
+                    console.log("[DEBUG] AI is speaking, stopping recording");
+                    stopRecording();
+                }
+                return;
+            }
+
+            // ---------- Barge-in: caller interrupted the AI ----------
+            if (msg.event === "barge_in") {
+                console.log("[DEBUG] Barge-in:", msg.reason);
+                stopAIPlayback();
+                isAISpeaking = false;
+                aiTurnDone = true;
+                statusText.textContent = "Listening...";
                 return;
             }
 
             // ---------- Handle AI turn done ----------
             if (msg.event === "ai_done") {
                 isAISpeaking = false;
+                aiTurnDone = true;
+                if (msg.time_to_first_audio_ms !== undefined) console.log("[PERF] time to first audio (ms):", msg.time_to_first_audio_ms);
+                if (msg.loop) console.log("[PERF] server event loop:", msg.loop);
                 if (msg.decision) decisionText.textContent = `Decision: ${msg.decision}`;
                 if (msg.confidence !== undefined) confidenceText.textContent = `Confidence: ${msg.confidence}`;
                 if (msg.clarification_count !== undefined) {
@@ -249,17 +403,18 @@ function startCall() {
                     return;
                 }
 
-                // ---------- Normal AI turn: start recording ----------
-                if (isCallActive && !stopAudio) setTimeout(startRecording, 500);
+                // ---------- Normal AI turn: start recording once queued audio has played ----------
+                if (isCallActive && !stopAudio && !isPlayingQueue) setTimeout(startRecording, 500);
             }
 
             return;
         }
 
         // ---------- Binary audio ----------
-        if (!stopAudio && isCallActive) playAIAudio(event.data);
+        if (incomingChunks) incomingChunks.push(event.data);
+        else if (!stopAudio && isCallActive) enqueueAIAudio(event.data);
     };
-    ws.onclose = () => endCall();
+    ws.onclose = () => endCallAfterAudio();
     ws.onerror = (error) => { console.error(error); statusText.textContent = "Connection error"; endCall(); };
 }
 
@@ -0,0 +1,167 @@
+import json
+import asyncio
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+import httpx
+import numpy as np
+import pytest
+
+from backend.controllers.orchestrator import Orchestrator
+from backend.services.answer_cache import SemanticAnswerCache
+from backend.services.llm_service import LLMService
+
+QUESTION = "Comment déclarer un vol de vélo ?"
+PARAPHRASE = "Comment je déclare le vol de mon vélo ?"
+OTHER = "Quels sont vos horaires d'ouverture ?"
+ANSWER = "Vous pouvez le déclarer en ligne. Un conseiller vous rappelle ensuite."
+
+
+def embedding(*weights):
+    vector = np.zeros(8, dtype=np.float32)
+    vector[: len(weights)] = weights
+    return vector / np.linalg.norm(vector)
+
+
+EMBEDDINGS = {
+    QUESTION: embedding(1.0, 0.0),
+    PARAPHRASE: embedding(1.0, 0.1),  # cosine ~0.995 with QUESTION
+    OTHER: embedding(0.0, 1.0),
+}
+
+
+def embed(text):
+    return EMBEDDINGS.get(text, embedding(0.0, 0.0, 1.0))
+
+
+def make_cache(generation=None):
+    return SemanticAnswerCache(
+        embed,
+        generation=generation,
+        threshold=0.92,
+        max_entries=10,
+        ttl_s=3600,
+        excluded_intents=[],
+    )
+
+
+def sse(content):
+    return "data: " + json.dumps({"choices": [{"delta": {"content": content}}]})
+
+
+class FakeProviderClient:
+    """Streams `lines` as SSE, then raises `error` if given."""
+
+    def __init__(self, lines, error=None):
+        self.lines = lines
+        self.error = error
+        self.calls = 0
+
+    @asynccontextmanager
+    async def stream(self, endpoint, url, **kwargs):
+        self.calls += 1
+
+        async def aiter_lines():
+            for line in self.lines:
+                yield line
+            if self.error is not None:
+                raise self.error
+
+        yield SimpleNamespace(aiter_lines=aiter_lines)
+
+
+def make_orchestrator(monkeypatch, client, cache):
+    monkeypatch.setenv("GROQ_API_KEY", "test")
+    llm = LLMService()
+    llm.client = client
+    return Orchestrator(llm_service=llm, answer_cache=cache)
+
+
+def new_session():
+    return SimpleNamespace(messages=[QUESTION])
+
+
+async def collect(sentences):
+    return [sentence async for sentence in sentences]
+
+
+def test_paraphrase_hits_cached_answer():
+    cache = make_cache()
+    cache.store(QUESTION, "INQUIRY", "", ANSWER)
+
+    assert cache.lookup(PARAPHRASE, "INQUIRY") == ANSWER
+    assert cache.lookup(OTHER, "INQUIRY") is None
+    # Same question, other intent: not reused
+    assert cache.lookup(PARAPHRASE, "COVERAGE") is None
+    stats = cache.get_stats()
+    assert stats["hits"] == 1 and stats["misses"] == 2
+
+
+def test_claims_and_personal_questions_skip_the_cache():
+    cache = make_cache()
+    cache.store(QUESTION, "CLAIM", "", ANSWER)
+    assert cache.get_stats()["size"] == 0
+
+    cache.store(QUESTION, "INQUIRY", "", ANSWER)
+    assert cache.lookup(PARAPHRASE, "CLAIM") is None
+    assert cache.lookup("Où en est mon dossier 12345 ?", "INQUIRY") is None
+    stats = cache.get_stats()
+    assert stats["skipped_intent"] == 1
+    assert stats["skipped_context"] == 1
+    assert stats["hits"] == 0
+
+
+def test_generation_change_clears_entries():
+    generation = {"value": 0}
+    cache = make_cache(generation=lambda: generation["value"])
+    cache.store(QUESTION, "INQUIRY", "", ANSWER)
+    assert cache.lookup(PARAPHRASE, "INQUIRY") == ANSWER
+
+    generation["value"] += 1
+    assert cache.lookup(PARAPHRASE, "INQUIRY") is None
+    assert cache.get_stats()["size"] == 0
+
+
+def test_completed_stream_is_stored_and_replayed(monkeypatch):
+    cache = make_cache()
+    client = FakeProviderClient([sse(ANSWER), "data: [DONE]"])
+    orchestrator = make_orchestrator(monkeypatch, client, cache)
+
+    first = asyncio.run(
+        collect(orchestrator.answer_sentences(new_session(), QUESTION, "INQUIRY", ""))
+    )
+    second = asyncio.run(
+        collect(orchestrator.answer_sentences(new_session(), PARAPHRASE, "INQUIRY", ""))
+    )
+    assert second == first
+    assert client.calls == 1
+
+
+def test_closed_stream_is_not_stored(monkeypatch):
+    cache = make_cache()
+    client = FakeProviderClient([sse(ANSWER), "data: [DONE]"])
+    orchestrator = make_orchestrator(monkeypatch, client, cache)
+
+    async def first_sentence_only():
+        sentences = orchestrator.answer_sentences(
+            new_session(), QUESTION, "INQUIRY", ""
+        )
+        first = await sentences.__anext__()
+        await sentences.aclose()  # e.g. a cancelled speculative answer
+        return first
+
+    assert asyncio.run(first_sentence_only())
+    assert cache.get_stats()["stores"] == 0
+
+
+@pytest.mark.parametrize("lines", [[], [sse("Vous pouvez le déclarer en ligne. Un")]])
+def test_failed_stream_is_not_stored(monkeypatch, lines):
+    cache = make_cache()
+    client = FakeProviderClient(lines, error=httpx.ReadError("connection reset"))
+    orchestrator = make_orchestrator(monkeypatch, client, cache)
+
+    sentences = asyncio.run(
+        collect(orchestrator.answer_sentences(new_session(), QUESTION, "INQUIRY", ""))
+    )
+    assert sentences  # fallback, or the sentences spoken before the failure
+    assert cache.get_stats()["stores"] == 0
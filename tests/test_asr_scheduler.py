@@ -0,0 +1,101 @@
+import asyncio
+import threading
+
+import numpy as np
+import pytest
+
+pytest.importorskip("faster_whisper")
+pytest.importorskip("torch")
+
+from backend.services.asr_scheduler import ASRScheduler
+
+
+class FakeASR:
+    """Records each batch; decodes block until `gate` is set."""
+
+    def __init__(self, fail=False):
+        self.batches = []
+        self.vad_filters = []
+        self.started = threading.Event()
+        self.gate = threading.Event()
+        self.gate.set()
+        self.fail = fail
+
+    def transcribe_batch(self, audios, beam_size=3, vad_filter=False, **kwargs):
+        self.batches.append(len(audios))
+        self.vad_filters.append(vad_filter)
+        self.started.set()
+        self.gate.wait(5)
+        if self.fail:
+            raise RuntimeError("decoder crashed")
+        return [{"text": f"{len(audio)} samples"} for audio in audios]
+
+
+def utterance(n):
+    return np.zeros(n, dtype=np.float32)
+
+
+def test_concurrent_requests_share_one_batch():
+    asr = FakeASR()
+    asr.gate.clear()
+    scheduler = ASRScheduler(asr, max_batch_size=4, max_wait_ms=200)
+
+    futures = [scheduler.submit(utterance(n)) for n in (100, 200, 300)]
+    asr.gate.set()
+
+    assert [f.result(5)["text"] for f in futures] == [
+        "100 samples",
+        "200 samples",
+        "300 samples",
+    ]
+    assert asr.batches == [3]
+
+
+def test_final_turns_are_vad_trimmed_and_windows_are_not():
+    asr = FakeASR()
+    asr.gate.clear()
+    scheduler = ASRScheduler(asr, max_batch_size=4, max_wait_ms=200)
+
+    turn = scheduler.submit(utterance(100), vad_filter=True)
+    window = scheduler.submit(utterance(200), beam_size=3)
+    asr.gate.set()
+    turn.result(5)
+    window.result(5)
+
+    # Same beam size, but not decoded together: only the turn is trimmed
+    assert asr.batches == [1, 1]
+    assert asr.vad_filters == [True, False]
+
+
+def test_cancelled_caller_does_not_kill_the_dispatcher():
+    asr = FakeASR()
+    asr.gate.clear()
+    scheduler = ASRScheduler(asr, max_batch_size=4, max_wait_ms=0)
+
+    async def scenario():
+        # The first caller is cancelled while its batch decodes (barge-in)...
+        decoding = asyncio.create_task(scheduler.atranscribe_voice(utterance(100)))
+        await asyncio.to_thread(asr.started.wait, 5)
+        # ...the second while still queued behind it (disconnect)
+        queued = asyncio.create_task(scheduler.atranscribe_voice(utterance(200)))
+        await asyncio.sleep(0.05)
+        decoding.cancel()
+        queued.cancel()
+        await asyncio.gather(decoding, queued, return_exceptions=True)
+        asr.gate.set()
+        return await asyncio.wait_for(scheduler.atranscribe_voice(utterance(300)), 5)
+
+    assert asyncio.run(scenario())["text"] == "300 samples"
+    assert scheduler.get_stats()["cancelled"] == 1
+    assert asr.batches == [1, 1]
+
+
+def test_failed_batch_fails_its_callers_only():
+    asr = FakeASR(fail=True)
+    scheduler = ASRScheduler(asr, max_batch_size=4, max_wait_ms=0)
+
+    with pytest.raises(RuntimeError, match="decoder crashed"):
+        scheduler.submit(utterance(100)).result(5)
+
+    asr.fail = False
+    assert scheduler.submit(utterance(100)).result(5)["text"] == "100 samples"
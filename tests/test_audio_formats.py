@@ -0,0 +1,60 @@
+import struct
+
+import numpy as np
+
+from backend.services.audio_formats import OUTPUT_FORMATS, negotiate_format
+from backend.utils.audio_utils import pcm16_to_ulaw
+
+
+def test_pcm16_last_frame_is_padded_with_silence():
+    fmt = OUTPUT_FORMATS["pcm16_8k"]
+    assert fmt.frame_bytes == 320  # 20 ms of 8 kHz 16-bit
+
+    frames = fmt.frames(b"\x01\x02" * 350, chunk_bytes=4096)
+    assert [len(f) for f in frames] == [320, 320, 320]
+    assert frames[-1] == b"\x01\x02" * 30 + b"\x00" * 260
+
+
+def test_ulaw_last_frame_is_padded_with_ulaw_silence():
+    fmt = OUTPUT_FORMATS["ulaw_8k"]
+    frames = fmt.frames(b"\x10" * 200, chunk_bytes=4096)
+    assert [len(f) for f in frames] == [160, 160]
+    assert frames[-1] == b"\x10" * 40 + b"\xff" * 120
+
+
+def test_exact_frames_are_not_padded():
+    fmt = OUTPUT_FORMATS["pcm16_16k"]
+    data = bytes(range(256)) * 5  # two 640-byte frames
+    assert fmt.frames(data, chunk_bytes=4096) == [data[:640], data[640:]]
+    assert fmt.frames(b"", chunk_bytes=4096) == []
+
+
+def test_mp3_is_chunked_without_padding():
+    fmt = negotiate_format("mp3")
+    assert fmt.frames(b"x" * 10, chunk_bytes=4) == [b"xxxx", b"xxxx", b"xx"]
+
+
+def test_opus_frames_are_the_stored_packets():
+    packets = [b"a" * 3, b"", b"b" * 300]
+    data = b"".join(struct.pack(">H", len(p)) + p for p in packets)
+    assert OUTPUT_FORMATS["opus_16k"].frames(data, chunk_bytes=4096) == packets
+
+
+def test_ulaw_reference_values():
+    pcm = np.array([0, 32767, -32768], dtype="<i2").tobytes()
+    assert pcm16_to_ulaw(pcm) == b"\xff\x80\x00"
+
+
+def test_ulaw_is_one_byte_per_sample_and_monotonic():
+    ramp = np.linspace(-32768, 32767, 2001).astype("<i2")
+    codes = np.frombuffer(pcm16_to_ulaw(ramp.tobytes()), dtype=np.uint8)
+    assert codes.size == ramp.size
+    # Positive codes run 0xFF (zero) down to 0x80, negative 0x7F down to 0x00
+    level = np.where(codes >= 0x80, 0xFF - codes, -(0x7F - codes.astype(int)) - 1)
+    assert np.all(np.diff(level) >= 0)
+
+
+def test_unknown_format_falls_back_to_mp3():
+    assert negotiate_format("flac_96k").codec == "mp3"
+    assert negotiate_format(None).codec == "mp3"
+    assert negotiate_format("ulaw_8k").frame_s == 0.02
@@ -0,0 +1,61 @@
+from backend.services.bm25_index import (
+    BM25Index,
+    build_index,
+    reciprocal_rank_fusion,
+    tokenize,
+)
+
+DOCS = [
+    "La franchise s'applique à chaque sinistre déclaré.",
+    "Pour résilier votre contrat, envoyez une lettre recommandée.",
+    "Les franchises du contrat auto sont indiquées aux conditions particulières.",
+    "Le bris de glace est couvert sans franchise.",
+]
+
+
+def test_tokenize_folds_accents_plurals_and_stopwords():
+    assert tokenize("Les franchises de l'Assurance-Vie") == [
+        "franchise",
+        "assurance",
+        "vie",
+    ]
+    assert tokenize("déclaré") == ["declare"]
+
+
+def test_fusion_rewards_agreement_between_rankings():
+    dense = ["a", "b", "c"]
+    lexical = ["c", "d", "a"]
+    # "a" is 1st and 3rd, "c" 3rd and 1st: both beat items ranked once
+    assert reciprocal_rank_fusion([dense, lexical], k=4) == ["a", "c", "b", "d"]
+    assert reciprocal_rank_fusion([dense, lexical], k=2) == ["a", "c"]
+
+
+def test_fusion_keeps_a_single_ranking_order():
+    assert reciprocal_rank_fusion([["x", "y", "z"], []], k=3) == ["x", "y", "z"]
+    assert reciprocal_rank_fusion([[], []], k=3) == []
+
+
+def test_fusion_constant_sets_the_weight_of_top_ranks():
+    rankings = [["a", "p", "q", "d"], ["x", "y", "z", "d"]]
+    # Small constant: one first place beats two fourth places; default: not
+    assert reciprocal_rank_fusion(rankings, k=1, constant=1) == ["a"]
+    assert reciprocal_rank_fusion(rankings, k=1) == ["d"]
+
+
+def build(tmp_path, sources=None):
+    path = str(tmp_path / "bm25.json")
+    build_index([f"doc-{i}" for i in range(len(DOCS))], DOCS, path, sources)
+    return BM25Index(path)
+
+
+def test_search_ranks_exact_terms(tmp_path):
+    index = build(tmp_path)
+    assert index.search("résilier mon contrat", k=2)[0] == 1
+    assert set(index.search("franchise", k=10)) == {0, 2, 3}
+    assert index.search("le la les", k=5) == []
+
+
+def test_search_within_sources(tmp_path):
+    index = build(tmp_path, ["general.pdf", "general.pdf", "auto.pdf", "auto.pdf"])
+    assert set(index.search("franchise", k=10, sources=["auto.pdf"])) == {2, 3}
+    assert index.search("résilier", k=10, sources=["auto.pdf"]) == []
@@ -0,0 +1,94 @@
+import re
+import zlib
+import asyncio
+
+import numpy as np
+import pytest
+
+from backend.models.intent import Intent
+from backend.services.intent_classifier import TEMPERATURES, IntentClassifier
+from backend.services.nlu_service import NLUService
+
+
+def encode(texts):
+    """Hashed bag of words, L2-normalized: texts sharing words are close."""
+    vectors = np.zeros((len(texts), 4096), dtype=np.float32)
+    for row, text in enumerate(texts):
+        for word in re.findall(r"\w+", text.lower()):
+            vectors[row, zlib.crc32(word.encode()) % 4096] += 1.0
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+@pytest.fixture
+def classifier():
+    return IntentClassifier(encode, labelled=[], min_margin=0.2)
+
+
+def test_probabilities_are_calibrated_on_the_examples(classifier):
+    assert classifier.temperature in TEMPERATURES
+    prediction = classifier.predict("Je voudrais changer mon RIB")
+    probs = classifier.probabilities(encode(["Je voudrais changer mon RIB"])[0])
+    assert probs.sum() == pytest.approx(1.0)
+    assert prediction["probability"] == pytest.approx(probs.max())
+    assert prediction["margin"] == pytest.approx(probs.max() - np.sort(probs)[-2])
+
+
+def test_close_paraphrase_is_confident(classifier):
+    prediction = classifier.predict("Ma maison a été cambriolée ce week-end")
+    assert prediction["intent"] == "CLAIM"
+    assert classifier.confident(prediction)
+
+
+def test_text_unlike_any_example_is_not_confident(classifier):
+    prediction = classifier.predict("xyzzy plugh")
+    assert prediction["margin"] == pytest.approx(0.0)
+    assert not classifier.confident(prediction)
+
+
+def test_logged_llm_labels_become_examples():
+    turns = [{"text": "xyzzy plugh", "intent": "PAYMENT", "source": "llm"}]
+    classifier = IntentClassifier(encode, labelled=turns, min_margin=0.2)
+    prediction = classifier.predict("xyzzy plugh")
+    assert prediction["intent"] == "PAYMENT"
+    assert classifier.confident(prediction)
+
+
+@pytest.fixture
+def nlu(monkeypatch, classifier):
+    monkeypatch.setenv("GROQ_API_KEY", "test")
+    service = NLUService(classifier=classifier)
+    service.llm_calls = []
+
+    def classify_with_llm(text):
+        service.llm_calls.append(text)
+        return Intent(name="INQUIRY", confidence=0.6)
+
+    async def aclassify_with_llm(text):
+        return classify_with_llm(text)
+
+    monkeypatch.setattr(service, "_classify_with_llm", classify_with_llm)
+    monkeypatch.setattr(service, "_aclassify_with_llm", aclassify_with_llm)
+    return service
+
+
+def test_confident_local_prediction_skips_the_llm(nlu):
+    intent = nlu.detect_intent("Ma maison a été cambriolée ce week-end")
+    assert intent.name == "CLAIM"
+    assert 0.75 * 0.4 < intent.confidence <= 1.0
+    assert nlu.llm_calls == []
+    assert nlu.get_intent_stats()["local_answered"] == 1
+
+
+def test_low_margin_defers_to_the_llm(nlu):
+    assert nlu.detect_intent("xyzzy plugh").name == "INQUIRY"
+    assert asyncio.run(nlu.adetect_intent("xyzzy plugh")).name == "INQUIRY"
+    assert nlu.llm_calls == ["xyzzy plugh", "xyzzy plugh"]
+    stats = nlu.get_intent_stats()
+    assert (stats["local_answered"], stats["local_deferred"]) == (0, 2)
+
+
+def test_patterns_still_come_first(nlu):
+    assert nlu.detect_intent("Bonjour").name == "GREETING"
+    assert nlu.get_intent_stats()["local_answered"] == 0
+    assert nlu.llm_calls == []
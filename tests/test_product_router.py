@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from backend.services import rag_service
+from backend.services.product_router import GENERAL_SOURCES, route_sources
+from backend.services.rag_service import RAGService
+from backend.services.vector_index import export_collection
+
+AUTO = "auto_assurance.pdf"
+HOME = "habitation_vie_quotidienne_assurance.pdf"
+
+
+def test_product_keywords_route_to_their_pdf_plus_general_terms():
+    assert route_sources("Mon pare-brise est fissuré") == [AUTO] + GENERAL_SOURCES
+    assert route_sources("J'ai été CAMBRIOLÉ hier") == [HOME] + GENERAL_SOURCES
+
+
+def test_keywords_match_folded_forms():
+    # Plural, articles and accents do not prevent the match
+    assert route_sources("les dégâts des eaux") == [HOME] + GENERAL_SOURCES
+    assert route_sources("mes vehicules") == [AUTO] + GENERAL_SOURCES
+
+
+def test_several_product_lines():
+    assert route_sources("ma voiture et ma maison") == [AUTO, HOME] + GENERAL_SOURCES
+
+
+def test_no_product_searches_everything():
+    assert route_sources("Quelle est ma franchise ?") is None
+    # Whole words only: "automatique" is not "auto"
+    assert route_sources("un prélèvement automatique") is None
+
+
+class FakeCollection:
+    """A franchise chunk in the auto PDF, a water-damage one in the home PDF."""
+
+    def get(self, include=None):
+        return {
+            "ids": ["franchise", "sinistre"],
+            "embeddings": np.eye(2, dtype=np.float32),
+            "documents": ["franchise auto", "sinistre habitation"],
+            "metadatas": [{"source": AUTO}, {"source": HOME}],
+        }
+
+
+class FakeEmbedder:
+    def encode(self, texts):
+        return np.array(
+            [[1.0, 0.0] if "franchise" in t else [0.0, 1.0] for t in texts],
+            dtype=np.float32,
+        )
+
+
+@pytest.fixture
+def rag(tmp_path, monkeypatch):
+    monkeypatch.setattr(rag_service, "get_embedder", lambda *args: FakeEmbedder())
+    export_collection(FakeCollection(), str(tmp_path / "index"))
+    return RAGService(
+        persist_dir=str(tmp_path / "chroma"),
+        index="numpy",
+        index_dir=str(tmp_path / "index"),
+        bm25_path=str(tmp_path / "bm25.json"),
+    )
+
+
+def test_scoped_search_stays_in_the_product_line(rag):
+    assert rag.retrieve("franchise voiture", k=1) == ["franchise auto"]
+    assert rag.scope_stats == {"scoped": 1, "widened": 0, "unscoped": 0}
+
+
+def test_weak_scoped_results_widen_to_the_corpus(rag):
+    # Routed to the auto PDF, but the answer is in the home one
+    assert rag.retrieve("sinistre voiture", k=1) == ["sinistre habitation"]
+    assert rag.retrieve("un sinistre", k=1) == ["sinistre habitation"]
+    assert rag.scope_stats == {"scoped": 0, "widened": 1, "unscoped": 1}
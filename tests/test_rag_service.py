@@ -0,0 +1,122 @@
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from backend.services import rag_service
+from backend.services.rag_service import RAGService, normalize_query
+from backend.services.vector_index import export_collection
+
+TOPICS = ["franchise", "résiliation", "sinistre"]
+
+
+class FakeCollection:
+    """One chunk per topic, its embedding the topic's one-hot vector."""
+
+    def __init__(self, label="v1"):
+        self.label = label
+
+    def get(self, include=None):
+        return {
+            "ids": TOPICS,
+            "embeddings": np.eye(len(TOPICS), dtype=np.float32),
+            "documents": [f"{topic} {self.label}" for topic in TOPICS],
+            "metadatas": [{"source": "faq.pdf"} for _ in TOPICS],
+        }
+
+
+class FakeEmbedder:
+    """One-hot vector of the first topic in the text; counts encodes."""
+
+    def __init__(self):
+        self.calls = 0
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def encode(self, texts):
+        self.calls += 1
+        self.gate.wait(5)
+        vectors = np.zeros((len(texts), len(TOPICS)), dtype=np.float32)
+        for row, text in enumerate(texts):
+            topic = next(t for t in TOPICS if t in text.lower())
+            vectors[row, TOPICS.index(topic)] = 1.0
+        return vectors
+
+
+@pytest.fixture
+def rag(tmp_path, monkeypatch):
+    embedder = FakeEmbedder()
+    monkeypatch.setattr(rag_service, "get_embedder", lambda *args: embedder)
+    export_collection(FakeCollection(), str(tmp_path / "index"))
+    return RAGService(
+        persist_dir=str(tmp_path / "chroma"),
+        index="numpy",
+        index_dir=str(tmp_path / "index"),
+        bm25_path=str(tmp_path / "bm25.npz"),
+    )
+
+
+def test_normalize_query():
+    assert normalize_query("  Comment  déclarer un SINISTRE ?") == (
+        "comment déclarer un sinistre"
+    )
+    assert normalize_query("« franchise »") == "franchise"
+
+
+def test_repeated_query_is_encoded_and_searched_once(rag):
+    first = rag.retrieve("Quelle est ma franchise ?", k=1)
+    again = rag.retrieve("quelle est ma  FRANCHISE", k=1)
+
+    assert first == again == ["franchise v1"]
+    assert rag.embedder.calls == 1
+    stats = rag.get_cache_stats()
+    assert (stats["cache_hits"], stats["cache_misses"]) == (1, 1)
+
+
+def test_embedding_is_reused_for_another_k(rag):
+    rag.embed_query("Ma résiliation")  # NLU encodes the turn first
+    assert rag.retrieve("ma résiliation", k=2)[0] == "résiliation v1"
+    assert rag.retrieve("ma résiliation", k=1) == ["résiliation v1"]
+    assert rag.embedder.calls == 1
+    assert rag.get_cache_stats()["embedding_hits"] == 2
+
+
+def test_concurrent_callers_share_one_encode(rag):
+    rag.embedder.gate.clear()
+    with ThreadPoolExecutor(4) as pool:
+        futures = [pool.submit(rag.embed_query, "Un sinistre") for _ in range(4)]
+        time.sleep(0.1)
+        rag.embedder.gate.set()
+        embeddings = [f.result() for f in futures]
+
+    assert rag.embedder.calls == 1
+    assert all(e == embeddings[0] for e in embeddings)
+    assert rag.get_cache_stats()["embedding_shared"] == 3
+
+
+def test_reexport_invalidates_cached_results(rag, tmp_path, monkeypatch):
+    monkeypatch.setattr(RAGService, "CHANGE_CHECK_S", 0.0)
+    assert rag.retrieve("sinistre", k=1) == ["sinistre v1"]
+
+    export_collection(FakeCollection("v2"), str(tmp_path / "index"))
+    table = next(p for p in (tmp_path / "index").iterdir() if p.suffix == ".json")
+    later = time.time() + 10
+    os.utime(table, (later, later))
+
+    assert rag.retrieve("sinistre", k=1) == ["sinistre v2"]
+    assert rag.get_cache_stats()["invalidations"] == 1
+
+
+def test_result_computed_before_an_invalidation_is_not_cached(rag):
+    generation = rag.generation
+    rag.invalidate_cache()
+    rag._cache_put(
+        "franchise",
+        k=1,
+        results={"ids": [], "documents": ["stale"]},
+        generation=generation,
+    )
+    assert rag.retrieve("franchise", k=1) == ["franchise v1"]
@@ -0,0 +1,49 @@
+import pytest
+
+from backend.services.llm_service import LLMService, SentenceChunker
+
+ANSWERS = [
+    "Vous pouvez déclarer le sinistre en ligne. Un conseiller vous rappelle.",
+    "En tant qu'assistant IA, je vous conseille de **contacter** votre agence.",
+    "Malheureusement, ce n'est pas couvert. Voyez l'option A. Ou B. Ou C.",
+    "Je vous envoie le formulaire",
+]
+
+
+def chunk(text: str, size: int) -> list[str]:
+    chunker = SentenceChunker()
+    sentences = []
+    for i in range(0, len(text), size):
+        sentences += chunker.feed(text[i : i + size])
+    return sentences + chunker.flush()
+
+
+@pytest.mark.parametrize("text", ANSWERS)
+@pytest.mark.parametrize("size", [1, 3, 7, 1000])
+def test_streamed_sentences_match_the_blocking_cleanup(monkeypatch, text, size):
+    monkeypatch.setenv("GROQ_API_KEY", "test")
+    cleaned = LLMService()._clean_response(text)
+    assert " ".join(chunk(text, size)) == cleaned
+
+
+def test_sentences_are_emitted_as_soon_as_they_end():
+    chunker = SentenceChunker()
+    assert chunker.feed("Bonjour, je suis là pour vous aider") == []
+    assert chunker.feed(". Que") == ["Bonjour, je suis là pour vous aider."]
+    assert chunker.feed(" puis-je faire ?") == []
+    assert chunker.flush() == ["Que puis-je faire ?"]
+
+
+def test_prefix_split_across_tokens_is_removed():
+    tokens = ["Je suis ", "désolé, ", "mais ", "ce contrat est résilié."]
+    chunker = SentenceChunker()
+    sentences = [s for token in tokens for s in chunker.feed(token)]
+    assert sentences == ["ce contrat est résilié."]
+
+
+def test_stops_after_max_sentences():
+    chunker = SentenceChunker(max_sentences=2)
+    assert chunker.feed("Un. Deux. Trois. ") == ["Un.", "Deux."]
+    assert chunker.done
+    assert chunker.feed("Quatre.") == []
+    assert chunker.flush() == []
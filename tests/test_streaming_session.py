@@ -0,0 +1,173 @@
+import numpy as np
+import pytest
+
+from backend.services.streaming_session import StreamingSession
+from backend.utils.audio_utils import EnergyVAD, contains_speech
+
+RATE = 16000
+
+
+def tone(seconds, amplitude=0.3):
+    t = np.arange(int(seconds * RATE)) / RATE
+    return (amplitude * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+
+
+def noise(seconds, amplitude=0.002, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.normal(0, amplitude, int(seconds * RATE)).astype(np.float32)
+
+
+def pcm16(samples):
+    return (np.clip(samples, -1, 1) * 32767).astype("<i2").tobytes()
+
+
+def feed(session, samples, frame_ms=20, **kwargs):
+    """Send `samples` as client frames; returns the events raised."""
+    data = pcm16(samples)
+    step = RATE * frame_ms // 1000 * 2
+    events = [
+        session.add_frame(data[i : i + step], **kwargs)
+        for i in range(0, len(data), step)
+    ]
+    return [e for e in events if e]
+
+
+def test_vad_separates_speech_from_background_noise():
+    vad = EnergyVAD()
+    flags = [speech for _, speech in vad.frames(noise(1.0))]
+    flags += [speech for _, speech in vad.frames(tone(0.3))]
+    assert not any(flags[:33])
+    assert all(flags[33:])
+
+
+def test_vad_buffers_incomplete_frames():
+    vad = EnergyVAD()
+    assert list(vad.frames(tone(0.01))) == []  # 10 ms < one 30 ms frame
+    frames = list(vad.frames(tone(0.05)))
+    assert len(frames) == 2
+    assert all(len(frame) == vad.frame_size for frame, _ in frames)
+
+
+def test_contains_speech_needs_a_continuous_run():
+    assert contains_speech(np.concatenate([noise(0.5), tone(0.4)]), 300)
+    clicks = np.concatenate([tone(0.1), noise(0.1, seed=1)] * 5)
+    assert not contains_speech(clicks, 300)
+
+
+def test_onset_and_endpoint():
+    session = StreamingSession()
+    assert feed(session, noise(0.5)) == []
+    assert feed(session, tone(1.0)) == ["speech_start"]
+    assert feed(session, noise(0.3)) == []  # a pause, not the end
+    assert feed(session, tone(0.5)) == []
+    assert feed(session, noise(1.0)) == ["endpoint"]
+    assert session.endpoint_reached
+
+
+def test_short_noise_does_not_start_an_utterance():
+    session = StreamingSession()
+    assert feed(session, np.concatenate([noise(0.3), tone(0.09), noise(0.3)])) == []
+    assert not session.in_speech
+
+
+def test_stricter_onset_while_the_ai_speaks():
+    session = StreamingSession()
+    # 200 ms is an utterance normally, but not a barge-in (300 ms)
+    assert feed(session, tone(0.2), min_speech_ms=300) == []
+    assert feed(session, tone(0.2), min_speech_ms=300) == ["speech_start"]
+
+
+def test_pre_roll_keeps_the_speech_onset():
+    session = StreamingSession(pre_roll_ms=300)
+    feed(session, noise(1.0))
+    feed(session, tone(1.0))
+    audio = session.get_buffered_audio()
+    # The frames that triggered the onset, and the silence before them, are kept
+    assert len(audio) >= RATE * 1.0
+    assert not contains_speech(audio[: RATE // 10], 60)
+
+
+def test_odd_byte_frames_are_reassembled():
+    session = StreamingSession()
+    data = pcm16(tone(1.0))
+    events = [session.add_frame(data[i : i + 641]) for i in range(0, len(data), 641)]
+    assert "speech_start" in events
+    expected = np.frombuffer(data, dtype="<i2").astype(np.float32) / 32768.0
+    audio = session.get_buffered_audio()
+    # Every sample up to the last complete VAD frame, none shifted by a byte
+    assert len(expected) - len(audio) < session.vad.frame_size
+    assert np.array_equal(audio, expected[: len(audio)])
+
+
+class FakeASR:
+    """Word timings are relative to the decoded window."""
+
+    def __init__(self, words):
+        self.words = words
+        self.windows = []
+
+    def transcribe_window(self, audio, **kwargs):
+        self.windows.append((len(audio) / RATE, kwargs))
+        words = [
+            {"start": s, "end": e, "word": f" {w}", "probability": 0.9}
+            for w, s, e in self.words
+        ]
+        return {
+            "text": " ".join(w for w, _, _ in self.words),
+            "language": "fr",
+            "segments": [{"avg_logprob": -0.1, "words": words}],
+        }
+
+
+def test_partial_commits_only_words_older_than_the_holdback():
+    session = StreamingSession(holdback_s=1.0, min_commit_window_s=2.0)
+    feed(session, tone(3.0))
+    asr = FakeASR(
+        [
+            ("Je", 0.1, 0.5),
+            ("voudrais", 0.6, 1.2),
+            ("déclarer", 1.3, 2.5),
+            ("un", 2.6, 2.9),
+        ]
+    )
+
+    assert session.decode_partial(asr) == "Je voudrais déclarer un"
+    assert session.text_buffer == ["Je voudrais"]
+    assert session._committed_samples == int(1.2 * RATE)
+
+    # The next window starts after the committed words, prompted with them
+    feed(session, tone(0.6))
+    session.decode_partial(asr)
+    window_s, kwargs = asr.windows[-1]
+    assert window_s == pytest.approx(
+        session.get_buffered_audio().size / RATE - 1.2, abs=0.01
+    )
+    assert kwargs["initial_prompt"] == "Je voudrais"
+    assert kwargs["word_timestamps"]
+
+
+def test_short_window_commits_nothing():
+    session = StreamingSession(min_commit_window_s=2.0)
+    feed(session, tone(1.5))
+    asr = FakeASR([("Bonjour", 0.1, 0.4)])
+    assert session.decode_partial(asr) == "Bonjour"
+    assert session.text_buffer == []
+    assert session._committed_samples == 0
+
+
+def test_finalize_decodes_only_the_tail():
+    pytest.importorskip("faster_whisper")
+    pytest.importorskip("torch")
+    session = StreamingSession()
+    feed(session, tone(3.0))
+    asr = FakeASR([("Je", 0.1, 0.5), ("voudrais", 0.6, 1.2), ("déclarer", 1.3, 2.5)])
+    session.decode_partial(asr)
+    feed(session, noise(1.0))
+
+    result = session.finalize(asr)
+    tail_s, kwargs = asr.windows[-1]
+    assert kwargs.get("word_timestamps") is None
+    assert tail_s < result["audio_seconds"] - 1.0
+    assert result["text"].startswith("Je voudrais")
+    assert 0 < result["predecoded_ratio"] < 1
+    assert session.get_buffered_audio().size == 0
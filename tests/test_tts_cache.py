@@ -0,0 +1,73 @@
+import os
+import time
+
+from backend.services.tts_cache import DiskLRU, MemoryLRU, TTSCache
+
+
+def test_memory_lru_evicts_least_recently_used_within_budget():
+    lru = MemoryLRU(max_bytes=10)
+    lru.put("a", b"aaaa")
+    lru.put("b", b"bbbb")
+    assert lru.get("a") == b"aaaa"  # "b" is now the oldest
+    lru.put("c", b"cccc")
+
+    assert lru.get("b") is None
+    assert lru.get("a") == b"aaaa" and lru.get("c") == b"cccc"
+    assert lru.size == 8 and lru.evictions == 1
+
+
+def test_memory_lru_skips_clips_larger_than_the_budget():
+    lru = MemoryLRU(max_bytes=4)
+    lru.put("big", b"12345")
+    assert lru.get("big") is None and lru.size == 0
+
+
+def test_disk_lru_evicts_files(tmp_path):
+    disk = DiskLRU(tmp_path, max_bytes=10)
+    disk.put("a", b"aaaa")
+    disk.put("b", b"bbbb")
+    disk.get("a")
+    disk.put("c", b"cccc")
+
+    assert disk.get("b") is None
+    assert not (tmp_path / "b.mp3").exists()
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["a.mp3", "c.mp3"]
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_disk_lru_order_survives_a_restart(tmp_path):
+    disk = DiskLRU(tmp_path, max_bytes=100)
+    for key in ["a", "b", "c"]:
+        disk.put(key, b"1234")
+    now = time.time()
+    # "a" was used last before the restart, "b" first
+    for age, key in [(30, "b"), (20, "c"), (10, "a")]:
+        os.utime(tmp_path / f"{key}.mp3", (now - age, now - age))
+
+    reopened = DiskLRU(tmp_path, max_bytes=12)
+    assert reopened.size == 12
+    reopened.put("d", b"1234")
+    assert reopened.get("b") is None
+    assert reopened.get("c") == b"1234" and reopened.get("a") == b"1234"
+
+
+def test_disk_lru_keeps_other_suffixes(tmp_path):
+    disk = DiskLRU(tmp_path, max_bytes=100)
+    disk.put("clip.ulaw_8k", b"ulaw")
+    assert (tmp_path / "clip.ulaw_8k").exists()
+    assert DiskLRU(tmp_path, max_bytes=100).get("clip.ulaw_8k") == b"ulaw"
+
+
+def test_two_tier_cache_promotes_disk_hits(tmp_path):
+    cache = TTSCache(tmp_path, memory_bytes=100, disk_bytes=1000)
+    cache.put("k", b"clip")
+
+    restarted = TTSCache(tmp_path, memory_bytes=100, disk_bytes=1000)
+    assert restarted.get_memory("k") is None
+    assert restarted.get("k") == b"clip"  # from disk...
+    assert restarted.get("k") == b"clip"  # ...then from memory
+    assert restarted.get("missing") is None
+
+    stats = restarted.get_stats()
+    assert (stats["disk_hits"], stats["memory_hits"], stats["misses"]) == (1, 1, 1)
+    assert stats["hit_rate"] == 2 / 3
@@ -0,0 +1,107 @@
+import time
+import asyncio
+import threading
+
+import pytest
+
+from backend.services import tts_service
+from backend.services.tts_engines import TTSEngine
+from backend.services.tts_service import TTSService, split_sentences
+
+
+class FakeEngine(TTSEngine):
+    """Clip bytes spell the sentence; records calls and peak concurrency."""
+
+    name = cache_tag = "fake"
+
+    def __init__(self, delay=0.0, delays=None, fail=False):
+        self.delay = delay
+        self.delays = delays or {}
+        self.fail = fail
+        self.calls = []
+        self.active = self.peak = 0
+        self._lock = threading.Lock()
+
+    def synthesize(self, text, lang):
+        with self._lock:
+            self.calls.append(text)
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(self.delays.get(text, self.delay))
+        with self._lock:
+            self.active -= 1
+        return None if self.fail else f"<{text}>".encode()
+
+
+@pytest.fixture
+def make_tts(tmp_path, monkeypatch):
+    monkeypatch.setattr(tts_service, "OUTPUT_DIR", str(tmp_path))
+
+    def make(*engines):
+        return TTSService(engines=list(engines))
+
+    return make
+
+
+def test_sentences_are_normalized_for_the_cache_key():
+    text = "C’est noté.  Un conseiller vous rappelle !Merci"
+    assert split_sentences(text) == [
+        "C'est noté.",
+        "Un conseiller vous rappelle !Merci",
+    ]
+    assert split_sentences("Bonjour.\n\nAu revoir…  Oui ?") == [
+        "Bonjour.",
+        "Au revoir…",
+        "Oui ?",
+    ]
+
+
+def test_sentence_repeated_across_replies_is_synthesized_once(make_tts):
+    engine = FakeEngine()
+    tts = make_tts(engine)
+
+    first = tts.synthesize_bytes("Bonjour. Comment puis-je vous aider ?")
+    second = tts.synthesize_bytes("Bonjour.  Au revoir.")
+
+    assert first == b"<Bonjour.><Comment puis-je vous aider ?>"
+    assert second == b"<Bonjour.><Au revoir.>"
+    assert engine.calls == ["Bonjour.", "Comment puis-je vous aider ?", "Au revoir."]
+
+
+def test_missing_sentences_are_synthesized_in_parallel(make_tts):
+    engine = FakeEngine(delay=0.05)
+    tts = make_tts(engine)
+
+    tts.synthesize_bytes("Un. Deux. Trois. Quatre.")
+    assert engine.peak > 1
+
+    engine.peak = 0
+    asyncio.run(tts.asynthesize_bytes("Cinq. Six. Sept."))
+    assert engine.peak > 1
+
+
+def test_async_sentences_come_in_order_as_soon_as_ready(make_tts):
+    engine = FakeEngine(delays={"Lent.": 0.3})
+    tts = make_tts(engine)
+
+    async def collect():
+        started = time.perf_counter()
+        out = []
+        async for sentence, audio in tts.asynthesize_sentences("Rapide. Lent."):
+            out.append((sentence, audio, time.perf_counter() - started))
+        return out
+
+    (first, first_audio, first_s), (second, _, second_s) = asyncio.run(collect())
+    assert (first, second) == ("Rapide.", "Lent.")
+    assert first_audio == b"<Rapide.>"
+    assert first_s < 0.2 <= second_s
+
+
+def test_next_engine_is_tried_when_one_fails(make_tts):
+    failing, working = FakeEngine(fail=True), FakeEngine()
+    tts = make_tts(failing, working)
+
+    assert tts.synthesize_bytes("Bonjour.") == b"<Bonjour.>"
+    assert asyncio.run(tts.asynthesize_bytes("Au revoir.")) == b"<Au revoir.>"
+    assert failing.calls == ["Bonjour.", "Au revoir."]
+    assert working.calls == ["Bonjour.", "Au revoir."]
@@ -0,0 +1,114 @@
+import asyncio
+
+from backend.controllers.orchestrator import Orchestrator
+from backend.models.call_session import CallSession
+from backend.models.intent import Intent
+from backend.services.escalation_policy import EscalationPolicy
+from backend.services.turn_scheduler import TurnScheduler
+from backend.utils.remote_calls import count_remote_calls
+
+GREETING = "Bonjour"
+QUESTION = "Quels sont vos horaires d'ouverture ?"
+PAYMENT = "Je voudrais changer mon RIB"
+AGENT = "Je veux parler à un agent"
+MUMBLE = "Euh bof"
+
+
+class FakeNLU:
+    """Fast path for GREETING and MUMBLE; other turns are classified slower."""
+
+    FAST = {
+        GREETING: Intent("GREETING", confidence=0.95),
+        MUMBLE: Intent("INQUIRY", confidence=0.1),
+    }
+    SLOW = {
+        QUESTION: Intent("INQUIRY", confidence=0.9),
+        PAYMENT: Intent("PAYMENT", confidence=0.9),
+        AGENT: Intent("INQUIRY", confidence=0.9),
+    }
+
+    def detect_intent_fast(self, text):
+        return self.FAST.get(text)
+
+    async def adetect_intent(self, text):
+        if text in self.FAST:
+            return self.FAST[text]
+        await asyncio.sleep(0.02)
+        return self.SLOW[text]
+
+
+class FakeRAG:
+    def retrieve(self, text, k=None):
+        return ["Nos agences sont ouvertes de 9h à 18h."]
+
+
+class FakeLLM:
+    """Records the intent of every generation call."""
+
+    def __init__(self):
+        self.intents = []
+
+    async def astream_response(self, intent=None, outcome=None, **kwargs):
+        self.intents.append(intent)
+        for sentence in ["Première phrase.", "Deuxième phrase."]:
+            await asyncio.sleep(0.01)
+            yield sentence
+
+
+def run_turn(text, asr_conf=0.95, stream=True):
+    llm = FakeLLM()
+    escalation = EscalationPolicy(use_ai_validation=False)
+    orchestrator = Orchestrator(llm_service=llm, escalation_policy=escalation)
+    scheduler = TurnScheduler(FakeNLU(), FakeRAG(), orchestrator, escalation)
+    session = CallSession("call-1", "client-1")
+    session.add_message(text)
+
+    async def turn():
+        with count_remote_calls() as remote_calls:
+            turn = await scheduler.run(
+                text, session, asr_conf, remote_calls, stream=stream
+            )
+        sentences = []
+        if turn["response_stream"] is not None:
+            sentences = [s async for s in turn["response_stream"]]
+        return turn, sentences
+
+    turn, sentences = asyncio.run(turn())
+    return turn, sentences, llm, scheduler
+
+
+def test_fast_path_turn_commits_the_speculative_answer():
+    turn, sentences, llm, scheduler = run_turn(GREETING)
+
+    assert turn["trace"]["outcome"] == "committed"
+    assert sentences == ["Première phrase.", "Deuxième phrase."]
+    assert llm.intents == ["GREETING"]
+    assert scheduler.get_stats()["commit_rate"] == 1.0
+
+
+def test_turn_without_fast_path_generates_once_for_the_detected_intent():
+    for text, intent in [(QUESTION, "INQUIRY"), (PAYMENT, "PAYMENT")]:
+        turn, sentences, llm, scheduler = run_turn(text)
+
+        assert turn["trace"]["outcome"] == "not_speculated"
+        assert sentences == ["Première phrase.", "Deuxième phrase."]
+        assert llm.intents == [intent]
+        assert scheduler.get_stats()["speculated"] == 0
+
+
+def test_escalated_turn_is_not_answered():
+    turn, sentences, llm, _ = run_turn(AGENT)
+
+    assert turn["trace"]["decision"] == "ESCALATE"
+    assert turn["response_stream"] is None
+    assert llm.intents == []
+
+
+def test_clarified_turn_cancels_the_speculative_answer():
+    turn, sentences, llm, scheduler = run_turn(MUMBLE, asr_conf=0.2)
+
+    assert turn["trace"]["decision"] == "ASK_CLARIFICATION"
+    assert turn["trace"]["outcome"] == "cancelled"
+    assert turn["trace"]["wasted"]["reason"] == "ask_clarification"
+    assert turn["response_stream"] is None
+    assert scheduler.get_stats()["cancelled"] == 1
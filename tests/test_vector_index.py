@@ -0,0 +1,102 @@
+import json
+
+import numpy as np
+import pytest
+
+from backend.services import vector_index
+from backend.services.vector_index import NumpyIndex, export_collection
+
+SOURCES = ["auto.pdf", "habitation.pdf", "sante.pdf"]
+
+
+class FakeCollection:
+    """Random unit vectors, sources interleaved, exposed like `collection.get`."""
+
+    def __init__(self, count=50, dim=16, seed=0):
+        rng = np.random.default_rng(seed)
+        self.embeddings = rng.standard_normal((count, dim)).astype(np.float32)
+        self.ids = [f"chunk-{i}" for i in range(count)]
+        self.sources = [SOURCES[i % len(SOURCES)] for i in range(count)]
+
+    def get(self, include=None):
+        return {
+            "ids": self.ids,
+            "embeddings": self.embeddings,
+            "documents": [f"document {i}" for i in self.ids],
+            "metadatas": [{"source": s} for s in self.sources],
+        }
+
+
+@pytest.fixture
+def collection():
+    return FakeCollection()
+
+
+@pytest.fixture
+def index(tmp_path, collection):
+    export_collection(collection, str(tmp_path / "index"))
+    return NumpyIndex(str(tmp_path / "index"))
+
+
+def exact_top(collection, query, k, sources=None):
+    corpus = collection.embeddings / np.linalg.norm(
+        collection.embeddings, axis=1, keepdims=True
+    )
+    scores = corpus @ query
+    rows = [
+        i
+        for i in np.argsort(-scores)
+        if sources is None or collection.sources[i] in sources
+    ]
+    return [collection.ids[i] for i in rows[:k]]
+
+
+def test_matrix_stays_memory_mapped_float16(index):
+    assert isinstance(index.matrix, np.memmap)
+    assert index.matrix.dtype == np.float16
+    # Rows are stored grouped by source: one contiguous slice each
+    assert all(len(runs) == 1 for runs in index.spans.values())
+    assert sorted(index.spans) == SOURCES
+
+
+def test_search_matches_brute_force(index, collection, monkeypatch):
+    # Several blocks per search, the last one partial
+    monkeypatch.setattr(vector_index, "SCORE_BLOCK_ROWS", 7)
+    rng = np.random.default_rng(1)
+    for _ in range(20):
+        query = rng.standard_normal(16).astype(np.float32)
+        query /= np.linalg.norm(query)
+        found = index.search(query, k=5)
+        assert found["ids"] == exact_top(collection, query, 5)
+        assert found["scores"] == sorted(found["scores"], reverse=True)
+        assert found["documents"] == [f"document {i}" for i in found["ids"]]
+
+
+def test_search_scoped_to_sources(index, collection):
+    query = collection.embeddings[0] / np.linalg.norm(collection.embeddings[0])
+    scope = ["habitation.pdf", "sante.pdf"]
+    found = index.search(query, k=4, sources=scope)
+
+    assert found["ids"] == exact_top(collection, query, 4, scope)
+    assert {m["source"] for m in found["metadatas"]} <= set(scope)
+    assert index.search(query, k=4, sources=["inconnu.pdf"])["ids"] == []
+
+
+def test_index_exported_before_grouping_still_scopes(tmp_path, collection):
+    # Older exports kept the collection order: sources interleaved
+    directory = tmp_path / "index"
+    directory.mkdir()
+    data = collection.get()
+    corpus = collection.embeddings / np.linalg.norm(
+        collection.embeddings, axis=1, keepdims=True
+    )
+    np.save(directory / vector_index.MATRIX_FILE, corpus.astype(np.float16))
+    (directory / vector_index.TABLE_FILE).write_text(
+        json.dumps(data | {"embeddings": None})
+    )
+    index = NumpyIndex(str(directory))
+
+    assert len(index.spans["auto.pdf"]) > 1
+    query = corpus[3]
+    found = index.search(query, k=3, sources=["auto.pdf"])
+    assert found["ids"] == exact_top(collection, query, 3, ["auto.pdf"])
@@ -0,0 +1,49 @@
+import asyncio
+from types import SimpleNamespace
+
+from backend.services.phrase_bank import PHRASES, PhraseBank
+from backend.services.warmup import Warmup
+
+
+class FakeTTS:
+    """Renders every phrase except the texts in `failing`."""
+
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+
+    async def asynthesize_bytes(self, text):
+        if text in self.failing:
+            raise RuntimeError("TTS provider unavailable")
+        return b"mp3"
+
+
+def warm_tts(failing_keys):
+    tts = FakeTTS(PHRASES[key] for key in failing_keys)
+    pipeline = SimpleNamespace(phrases=PhraseBank(tts))
+    warmup = Warmup(required=["tts"])
+    asyncio.run(warmup._run_probes(pipeline, ["tts"]))
+    return warmup
+
+
+def test_all_phrases_rendered():
+    warmup = warm_tts([])
+
+    assert warmup.ready
+    assert warmup.service_states()["tts"] == "ok"
+    assert warmup.missing_phrases() == []
+
+
+def test_optional_phrase_failure_degrades_without_blocking_readiness():
+    warmup = warm_tts(["safe_redirect", "fallback_claim"])
+
+    assert warmup.ready
+    assert warmup.service_states()["tts"] == "degraded"
+    assert sorted(warmup.missing_phrases()) == ["fallback_claim", "safe_redirect"]
+
+
+def test_required_phrase_failure_blocks_readiness():
+    warmup = warm_tts(["technical_issue"])
+
+    assert not warmup.ready
+    assert warmup.service_states()["tts"] == "error"
+    assert "technical_issue" in warmup.probes["tts"]["error"]